@@ -0,0 +1,64 @@
+"""
+Production server config for main_server.
+
+    gunicorn -c gunicorn_conf.py main_server:app
+
+The app (config, provider clients, scorer weights) is imported once in the
+master before forking, so workers share those pages copy-on-write instead of
+each loading its own copy. Mutable caches go through a shared SQLite file
+(ROUTE_AGENT_SHARED_CACHE) so a result fetched by one worker is reused by all,
+and metrics are written to PROMETHEUS_MULTIPROC_DIR so /metrics covers every
+worker.
+"""
+
+import gc
+import multiprocessing
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# -------- SHARED CACHE (must be set before the app is preloaded) --------
+os.environ.setdefault(
+    "ROUTE_AGENT_SHARED_CACHE",
+    str(BASE_DIR / "route_agent" / "data" / "shared_cache.sqlite3"),
+)
+
+# -------- METRICS (must be set before prometheus_client is imported) --------
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    str(BASE_DIR / "route_agent" / "data" / "prometheus_multiproc"),
+)
+
+# -------- SERVER --------
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))   # route planning waits on several upstream APIs
+graceful_timeout = 30
+keepalive = 5
+
+
+def on_starting(server):
+    # Counters from a previous run would otherwise be summed into this one
+    metrics_dir = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    for stale in metrics_dir.glob("*.db"):
+        stale.unlink()
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges; its counters and histograms stay in the totals
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    # Move everything the preloaded app allocated into the permanent
+    # generation so the cyclic GC in workers never touches (and copies)
+    # those pages.
+    gc.collect()
+    gc.freeze()
+    server.log.info("App preloaded; %d objects frozen for copy-on-write sharing", gc.get_freeze_count())
@@ -4,6 +4,7 @@ from pathlib import Path
 # -------- FASTAPI --------
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 import polyline
 from enum import Enum
@@ -21,6 +22,7 @@ sys.path.append(str(ROUTE_AGENT.resolve()))
 
 # -------- IMPORT AGENTS --------
 from route_agent.src.main import plan_route                # route_agent/src/main.py
+from utils.metrics import metrics                          # same module instance main.py records into
 # from voice_processor import process_audio  # voice_agent
 # from relax_engine import analyze_stress    # relaxation_agent
 
@@ -46,6 +48,14 @@ class ConditionEnum(str, Enum):
 def home():
     return {"status": "Backend running successfully"}
 
+# -------- METRICS (Prometheus) --------
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
 # =========================================
 # 📍 ROUTE REQUEST MODEL
 # =========================================
@@ -54,6 +64,7 @@ class RouteRequest(BaseModel):
     source: str
     destination: str
     condition: ConditionEnum
+    include_timings: bool = False   # add per-stage timing breakdown to the response
 
 # =========================================
 # 🧭 ROUTE ENDPOINT
@@ -61,22 +72,26 @@ class RouteRequest(BaseModel):
 @app.post("/get_route")
 def get_route(data: RouteRequest):
 
-    best_route = plan_route(
-        user_id=data.user_id,
-        start=data.source,
-        destination=data.destination,
-        condition=data.condition.value,  # Pass as string
-    )
+    with metrics.trace() as trace:
+        best_route = plan_route(
+            user_id=data.user_id,
+            start=data.source,
+            destination=data.destination,
+            condition=data.condition.value,  # Pass as string
+        )
 
     if not best_route:
-        return {"status": "error", "message": "No route found"}
+        response = {"status": "error", "message": "No route found"}
+    else:
+        response = {
+            "status": "success",
+            "route": polyline.decode(best_route["geometry"]),
+        }
 
-    coords = polyline.decode(best_route["geometry"])
+    if data.include_timings:
+        response["timings"] = trace.as_dict()
 
-    return {
-        "status": "success",
-        "route": coords,
-    }
+    return response
 
 
 # # =========================================
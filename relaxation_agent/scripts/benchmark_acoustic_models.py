@@ -0,0 +1,105 @@
+"""Benchmark eager vs exported acoustic models on CPU (latency and output drift)."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.acoustic_encoder import create_acoustic_encoder
+from src.core.acoustic_export import ACOUSTIC_BACKENDS, export_acoustic_model, optimize_acoustic_model
+from src.core.emotion_classifier import CNNLSTMEmotionClassifier
+from src.core.preprocessor import pad_sequences
+
+
+def build_models(args):
+    """The emotion classifier (from a checkpoint if given) and the acoustic encoder."""
+    classifier = CNNLSTMEmotionClassifier(input_dim=args.n_mfcc)
+    if args.model_path:
+        checkpoint = torch.load(args.model_path, map_location="cpu")
+        classifier.load_state_dict(checkpoint.get("model_state_dict", checkpoint))
+    encoder = create_acoustic_encoder(input_dim=args.n_mfcc)
+    return {"classifier": classifier.eval(), "encoder": encoder.eval()}
+
+
+def make_batch(batch_size, n_mfcc, min_frames, max_frames, seed=0):
+    """Random MFCC sequences of varying length, padded, with their lengths."""
+    rng = np.random.default_rng(seed)
+    sequences = [
+        rng.standard_normal((int(n), n_mfcc)).astype(np.float32)
+        for n in rng.integers(min_frames, max_frames + 1, batch_size)
+    ]
+    padded, lengths = pad_sequences(sequences, min_len=4)
+    return torch.from_numpy(padded), torch.from_numpy(lengths)
+
+
+def time_model(model, inputs, repeats, warmup=3):
+    """Milliseconds per forward pass (median of `repeats`)."""
+    with torch.inference_mode():
+        for _ in range(warmup):
+            model(*inputs)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(*inputs)
+            times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acoustic model backend benchmark")
+    parser.add_argument("--backends", nargs="+", choices=ACOUSTIC_BACKENDS, default=list(ACOUSTIC_BACKENDS))
+    parser.add_argument("--model_path", type=str, default=None, help="Trained CNN-LSTM checkpoint")
+    parser.add_argument("--n_mfcc", type=int, default=13)
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--min_frames", type=int, default=80, help="Shortest utterance in frames")
+    parser.add_argument("--max_frames", type=int, default=200, help="Longest utterance in frames")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--num_threads", type=int, default=None)
+    parser.add_argument("--export_dir", type=str, default=None,
+                        help="Also save TorchScript exports of both models here")
+    args = parser.parse_args()
+
+    if args.num_threads:
+        torch.set_num_threads(args.num_threads)
+    torch.manual_seed(0)
+    models = build_models(args)
+
+    print("=" * 72)
+    print(f"Acoustic model benchmark (CPU, {torch.get_num_threads()} threads, "
+          f"{args.min_frames}-{args.max_frames} frames)")
+    print("=" * 72)
+    print(f"{'model':<11} {'backend':<17} {'batch':>5} {'ms/batch':>9} {'ms/utt':>8} {'speedup':>8} {'max |diff|':>11}")
+
+    for name, model in models.items():
+        variants = {backend: optimize_acoustic_model(model, backend) for backend in args.backends}
+        eager = optimize_acoustic_model(model, "eager")
+        for batch_size in args.batch_sizes:
+            padded, lengths = make_batch(batch_size, args.n_mfcc, args.min_frames, args.max_frames)
+            # The encoder has no lengths argument: it sees the padded batch
+            inputs = (padded, lengths) if name == "classifier" else (padded,)
+            with torch.inference_mode():
+                reference = eager(*inputs)
+            eager_ms = time_model(eager, inputs, args.repeats)
+            for backend, variant in variants.items():
+                ms = eager_ms if backend == "eager" else time_model(variant, inputs, args.repeats)
+                with torch.inference_mode():
+                    diff = (variant(*inputs) - reference).abs().max().item()
+                print(f"{name:<11} {backend:<17} {batch_size:>5} {ms:>9.2f} {ms / batch_size:>8.2f} "
+                      f"{eager_ms / max(ms, 1e-9):>7.2f}x {diff:>11.2e}")
+
+    if args.export_dir:
+        backend = next((b for b in reversed(args.backends) if b.startswith("torchscript")), "torchscript_int8")
+        print()
+        for name, model in models.items():
+            path = export_acoustic_model(model, str(Path(args.export_dir) / f"acoustic_{name}_{backend}.pt"), backend)
+            print(f"Exported {name} ({backend}) to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare the "realtime" audio feature profile against the "full" one."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.audio_io import load_audio
+from src.core.preprocessor import AudioPreprocessor
+
+
+# Feature keys compared between profiles (tempo exists only in "full")
+SCALAR_FEATURES = ("spectral_centroid", "spectral_rolloff", "zero_crossing_rate")
+# Pitch threshold used by StressScorer for the "high pitch" indicator
+HIGH_PITCH_HZ = 200.0
+
+
+def synthetic_clips(sample_rate, seconds, count, seed=0):
+    """Harmonic tones with vibrato and noise, standing in for speech when no files are given."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    clips = []
+    for f0 in np.linspace(90, 320, count):
+        phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.03 * np.sin(2 * np.pi * 5 * t))) / sample_rate
+        y = sum(np.sin(k * phase) / k for k in range(1, 6))
+        y = y * (0.5 + 0.5 * np.sin(2 * np.pi * 2 * t) ** 2) + 0.01 * rng.standard_normal(len(t))
+        clips.append((f"tone_{f0:.0f}Hz", (0.3 * y / np.abs(y).max()).astype(np.float32)))
+    return clips
+
+
+def extract_timed(preprocessor, clips, sample_rate, repeats):
+    """Extract every clip and return (features, milliseconds per clip)."""
+    features = [preprocessor.extract_features_from_array(y, sample_rate) for _, y in clips]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for _, y in clips:
+            preprocessor.extract_features_from_array(y, sample_rate)
+    elapsed = time.perf_counter() - start
+    return features, elapsed * 1000 / (repeats * len(clips))
+
+
+def relative_error(reference, candidate):
+    reference, candidate = np.asarray(reference, dtype=np.float64), np.asarray(candidate, dtype=np.float64)
+    return float(np.max(np.abs(reference - candidate)) / max(np.max(np.abs(reference)), 1e-9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio feature profile parity check")
+    parser.add_argument("audio_files", nargs="*", help="Audio files (synthetic tones if omitted)")
+    parser.add_argument("--sample_rate", type=int, default=22050)
+    parser.add_argument("--n_mfcc", type=int, default=13)
+    parser.add_argument("--num_synthetic", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0, help="Length of synthetic clips")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes over the clips")
+    parser.add_argument("--max_mfcc_error", type=float, default=1e-3,
+                        help="Fail if relative MFCC error exceeds this")
+    parser.add_argument("--min_pitch_agreement", type=float, default=0.0,
+                        help="Fail if high-pitch decision agreement (%%) is below this")
+    args = parser.parse_args()
+
+    if args.audio_files:
+        clips = []
+        for path in args.audio_files:
+            with open(path, "rb") as f:
+                y, _ = load_audio(f, sample_rate=args.sample_rate, filename=path)
+            clips.append((Path(path).name, y))
+    else:
+        clips = synthetic_clips(args.sample_rate, args.seconds, args.num_synthetic)
+
+    results = {}
+    for profile in AudioPreprocessor.PROFILES:
+        preprocessor = AudioPreprocessor(args.sample_rate, args.n_mfcc, profile=profile)
+        results[profile] = extract_timed(preprocessor, clips, args.sample_rate, args.repeats)
+
+    (full, full_ms), (fast, fast_ms) = results["full"], results["realtime"]
+
+    print("=" * 60)
+    print(f"Audio feature parity: full vs realtime ({len(clips)} clips)")
+    print("=" * 60)
+    mfcc_errors = [relative_error(a["mfcc"], b["mfcc"]) for a, b in zip(full, fast)]
+    print(f"MFCC max relative error:       {max(mfcc_errors):.2e}")
+    for name in SCALAR_FEATURES:
+        errors = [relative_error(a[name], b[name]) for a, b in zip(full, fast)]
+        print(f"{name + ' rel. error:':<31}{max(errors):.2e}")
+
+    print("\nPitch (Hz)                     full (piptrack)   realtime (YIN)")
+    for (clip_name, _), a, b in zip(clips, full, fast):
+        print(f"  {clip_name:<28} {a['pitch'][0]:>15.1f}   {b['pitch'][0]:>14.1f}")
+    agreement = 100.0 * np.mean([
+        (a["pitch"][0] > HIGH_PITCH_HZ) == (b["pitch"][0] > HIGH_PITCH_HZ) for a, b in zip(full, fast)
+    ])
+    print(f"High-pitch (> {HIGH_PITCH_HZ:.0f} Hz) agreement: {agreement:.2f}%")
+
+    print(f"\nLatency per clip:              full {full_ms:.1f} ms, realtime {fast_ms:.1f} ms "
+          f"({full_ms / max(fast_ms, 1e-9):.2f}x)")
+
+    if max(mfcc_errors) > args.max_mfcc_error or agreement < args.min_pitch_agreement:
+        print("\nParity check FAILED")
+        sys.exit(1)
+    print("\nParity check passed")
+
+
+if __name__ == "__main__":
+    main()
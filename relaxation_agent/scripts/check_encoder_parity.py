@@ -0,0 +1,109 @@
+"""Check an optimized text encoder backend against the eager model on GoEmotions."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.text_encoder import create_text_encoder, TEXT_ENCODER_BACKENDS
+from src.milestone_b.goemotions_loader import GoEmotionsLoader
+
+
+def load_split(loader, split, data_dir, max_samples):
+    """Load a GoEmotions split from local CSVs if present, else Hugging Face."""
+    if data_dir:
+        path = Path(data_dir) / f"goemotions_{split}.csv"
+        if path.exists():
+            return loader.load_from_local(str(path), max_samples=max_samples)
+    return loader.load_from_huggingface(split=split, max_samples=max_samples)
+
+
+def encode_timed(encoder, texts, batch_size):
+    """Encode texts and return (embeddings, seconds per utterance)."""
+    start = time.perf_counter()
+    embeddings = encoder.encode_batch(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return embeddings, elapsed / len(texts)
+
+
+def nearest_centroid_predictions(train_emb, train_labels, test_emb):
+    """Fit per-label centroids on one split and predict another by cosine similarity."""
+    labels = sorted(set(train_labels))
+    train_labels = np.array(train_labels)
+    centroids = torch.stack([
+        train_emb[torch.from_numpy(train_labels == label)].mean(dim=0) for label in labels
+    ])
+    sims = torch.nn.functional.normalize(test_emb, dim=1) @ torch.nn.functional.normalize(centroids, dim=1).T
+    return [labels[i] for i in sims.argmax(dim=1).tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text encoder backend parity check")
+    parser.add_argument("--backend", choices=TEXT_ENCODER_BACKENDS, default="int8")
+    parser.add_argument("--model_name", type=str, default="distilbert-base-uncased")
+    parser.add_argument("--data_dir", type=str, default="./data/goemotions",
+                        help="Directory with goemotions_<split>.csv (falls back to Hugging Face)")
+    parser.add_argument("--max_samples", type=int, default=1000, help="Samples per split")
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--num_threads", type=int, default=None)
+    parser.add_argument("--min_cosine", type=float, default=0.99,
+                        help="Fail if mean embedding cosine similarity is below this")
+    parser.add_argument("--max_accuracy_drop", type=float, default=1.0,
+                        help="Fail if held-out accuracy drops by more than this many points")
+    args = parser.parse_args()
+
+    loader = GoEmotionsLoader(data_dir=args.data_dir)
+    # Centroids are fitted on validation; the test split stays held out
+    fit_df = load_split(loader, "validation", args.data_dir, args.max_samples)
+    test_df = load_split(loader, "test", args.data_dir, args.max_samples)
+    fit_texts, fit_labels = fit_df["text"].tolist(), fit_df["emotion"].tolist()
+    test_texts, test_labels = test_df["text"].tolist(), test_df["emotion"].tolist()
+
+    reference = create_text_encoder(args.model_name, backend="eager", device="cpu",
+                                    num_threads=args.num_threads)
+    candidate = create_text_encoder(args.model_name, backend=args.backend,
+                                    num_threads=args.num_threads)
+
+    results = {}
+    for name, encoder in (("eager", reference), (args.backend, candidate)):
+        fit_emb, _ = encode_timed(encoder, fit_texts, args.batch_size)
+        test_emb, per_utterance = encode_timed(encoder, test_texts, args.batch_size)
+        predictions = nearest_centroid_predictions(fit_emb, fit_labels, test_emb)
+        accuracy = 100.0 * np.mean([p == t for p, t in zip(predictions, test_labels)])
+        results[name] = {
+            "test_emb": test_emb,
+            "predictions": predictions,
+            "accuracy": accuracy,
+            "latency_ms": per_utterance * 1000
+        }
+
+    ref, cand = results["eager"], results[args.backend]
+    cosine = torch.nn.functional.cosine_similarity(ref["test_emb"], cand["test_emb"], dim=1)
+    agreement = 100.0 * np.mean([a == b for a, b in zip(ref["predictions"], cand["predictions"])])
+    accuracy_drop = ref["accuracy"] - cand["accuracy"]
+
+    print("=" * 60)
+    print(f"Text encoder parity: eager vs {args.backend} ({len(test_texts)} held-out samples)")
+    print("=" * 60)
+    print(f"Embedding cosine similarity: mean {cosine.mean():.4f}, min {cosine.min():.4f}")
+    print(f"Prediction agreement:        {agreement:.2f}%")
+    print(f"Accuracy (nearest centroid): eager {ref['accuracy']:.2f}%, "
+          f"{args.backend} {cand['accuracy']:.2f}% (drop {accuracy_drop:+.2f})")
+    print(f"Latency per utterance:       eager {ref['latency_ms']:.2f} ms, "
+          f"{args.backend} {cand['latency_ms']:.2f} ms "
+          f"({ref['latency_ms'] / max(cand['latency_ms'], 1e-9):.2f}x)")
+
+    if cosine.mean() < args.min_cosine or accuracy_drop > args.max_accuracy_drop:
+        print("\nParity check FAILED")
+        sys.exit(1)
+    print("\nParity check passed")
+
+
+if __name__ == "__main__":
+    main()
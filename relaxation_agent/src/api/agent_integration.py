@@ -1,6 +1,7 @@
 """Agent Integration Endpoints - Voice, Route, and UI Agent communication."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, Dict, List
 import sys
@@ -8,10 +9,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.milestone_a.enhanced_pipeline import EnhancedRelaxationAgentPipeline
-from src.core.profile_interpreter import UserProfile
-from src.core.communicator import Communicator
-from src.core.config import Config
+from src.api.pipelines import get_enhanced_pipeline
+from src.core.profile_store import get_user_profile
 
 router = APIRouter(prefix="/api/agents", tags=["agent-integration"])
 
@@ -51,16 +50,13 @@ async def voice_agent_analyze(request: VoiceAgentRequest):
     - emotion: Detected emotion
     """
     try:
-        # Initialize enhanced pipeline if needed
-        global enhanced_pipeline
-        if enhanced_pipeline is None:
-            enhanced_pipeline = EnhancedRelaxationAgentPipeline(
-                enable_logging=True,
-                use_text_encoder=True,
-                use_fusion=request.acoustic_features is not None,
-                use_profile=True
-            )
-            enhanced_pipeline.communicator = Communicator()
+        # Same pipeline (and model weights) as the /api/v2 endpoints
+        enhanced_pipeline = await run_in_threadpool(
+            get_enhanced_pipeline,
+            use_text_encoder=True,
+            use_fusion=request.acoustic_features is not None,
+            use_profile=True
+        )
         
         # Get user profile if available
         user_profile = None
@@ -244,37 +240,3 @@ async def ui_agent_update(request: UIAgentRequest):
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-
-
-# Helper function (imported from main.py or defined here)
-import sqlite3
-
-def get_user_profile(user_id: str):
-    """Get user profile from database."""
-    try:
-        conn = sqlite3.connect(Config.DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM user_profiles WHERE user_id = ?",
-            (user_id,)
-        )
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return UserProfile(
-                user_id=row["user_id"],
-                profile_type=row["profile_type"],
-                stress_tolerance=row["stress_tolerance"],
-                custom_threshold=row["custom_threshold"],
-                created_at=row["created_at"],
-                updated_at=row["updated_at"]
-            )
-        return None
-    except Exception:
-        return None
-
-# Global enhanced pipeline (lazy-loaded)
-enhanced_pipeline = None
-
@@ -1,9 +1,14 @@
 """FastAPI main application for Relaxation Agent."""
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import (
+    FastAPI, HTTPException, UploadFile, File, Form, Query, Request, Response, WebSocket, WebSocketDisconnect
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, Dict, List
+import asyncio
+import json
 import uvicorn
 import numpy as np
 from pathlib import Path
@@ -13,14 +18,22 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.core.config import Config
-from src.milestone_a.text_prototype import RelaxationAgentPipeline
-from src.milestone_a.enhanced_pipeline import EnhancedRelaxationAgentPipeline
-from src.core.communicator import Communicator
+from src.core.model_registry import registry
+from src.core.database import get_database
+from src.core.profile_store import (
+    get_profile_store, get_user_profile, save_user_profile, delete_user_profile
+)
+from src.core.log_writer import close_log_writers
+from src.core.retention import RetentionManager
+from src.core.audio_workers import AudioFeatureService, AudioServiceBusy, ExtractionCancelled
+from src.api.pipelines import (
+    pipeline, communicator, get_enhanced_pipeline, enhanced_pipelines, start_warm_up, models_status
+)
+from src.api.sessions import StreamingSession, parse_audio_features
 from src.milestone_b.audio_features import AudioFeatureExtractor
 from src.core.profile_interpreter import ProfileInterpreter, UserProfile, ProfileType
 from src.api.agent_integration import router as agent_router
 from datetime import datetime
-import sqlite3
 
 app = FastAPI(
     title="Relaxation Agent API",
@@ -40,39 +53,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize pipelines (both original and enhanced)
-pipeline = RelaxationAgentPipeline(enable_logging=True)
-pipeline.communicator = Communicator()
-
-# Initialize enhanced pipeline (optional, lazy-loaded)
-enhanced_pipeline = None
+# Pipelines are shared with the agent router (see src.api.pipelines)
 profile_interpreter = ProfileInterpreter()
 audio_extractor = AudioFeatureExtractor()
 
-# Initialize profile database
-def init_profile_db():
-    """Initialize user profiles database table."""
-    db_path = Config.DATABASE_PATH
-    db_dir = Path(db_path).parent
-    db_dir.mkdir(parents=True, exist_ok=True)
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_profiles (
-            user_id TEXT PRIMARY KEY,
-            profile_type TEXT NOT NULL CHECK(profile_type IN ('ADHD', 'Autism', 'baseline')),
-            stress_tolerance REAL DEFAULT 60.0,
-            custom_threshold REAL,
-            created_at TEXT NOT NULL,
-            updated_at TEXT NOT NULL
-        )
-    """)
-    conn.commit()
-    conn.close()
+# Audio decoding / feature extraction runs in worker processes, off the event loop
+audio_service = AudioFeatureService(sample_rate=audio_extractor.sample_rate, n_mfcc=audio_extractor.n_mfcc)
+
+# Profiles are read through one cached store (creates the table on first use)
+get_profile_store()
+
+# Expires old log rows (exporting them to Parquet) on a background thread
+retention = RetentionManager(get_database(), export_dir=Config.RETENTION_EXPORT_DIR)
+
+
+@app.on_event("startup")
+async def warm_up():
+    """Load and warm the shared models (and audio workers) in the background."""
+    if Config.WARM_UP_MODELS:
+        start_warm_up()
+        audio_service.start()
+    else:
+        registry.mark_ready()
+
+
+@app.on_event("startup")
+async def start_retention():
+    """Start periodic retention (RETENTION_INTERVAL_HOURS=0 disables it)."""
+    if Config.RETENTION_INTERVAL_HOURS > 0:
+        retention.start(Config.RETENTION_INTERVAL_HOURS)
+
+
+@app.on_event("shutdown")
+async def shutdown_batchers():
+    """Stop the text encoder micro-batcher and the audio workers."""
+    for enhanced in enhanced_pipelines().values():
+        if enhanced.text_batcher is not None:
+            await enhanced.text_batcher.close()
+    audio_service.shutdown(wait=False)
+
 
-# Initialize on startup
-init_profile_db()
+@app.on_event("shutdown")
+async def flush_logs():
+    """Write any queued log rows and alerts before exiting."""
+    retention.stop()
+    close_log_writers()
+    await run_in_threadpool(communicator.close)
 
 
 # Request/Response models
@@ -99,11 +125,17 @@ class HealthResponse(BaseModel):
     status: str
     version: str
     redis_connected: bool
+    models_ready: bool = False
+    models: Dict = {}
+    log_writer: Optional[Dict] = None
+    publisher: Optional[Dict] = None
+    audio_workers: Optional[Dict] = None
 
 
 class EmotionHistoryResponse(BaseModel):
     history: List[Dict]
     count: int
+    next_cursor: Optional[str] = None
 
 
 # Enhanced pipeline request/response models
@@ -152,11 +184,17 @@ async def root():
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
-    redis_connected = pipeline.communicator.redis_client is not None
+    redis_connected = communicator.connected
+    status = models_status()
     return HealthResponse(
         status="healthy",
         version="0.1.0",
-        redis_connected=redis_connected
+        redis_connected=redis_connected,
+        models_ready=status["ready"],
+        models=status["models"],
+        log_writer=pipeline.logger.writer.stats() if pipeline.logger and pipeline.logger.writer else None,
+        publisher=communicator.stats(),
+        audio_workers=audio_service.stats()
     )
 
 
@@ -168,7 +206,8 @@ async def analyze_text(request: TextAnalysisRequest):
     This is the main endpoint for Milestone A (text prototype).
     """
     try:
-        result = pipeline.process_text(
+        result = await run_in_threadpool(
+            pipeline.process_text,
             text=request.text,
             user_id=request.user_id,
             publish_alerts=request.publish_alerts
@@ -181,31 +220,35 @@ async def analyze_text(request: TextAnalysisRequest):
 
 @app.post("/api/analyze/audio")
 async def analyze_audio(
+    request: Request,
     audio_file: UploadFile = File(...),
     user_id: Optional[str] = Form(None),
-    publish_alerts: bool = Form(True)
+    publish_alerts: bool = Form(True),
+    pcm_sample_rate: Optional[int] = Form(None)
 ):
     """
     Analyze audio file for emotion and stress.
     
     This endpoint requires Milestone B (audio features) to be fully functional.
+    Set pcm_sample_rate when uploading headerless 16-bit mono PCM.
     """
     try:
-        # Save uploaded file temporarily
-        temp_path = Path(f"./temp_{audio_file.filename}")
-        with open(temp_path, "wb") as f:
-            content = await audio_file.read()
-            f.write(content)
-        
-        # Extract audio features
-        audio_features = audio_extractor.extract_from_file(str(temp_path))
+        # Decode and extract in a worker process (cancelled if the client leaves)
+        audio_features = await audio_service.extract(
+            await audio_file.read(),
+            filename=audio_file.filename,
+            pcm_sample_rate=pcm_sample_rate,
+            is_disconnected=request.is_disconnected
+        )
         
         # Preprocess text (if available from STT, otherwise use empty)
         # In real scenario, Voice Agent would send both text and audio
         text_preprocessed = pipeline.text_preprocessor.preprocess("")
         
         # Classify emotion from audio
-        emotion_probs = pipeline.emotion_classifier.predict_from_audio(audio_features)
+        emotion_probs = await run_in_threadpool(
+            pipeline.emotion_classifier.predict_from_audio, audio_features
+        )
         top_emotion, top_prob = pipeline.emotion_classifier.get_top_emotion(emotion_probs)
         
         # Compute stress
@@ -236,17 +279,13 @@ async def analyze_audio(
             )
         
         # Publish alerts
-        if publish_alerts and stress_result["stress_level"] in ["high", "medium"]:
-            if pipeline.communicator:
-                pipeline.communicator.publish_stress_alert(
-                    stress_score=stress_result["stress_score"],
-                    stress_level=stress_result["stress_level"],
-                    emotion=top_emotion,
-                    user_id=user_id
-                )
-        
-        # Cleanup
-        temp_path.unlink()
+        if publish_alerts and pipeline.communicator:
+            pipeline.communicator.report_stress(
+                stress_score=stress_result["stress_score"],
+                stress_level=stress_result["stress_level"],
+                emotion=top_emotion,
+                user_id=user_id
+            )
         
         return {
             "emotion": {
@@ -258,16 +297,25 @@ async def analyze_audio(
             "coping_prompt": prompt_result,
             "user_id": user_id
         }
+    except AudioServiceBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ExtractionCancelled:
+        # Client closed the connection; nobody reads this response
+        return Response(status_code=499)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/analyze/combined")
 async def analyze_combined(
+    request: Request,
     text: str = Form(...),
     audio_file: Optional[UploadFile] = File(None),
     user_id: Optional[str] = Form(None),
-    publish_alerts: bool = Form(True)
+    publish_alerts: bool = Form(True),
+    pcm_sample_rate: Optional[int] = Form(None)
 ):
     """
     Analyze combined text and audio input.
@@ -275,23 +323,23 @@ async def analyze_combined(
     This is the ideal endpoint when Voice Agent sends both STT text and audio features.
     """
     try:
-        # Process text
-        text_preprocessed = pipeline.text_preprocessor.preprocess(text)
-        emotion_probs_text = pipeline.emotion_classifier.predict_from_text(text, text_preprocessed)
+        # Process text (cached for repeat utterances)
+        text_preprocessed, emotion_probs_text = pipeline.analyze_text(text)
         
         # Process audio if provided
         audio_features = None
         emotion_probs_audio = None
         
         if audio_file:
-            temp_path = Path(f"./temp_{audio_file.filename}")
-            with open(temp_path, "wb") as f:
-                content = await audio_file.read()
-                f.write(content)
-            
-            audio_features = audio_extractor.extract_from_file(str(temp_path))
-            emotion_probs_audio = pipeline.emotion_classifier.predict_from_audio(audio_features)
-            temp_path.unlink()
+            audio_features = await audio_service.extract(
+                await audio_file.read(),
+                filename=audio_file.filename,
+                pcm_sample_rate=pcm_sample_rate,
+                is_disconnected=request.is_disconnected
+            )
+            emotion_probs_audio = await run_in_threadpool(
+                pipeline.emotion_classifier.predict_from_audio, audio_features
+            )
         
         # Combine emotion probabilities (weighted average)
         if emotion_probs_audio:
@@ -339,14 +387,13 @@ async def analyze_combined(
             )
         
         # Publish alerts
-        if publish_alerts and stress_result["stress_level"] in ["high", "medium"]:
-            if pipeline.communicator:
-                pipeline.communicator.publish_stress_alert(
-                    stress_score=stress_result["stress_score"],
-                    stress_level=stress_result["stress_level"],
-                    emotion=top_emotion,
-                    user_id=user_id
-                )
+        if publish_alerts and pipeline.communicator:
+            pipeline.communicator.report_stress(
+                stress_score=stress_result["stress_score"],
+                stress_level=stress_result["stress_level"],
+                emotion=top_emotion,
+                user_id=user_id
+            )
         
         return {
             "input_text": text,
@@ -359,24 +406,62 @@ async def analyze_combined(
             "coping_prompt": prompt_result,
             "user_id": user_id
         }
+    except AudioServiceBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ExtractionCancelled:
+        # Client closed the connection; nobody reads this response
+        return Response(status_code=499)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated ?fields= projection."""
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
 @app.get("/api/history", response_model=EmotionHistoryResponse)
 async def get_emotion_history(
     user_id: Optional[str] = None,
-    limit: int = 100
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    stress_level: Optional[str] = None,
+    fields: Optional[str] = None
 ):
-    """Get emotion analysis history."""
+    """
+    Get emotion analysis history, newest first.
+    
+    Pass `next_cursor` back as `cursor` for the next page. Blob columns
+    (emotion_probs, audio_features, metadata) are only read and decoded
+    when listed in `fields` (comma-separated, or `*` for all columns).
+    """
     if not pipeline.logger:
         raise HTTPException(status_code=503, detail="Logging not enabled")
     
-    history = pipeline.logger.get_emotion_history(user_id=user_id, limit=limit)
+    try:
+        page = pipeline.logger.query_emotion_history(
+            user_id=user_id,
+            stress_level=stress_level,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit,
+            fields=parse_fields(fields),
+            decode=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return EmotionHistoryResponse(
-        history=history,
-        count=len(history)
+        history=page["items"],
+        count=len(page["items"]),
+        next_cursor=page["next_cursor"]
     )
 
 
@@ -384,21 +469,111 @@ async def get_emotion_history(
 async def get_stress_alerts(
     user_id: Optional[str] = None,
     stress_level: Optional[str] = None,
-    limit: int = 100
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = None
 ):
-    """Get stress alert history."""
+    """Get stress alert history, newest first (paginated like /api/history)."""
     if not pipeline.logger:
         raise HTTPException(status_code=503, detail="Logging not enabled")
     
-    alerts = pipeline.logger.get_stress_alerts(
+    try:
+        page = pipeline.logger.query_stress_alerts(
+            user_id=user_id,
+            stress_level=stress_level,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit,
+            fields=parse_fields(fields),
+            decode=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "alerts": page["items"],
+        "count": len(page["items"]),
+        "next_cursor": page["next_cursor"]
+    }
+
+
+@app.get("/api/trends/stress")
+async def get_stress_trend(
+    user_id: Optional[str] = None,
+    granularity: str = Query("hour", pattern="^(minute|hour|day)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """
+    Get per-bucket stress mean/max/count and emotion distribution.
+    
+    Served from rollup tables maintained on insert. Without `since`, the
+    window is the last hour (minute), day (hour) or 30 days (day).
+    """
+    if not pipeline.logger:
+        raise HTTPException(status_code=503, detail="Logging not enabled")
+    
+    buckets = pipeline.logger.get_stress_trend(
+        granularity=granularity,
         user_id=user_id,
-        stress_level=stress_level,
-        limit=limit
+        since=since,
+        until=until
     )
     
     return {
-        "alerts": alerts,
-        "count": len(alerts)
+        "user_id": user_id,
+        "granularity": granularity,
+        "buckets": buckets,
+        "count": len(buckets)
+    }
+
+
+@app.post("/api/retention/run")
+async def run_retention():
+    """Run a retention pass now (export + delete expired rows, compact rollups, vacuum)."""
+    try:
+        return await run_in_threadpool(retention.run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/retention/vacuum")
+async def run_full_vacuum():
+    """Rewrite the database with a full VACUUM (operator action; blocks writers while it runs)."""
+    try:
+        return await run_in_threadpool(retention.full_vacuum)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/retention")
+async def get_retention_status():
+    """Get retention settings and the last run's results."""
+    return {
+        "table_ttl_days": retention.table_ttl_days,
+        "rollup_ttl_days": retention.rollup_ttl_days,
+        "export_dir": retention.export_dir,
+        "last_run": retention.last_run
+    }
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get text analysis / profile cache hit rates and encoder batching metrics."""
+    enhanced = enhanced_pipelines()
+    text_batcher = next(
+        (p.text_batcher for p in enhanced.values() if p.text_batcher is not None), None
+    )
+    return {
+        "text_pipeline": pipeline.analysis_cache.stats() if pipeline.analysis_cache else None,
+        "enhanced_pipeline": {
+            name: p.analysis_cache.stats() for name, p in enhanced.items() if p.analysis_cache
+        } or None,
+        "text_encoder_batching": text_batcher.stats() if text_batcher else None,
+        "profiles": get_profile_store().stats()
     }
 
 
@@ -417,37 +592,41 @@ async def analyze_enhanced(request: EnhancedAnalysisRequest):
     - Profile-conditioned interpretation (optional)
     - Strategy-based coping prompts
     """
-    global enhanced_pipeline
-    
     try:
-        # Lazy-load enhanced pipeline
-        if enhanced_pipeline is None:
-            enhanced_pipeline = EnhancedRelaxationAgentPipeline(
-                enable_logging=True,
-                use_text_encoder=request.use_text_encoder,
-                use_fusion=request.use_fusion,
-                use_profile=request.use_profile
-            )
-            enhanced_pipeline.communicator = Communicator()
+        # Pipeline variant for this request's flags (models are shared)
+        # (off the event loop: the first call may wait for model warm-up)
+        enhanced_pipeline = await run_in_threadpool(
+            get_enhanced_pipeline,
+            use_text_encoder=request.use_text_encoder,
+            use_fusion=request.use_fusion,
+            use_profile=request.use_profile
+        )
         
         # Get or create user profile
         user_profile = None
         if request.user_id and request.use_profile:
-            user_profile = get_user_profile(request.user_id)
+            user_profile = await run_in_threadpool(get_user_profile, request.user_id)
             if user_profile is None and request.profile_type:
                 # Create default profile
                 user_profile = profile_interpreter.create_default_profile(
                     request.user_id,
                     request.profile_type
                 )
-                save_user_profile(user_profile)
+                await run_in_threadpool(save_user_profile, user_profile)
+        
+        # Encode text via the micro-batcher (shares a forward pass with concurrent requests)
+        text_embedding = None
+        if request.text:
+            text_embedding = await enhanced_pipeline.encode_text_async(request.text)
         
-        # Process with enhanced pipeline
-        result = enhanced_pipeline.process(
+        # Process with enhanced pipeline (inference and logging stay off the event loop)
+        result = await run_in_threadpool(
+            enhanced_pipeline.process,
             text=request.text,
             user_profile=user_profile,
             user_id=request.user_id,
-            publish_alerts=request.publish_alerts
+            publish_alerts=request.publish_alerts,
+            text_embedding=text_embedding
         )
         
         return result
@@ -455,6 +634,111 @@ async def analyze_enhanced(request: EnhancedAnalysisRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/ws/session")
+async def analysis_session(
+    websocket: WebSocket,
+    user_id: Optional[str] = None,
+    profile_type: Optional[ProfileType] = None,
+    publish_alerts: bool = True,
+    use_text_encoder: bool = True,
+    use_fusion: bool = True,
+    use_profile: bool = True
+):
+    """
+    Streaming analysis session for continuous (in-car) use.
+    
+    The pipeline and profile are set up once per connection; the client then
+    sends frames and receives an update whenever the smoothed emotion or
+    stress state changes (see StreamingSession).
+    
+    Client messages (JSON):
+        {"type": "frame", "text": "...", "audio_features": {...}}  (either or both)
+        {"type": "ping"}  -> current state
+        {"type": "end"}   -> close the session
+    
+    Server messages:
+        {"type": "session", ...} on connect
+        {"type": "update", ...} when the state changes
+        {"type": "state", ...} in reply to ping
+        {"type": "error", "detail": ...} for a bad frame (the session stays open),
+            or if setup fails (then the socket closes with code 1011)
+    """
+    await websocket.accept()
+    
+    try:
+        enhanced_pipeline = await run_in_threadpool(
+            get_enhanced_pipeline,
+            use_text_encoder=use_text_encoder,
+            use_fusion=use_fusion,
+            use_profile=use_profile
+        )
+        
+        # Profile lookup once per session rather than per analysis
+        user_profile = None
+        if user_id and use_profile:
+            user_profile = await run_in_threadpool(get_user_profile, user_id)
+            if user_profile is None and profile_type:
+                user_profile = profile_interpreter.create_default_profile(user_id, profile_type)
+                await run_in_threadpool(save_user_profile, user_profile)
+    except Exception as e:
+        # The session cannot start; tell the client why before closing
+        await websocket.send_json({"type": "error", "detail": f"Session setup failed: {e}"})
+        await websocket.close(code=1011)
+        return
+    
+    session = StreamingSession(
+        enhanced_pipeline,
+        user_id=user_id,
+        user_profile=user_profile,
+        publish_alerts=publish_alerts
+    )
+    await websocket.send_json({
+        "type": "session",
+        "user_id": user_id,
+        "profile_type": user_profile.profile_type if user_profile else None
+    })
+    
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError as e:
+                await websocket.send_json({"type": "error", "detail": f"Invalid JSON: {e}"})
+                continue
+            
+            kind = message.get("type", "frame")
+            if kind == "end":
+                break
+            if kind == "ping":
+                await websocket.send_json({"type": "state", **session.state()})
+                continue
+            if kind != "frame":
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+                continue
+            
+            text = message.get("text")
+            features = message.get("audio_features")
+            if not text and not features:
+                await websocket.send_json({"type": "error", "detail": "Frame needs text or audio_features"})
+                continue
+            
+            try:
+                audio_features = parse_audio_features(features) if features else None
+                text_embedding = await enhanced_pipeline.encode_text_async(text) if text else None
+                result = await run_in_threadpool(session.analyze, text, audio_features, text_embedding)
+            except Exception as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            
+            update = session.update(result)
+            if update is not None:
+                await websocket.send_json(update)
+    except WebSocketDisconnect:
+        return
+    
+    await websocket.close()
+
+
 # ============================================================================
 # Profile Management Endpoints
 # ============================================================================
@@ -532,14 +816,7 @@ async def update_profile(user_id: str, profile: UserProfileRequest):
 async def delete_profile(user_id: str):
     """Delete user profile."""
     try:
-        conn = sqlite3.connect(Config.DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM user_profiles WHERE user_id = ?", (user_id,))
-        conn.commit()
-        deleted = cursor.rowcount > 0
-        conn.close()
-        
-        if not deleted:
+        if not delete_user_profile(user_id):
             raise HTTPException(status_code=404, detail="Profile not found")
         
         return {"message": "Profile deleted successfully"}
@@ -549,54 +826,6 @@ async def delete_profile(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Helper functions for profile management
-def get_user_profile(user_id: str) -> Optional[UserProfile]:
-    """Get user profile from database."""
-    try:
-        conn = sqlite3.connect(Config.DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM user_profiles WHERE user_id = ?",
-            (user_id,)
-        )
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return UserProfile(
-                user_id=row["user_id"],
-                profile_type=row["profile_type"],
-                stress_tolerance=row["stress_tolerance"],
-                custom_threshold=row["custom_threshold"],
-                created_at=row["created_at"],
-                updated_at=row["updated_at"]
-            )
-        return None
-    except Exception:
-        return None
-
-
-def save_user_profile(profile: UserProfile):
-    """Save user profile to database."""
-    conn = sqlite3.connect(Config.DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT OR REPLACE INTO user_profiles 
-        (user_id, profile_type, stress_tolerance, custom_threshold, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        profile.user_id,
-        profile.profile_type,
-        profile.stress_tolerance,
-        profile.custom_threshold,
-        profile.created_at,
-        profile.updated_at
-    ))
-    conn.commit()
-    conn.close()
-
-
 # Import datetime for profile updates
 from datetime import datetime
 
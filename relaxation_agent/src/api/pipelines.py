@@ -0,0 +1,99 @@
+"""Shared pipeline instances for the API routers."""
+
+import logging
+import threading
+from typing import Dict, Tuple
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.milestone_a.text_prototype import RelaxationAgentPipeline
+from src.milestone_a.enhanced_pipeline import EnhancedRelaxationAgentPipeline
+from src.core.communicator import Communicator
+from src.core.model_registry import registry, get_acoustic_encoder
+
+logger = logging.getLogger("relaxation_agent.pipelines")
+
+# One Redis/HTTP client for every pipeline
+communicator = Communicator()
+
+# Original (Milestone A) pipeline
+pipeline = RelaxationAgentPipeline(enable_logging=True)
+pipeline.communicator = communicator
+
+# Enhanced pipelines, one per flag combination; models come from the
+# shared registry, so each variant only adds its lightweight stages
+_enhanced_pipelines: Dict[Tuple[bool, bool, bool], EnhancedRelaxationAgentPipeline] = {}
+_enhanced_lock = threading.Lock()
+
+
+def get_enhanced_pipeline(
+    use_text_encoder: bool = True,
+    use_fusion: bool = True,
+    use_profile: bool = True
+) -> EnhancedRelaxationAgentPipeline:
+    """
+    Get the enhanced pipeline for a combination of request flags.
+
+    Args:
+        use_text_encoder: Use the DistilBERT text encoder
+        use_fusion: Use multimodal fusion
+        use_profile: Use profile-conditioned interpretation
+
+    Returns:
+        Shared pipeline instance for these flags
+    """
+    key = (use_text_encoder, use_fusion, use_profile)
+    enhanced = _enhanced_pipelines.get(key)
+    if enhanced is None:
+        with _enhanced_lock:
+            enhanced = _enhanced_pipelines.get(key)
+            if enhanced is None:
+                enhanced = EnhancedRelaxationAgentPipeline(
+                    enable_logging=True,
+                    use_text_encoder=use_text_encoder,
+                    use_fusion=use_fusion,
+                    use_profile=use_profile
+                )
+                enhanced.communicator = communicator
+                _enhanced_pipelines[key] = enhanced
+    return enhanced
+
+
+def enhanced_pipelines() -> Dict[str, EnhancedRelaxationAgentPipeline]:
+    """Enhanced pipelines built so far, keyed by a readable flag string."""
+    return {
+        f"text_encoder={k[0]},fusion={k[1]},profile={k[2]}": v
+        for k, v in list(_enhanced_pipelines.items())
+    }
+
+
+def warm_up_models():
+    """
+    Load and warm the shared models by building the default enhanced
+    pipeline, then mark the registry ready. Failures are recorded in the
+    registry status rather than raised.
+    """
+    try:
+        get_enhanced_pipeline()
+        get_acoustic_encoder()
+    except Exception as e:
+        logger.exception(f"Model warm-up failed: {e}")
+    finally:
+        registry.mark_ready()
+
+
+def start_warm_up() -> threading.Thread:
+    """Run warm_up_models on a background thread so /health answers meanwhile."""
+    thread = threading.Thread(target=warm_up_models, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def models_status() -> Dict:
+    """Readiness summary for the health check."""
+    return {
+        "ready": registry.ready,
+        "models": registry.status()
+    }
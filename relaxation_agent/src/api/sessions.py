@@ -0,0 +1,173 @@
+"""Per-connection state for streaming (WebSocket) analysis sessions."""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+
+from src.core.config import Config
+from src.core.profile_interpreter import UserProfile
+from src.milestone_a.enhanced_pipeline import EnhancedRelaxationAgentPipeline
+
+
+LEVEL_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+def parse_audio_features(features: Dict) -> Dict:
+    """Audio features from a JSON frame: numeric lists become float32 arrays."""
+    parsed = {}
+    for name, value in features.items():
+        if isinstance(value, list):
+            parsed[name] = np.asarray(value, dtype=np.float32)
+        else:
+            parsed[name] = value
+    return parsed
+
+
+class StreamingSession:
+    """
+    State for one continuous analysis session (e.g. a drive).
+
+    The pipeline variant and user profile are resolved once when the
+    session opens instead of per request. Every frame still runs through
+    the pipeline, but what the client sees is smoothed: emotion
+    probabilities and the stress score follow an exponential moving
+    average, and the stress level only changes once a new level has been
+    seen on `confirm_frames` consecutive frames. `update` returns a message
+    only when the smoothed top emotion or level changes, or the smoothed
+    score moves by at least `min_score_change`.
+    """
+
+    def __init__(
+        self,
+        pipeline: EnhancedRelaxationAgentPipeline,
+        user_id: Optional[str] = None,
+        user_profile: Optional[UserProfile] = None,
+        publish_alerts: bool = True,
+        smoothing: Optional[float] = None,
+        min_score_change: Optional[float] = None,
+        confirm_frames: Optional[int] = None
+    ):
+        """
+        Initialize session.
+
+        Args:
+            pipeline: Shared pipeline variant for this session
+            user_id: Optional user identifier
+            user_profile: Profile loaded once for the session
+            publish_alerts: Whether frames publish (debounced) stress alerts
+            smoothing: Weight of the newest frame in the moving average (0-1]
+            min_score_change: Smoothed score change that triggers an update
+            confirm_frames: Consecutive frames needed before the level changes
+        """
+        self.pipeline = pipeline
+        self.user_id = user_id
+        self.user_profile = user_profile
+        self.publish_alerts = publish_alerts
+        self.smoothing = smoothing if smoothing is not None else Config.SESSION_SMOOTHING
+        self.min_score_change = min_score_change if min_score_change is not None else Config.SESSION_MIN_SCORE_CHANGE
+        self.confirm_frames = confirm_frames or Config.SESSION_LEVEL_CONFIRM_FRAMES
+
+        self.frames = 0
+        self.emotions: Dict[str, float] = {}
+        self.stress_score: Optional[float] = None
+        self.stress_level: Optional[str] = None
+        self._candidate_level: Optional[str] = None
+        self._candidate_count = 0
+        self._pushed: Optional[Dict] = None
+
+    def analyze(
+        self,
+        text: Optional[str] = None,
+        audio_features: Optional[Dict] = None,
+        text_embedding: Optional[torch.Tensor] = None
+    ) -> Dict:
+        """Run one frame through the pipeline (blocking; call off the event loop)."""
+        return self.pipeline.process(
+            text=text,
+            audio_features=audio_features,
+            user_profile=self.user_profile,
+            user_id=self.user_id,
+            publish_alerts=self.publish_alerts,
+            text_embedding=text_embedding
+        )
+
+    def _smooth(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return (1 - self.smoothing) * previous + self.smoothing * value
+
+    def _confirm_level(self, level: str) -> str:
+        """Level after this frame, requiring `confirm_frames` in a row to change."""
+        if self.stress_level is None or level == self.stress_level:
+            self._candidate_level, self._candidate_count = None, 0
+            return level
+        if level == self._candidate_level:
+            self._candidate_count += 1
+        else:
+            self._candidate_level, self._candidate_count = level, 1
+        if self._candidate_count >= self.confirm_frames:
+            self._candidate_level, self._candidate_count = None, 0
+            return level
+        return self.stress_level
+
+    def state(self) -> Dict:
+        """Current smoothed state."""
+        top_emotion, probability = (
+            max(self.emotions.items(), key=lambda x: x[1]) if self.emotions else (None, None)
+        )
+        return {
+            "frame": self.frames,
+            "top_emotion": top_emotion,
+            "probability": probability,
+            "emotions": dict(self.emotions),
+            "stress_score": self.stress_score,
+            "stress_level": self.stress_level,
+        }
+
+    def update(self, result: Dict) -> Optional[Dict]:
+        """
+        Fold a pipeline result into the session state.
+
+        Args:
+            result: Output of analyze()
+
+        Returns:
+            Update message if the client-visible state changed, else None
+        """
+        self.frames += 1
+        stress = result["stress"]
+        raw_score = stress.get("stress_score_normalized", stress["stress_score"])
+
+        for emotion, p in result["emotion"]["all_emotions"].items():
+            self.emotions[emotion] = self._smooth(self.emotions.get(emotion), p)
+        self.stress_score = self._smooth(self.stress_score, raw_score)
+        self.stress_level = self._confirm_level(stress["stress_level"])
+
+        state = self.state()
+        changed: List[str] = []
+        if self._pushed is None:
+            changed.append("initial")
+        else:
+            if state["top_emotion"] != self._pushed["top_emotion"]:
+                changed.append("top_emotion")
+            if state["stress_level"] != self._pushed["stress_level"]:
+                changed.append("stress_level")
+            if abs(state["stress_score"] - self._pushed["stress_score"]) >= self.min_score_change:
+                changed.append("stress_score")
+        if not changed:
+            return None
+
+        self._pushed = state
+        return {
+            "type": "update",
+            "changed": changed,
+            **state,
+            "raw": {
+                "top_emotion": result["emotion"]["top_emotion"],
+                "stress_score": raw_score,
+                "stress_level": stress["stress_level"],
+            },
+            "coping_prompt": result["coping_prompt"],
+            "voice_output": result["voice_output"],
+        }
@@ -0,0 +1,82 @@
+"""Inference-only builds of the acoustic models (TorchScript, dynamic int8)."""
+
+from pathlib import Path
+from typing import Optional, Union
+
+import torch
+import torch.nn as nn
+
+from .config import Config
+
+
+# eager: fp32 nn.Module; int8: LSTM/Linear weights dynamically quantized;
+# torchscript(_int8): the same, scripted and frozen into a standalone graph
+ACOUSTIC_BACKENDS = ("eager", "int8", "torchscript", "torchscript_int8")
+
+AcousticModel = Union[nn.Module, torch.jit.ScriptModule]
+
+
+def optimize_acoustic_model(model: nn.Module, backend: Optional[str] = None) -> AcousticModel:
+    """
+    Prepare an acoustic model (CNNLSTMEmotionClassifier, AcousticEmotionEncoder) for CPU inference.
+
+    The model is always switched to eval() first (dropout off, BatchNorm
+    running statistics). int8 backends quantize the LSTM and Linear weights
+    dynamically; the convolutions stay fp32. TorchScript backends script and
+    freeze the result, which folds constants and removes Python overhead
+    from the forward pass.
+
+    Args:
+        model: Trained (or freshly built) model
+        backend: One of ACOUSTIC_BACKENDS (default: Config.ACOUSTIC_BACKEND)
+
+    Returns:
+        Model ready to call under torch.inference_mode()
+    """
+    backend = backend or Config.ACOUSTIC_BACKEND
+    if backend not in ACOUSTIC_BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Choose from {ACOUSTIC_BACKENDS}")
+    if isinstance(model, torch.jit.ScriptModule):
+        # Already exported: the backend was chosen at export time
+        return model.eval()
+
+    model = model.cpu().eval()
+    if backend.endswith("int8"):
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {nn.LSTM, nn.Linear}, dtype=torch.qint8
+        )
+    if backend.startswith("torchscript"):
+        model = torch.jit.freeze(torch.jit.script(model))
+    return model
+
+
+def export_acoustic_model(model: nn.Module, path: str, backend: str = "torchscript_int8") -> str:
+    """
+    Save an acoustic model as a TorchScript archive that loads without the model class.
+
+    Args:
+        model: Model to export
+        path: Output file
+        backend: 'torchscript' or 'torchscript_int8'
+
+    Returns:
+        The path written
+    """
+    if not backend.startswith("torchscript"):
+        raise ValueError(f"Export needs a TorchScript backend, got: {backend}")
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    torch.jit.save(optimize_acoustic_model(model, backend), path)
+    return path
+
+
+def load_acoustic_model(path: str) -> Optional[torch.jit.ScriptModule]:
+    """
+    Load an exported acoustic model.
+
+    Returns:
+        The model in eval mode, or None if `path` is not a TorchScript archive
+    """
+    try:
+        return torch.jit.load(path, map_location="cpu").eval()
+    except RuntimeError:
+        return None
@@ -0,0 +1,167 @@
+"""Per-user debouncing and coalescing of stress alerts."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from .config import Config
+
+
+LEVEL_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+@dataclass
+class _UserState:
+    level: str
+    entry_score: float       # score when the current level was entered
+    emitted_score: float     # score of the last emitted alert
+    emitted_at: float
+    coalesced: int = 0       # samples suppressed since the last alert
+    peak_score: float = 0.0  # highest suppressed score since the last alert
+
+
+class AlertAggregator:
+    """
+    Decides which stress samples become alerts.
+
+    A continuously talking user yields a stress sample per utterance; most
+    of them repeat the previous alert. Per user, an alert is emitted when:
+
+    - the level rises (always, immediately);
+    - the level falls and the score is at least `hysteresis` below the
+      score at which the current level was entered (so a score hovering
+      around a threshold does not flap), and `min_interval_s` has passed;
+    - the level is unchanged but the score moved by at least `score_delta`
+      since the last alert, and `min_interval_s` has passed.
+
+    Everything else is counted and folded into the next alert's
+    `coalesced` / `peak_score`. Falls to "low" update the state but are only
+    emitted when `emit_recovery` is set, since consumers have so far only
+    received medium/high alerts.
+    """
+
+    def __init__(
+        self,
+        min_interval_s: Optional[float] = None,
+        score_delta: Optional[float] = None,
+        hysteresis: Optional[float] = None,
+        emit_recovery: Optional[bool] = None,
+        max_users: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize aggregator.
+
+        Args:
+            min_interval_s: Minimum seconds between non-escalation alerts per user
+            score_delta: Score change that counts as significant within a level
+            hysteresis: Score margin required before a level may fall
+            emit_recovery: Emit an alert when a user falls back to "low"
+            max_users: Users tracked before the least recently seen is dropped
+            clock: Monotonic time source (seconds)
+        """
+        self.min_interval_s = min_interval_s if min_interval_s is not None else Config.ALERT_MIN_INTERVAL_S
+        self.score_delta = score_delta if score_delta is not None else Config.ALERT_SCORE_DELTA
+        self.hysteresis = hysteresis if hysteresis is not None else Config.ALERT_HYSTERESIS
+        self.emit_recovery = emit_recovery if emit_recovery is not None else Config.ALERT_EMIT_RECOVERY
+        self.max_users = max_users
+        self.clock = clock
+        self._users: "OrderedDict[str, _UserState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.offered = 0
+        self.emitted = 0
+
+    def _decide(self, state: Optional[_UserState], score: float, level: str, now: float) -> Optional[str]:
+        """Reason to emit, or None to suppress."""
+        if state is None:
+            return "first" if level != "low" else None
+
+        rank, previous = LEVEL_RANK.get(level, 0), LEVEL_RANK.get(state.level, 0)
+        interval_passed = now - state.emitted_at >= self.min_interval_s
+
+        if rank > previous:
+            return "escalation"
+        if rank < previous:
+            if score > state.entry_score - self.hysteresis or not interval_passed:
+                return None
+            return "deescalation"
+        if abs(score - state.emitted_score) >= self.score_delta and interval_passed:
+            return "score_change"
+        return None
+
+    def offer(self, user_id: Optional[str], stress_score: float, stress_level: str) -> Optional[Dict]:
+        """
+        Feed one stress sample.
+
+        Args:
+            user_id: User identifier (samples without one are never suppressed)
+            stress_score: Stress score (0-1)
+            stress_level: "high", "medium", or "low"
+
+        Returns:
+            Alert metadata (reason, previous_level, coalesced, peak_score) if an
+            alert should be published, else None
+        """
+        if user_id is None:
+            return {"reason": "untracked"} if stress_level != "low" else None
+
+        with self._lock:
+            self.offered += 1
+            now = self.clock()
+            state = self._users.get(user_id)
+            if state is not None:
+                self._users.move_to_end(user_id)
+
+            reason = self._decide(state, stress_score, stress_level, now)
+            if reason is None:
+                if state is not None:
+                    state.coalesced += 1
+                    state.peak_score = max(state.peak_score, stress_score)
+                return None
+
+            previous_level = state.level if state else None
+            summary = {
+                "reason": reason,
+                "previous_level": previous_level,
+                "coalesced": state.coalesced if state else 0,
+                "peak_score": max(state.peak_score, stress_score) if state else stress_score,
+            }
+
+            if state is None:
+                self._users[user_id] = _UserState(stress_level, stress_score, stress_score, now)
+                if len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                if stress_level != state.level:
+                    state.level = stress_level
+                    state.entry_score = stress_score
+                state.emitted_score = stress_score
+                state.emitted_at = now
+                state.coalesced = 0
+                state.peak_score = 0.0
+
+            if stress_level == "low" and not self.emit_recovery:
+                return None
+            self.emitted += 1
+            return summary
+
+    def reset(self, user_id: Optional[str] = None):
+        """Forget one user's state (or everyone's)."""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        """Get suppression metrics."""
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "offered": self.offered,
+                "emitted": self.emitted,
+                "suppressed": self.offered - self.emitted,
+            }
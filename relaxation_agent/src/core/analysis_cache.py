@@ -0,0 +1,129 @@
+"""Content-addressed cache for text analysis results."""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache lookup (case-folded, whitespace collapsed)."""
+    return " ".join(text.split()).casefold()
+
+
+class AnalysisCache:
+    """
+    LRU cache for per-utterance analysis results.
+
+    In-car utterances are short and highly repetitive, so preprocessing
+    output, emotion probabilities and encoder embeddings are memoized by a
+    hash of the normalized text plus any options that affect the result.
+    Entries are namespaced so different stages never collide. Values are
+    deep-copied in and out, so callers may mutate what they get (e.g. the
+    preprocessed `tokens` list) without corrupting the cache.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize analysis cache.
+
+        Args:
+            max_size: Maximum number of entries before LRU eviction
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(namespace: str, text: str, **options) -> str:
+        """
+        Build a content-addressed key.
+
+        Args:
+            namespace: Stage name (e.g. 'preprocess', 'text_embedding')
+            text: Raw input text (normalized before hashing)
+            **options: Settings that change the cached result (pooling, profile, ...)
+
+        Returns:
+            Hex digest identifying the entry
+        """
+        payload = json.dumps(
+            [namespace, normalize_text(text), options],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, text: str, **options) -> Optional[Any]:
+        """Return a copy of the cached value or None, updating hit/miss counters."""
+        key = self.make_key(namespace, text, **options)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = self._entries[key]
+            else:
+                self.misses += 1
+                return None
+        return copy.deepcopy(value)
+
+    def put(self, namespace: str, text: str, value: Any, **options):
+        """Store a copy of a value, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        key = self.make_key(namespace, text, **options)
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        text: str,
+        compute: Callable[[], Any],
+        **options
+    ) -> Any:
+        """
+        Return the cached value, computing and storing it on a miss.
+
+        Args:
+            namespace: Stage name
+            text: Raw input text
+            compute: Zero-argument callable producing the value
+            **options: Settings that change the result
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(namespace, text, **options)
+        if value is None:
+            value = compute()
+            self.put(namespace, text, value, **options)
+        return value
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Get size and hit-rate metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,112 @@
+"""Decoding uploaded audio in memory (no files in the working directory)."""
+
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+
+AudioSource = Union[bytes, bytearray, memoryview, BinaryIO]
+
+
+def _as_file(source: AudioSource) -> BinaryIO:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def decode_pcm16(data: Union[bytes, bytearray, memoryview], channels: int = 1) -> np.ndarray:
+    """
+    Decode headerless little-endian 16-bit PCM to float32 in [-1, 1].
+
+    Args:
+        data: Raw PCM bytes
+        channels: Interleaved channel count (averaged to mono)
+
+    Returns:
+        Mono float32 signal
+    """
+    samples = np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples.astype(np.float32) / 32768.0
+
+
+def _decode_spilled(fileobj: BinaryIO, filename: Optional[str]) -> Tuple[np.ndarray, int]:
+    """Fallback for formats libsndfile can't read: decode from a private temp file."""
+    import librosa
+
+    suffix = Path(filename).suffix if filename else ""
+    fd, path = tempfile.mkstemp(prefix="relaxation_audio_", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as spill:
+            shutil.copyfileobj(fileobj, spill)
+        y, sr = librosa.load(path, sr=None, mono=True)
+        return y, sr
+    finally:
+        os.unlink(path)
+
+
+def load_audio(
+    source: AudioSource,
+    sample_rate: Optional[int] = None,
+    filename: Optional[str] = None,
+    pcm_sample_rate: Optional[int] = None,
+    pcm_channels: int = 1
+) -> Tuple[np.ndarray, int]:
+    """
+    Decode audio from bytes or a binary file object.
+
+    Containers libsndfile understands (WAV, FLAC, OGG, and MP3 with
+    libsndfile >= 1.1) are decoded straight from the buffer. Anything else
+    is copied to a unique temporary file for librosa/audioread and removed
+    afterwards. Headerless PCM is read with np.frombuffer when
+    `pcm_sample_rate` is given.
+
+    Args:
+        source: Encoded audio (bytes, or a seekable binary file such as UploadFile.file)
+        sample_rate: Resample to this rate (None keeps the native rate)
+        filename: Original file name (its extension helps the fallback decoder)
+        pcm_sample_rate: Treat the input as raw 16-bit PCM at this rate
+        pcm_channels: Channel count for raw PCM
+
+    Returns:
+        (mono float32 signal, sample rate)
+    """
+    fileobj = _as_file(source)
+
+    if pcm_sample_rate:
+        y, sr = decode_pcm16(fileobj.read(), pcm_channels), pcm_sample_rate
+    else:
+        decoded = None
+        if SOUNDFILE_AVAILABLE:
+            start = fileobj.tell()
+            try:
+                decoded = sf.read(fileobj, dtype="float32", always_2d=False)
+            except RuntimeError:
+                # Not a container libsndfile knows (LibsndfileError is a RuntimeError)
+                fileobj.seek(start)
+        if decoded is not None:
+            y, sr = decoded
+            if y.ndim > 1:
+                y = y.mean(axis=1)
+        else:
+            y, sr = _decode_spilled(fileobj, filename)
+
+    if sample_rate and sr != sample_rate:
+        import librosa
+
+        # Same resampler librosa.load uses, so features match file-based extraction
+        y = librosa.resample(y, orig_sr=sr, target_sr=sample_rate, res_type="soxr_hq")
+        sr = sample_rate
+    return np.ascontiguousarray(y, dtype=np.float32), sr
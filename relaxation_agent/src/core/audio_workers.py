@@ -0,0 +1,266 @@
+"""Audio feature extraction in a bounded worker process pool."""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional
+
+import numpy as np
+
+from .config import Config
+
+
+class AudioServiceBusy(Exception):
+    """Raised when too many extractions are already pending."""
+
+
+class ExtractionCancelled(Exception):
+    """Raised when the caller went away before the features were ready."""
+
+
+# Per-worker extractor, created by _init_worker
+_extractor = None
+
+
+def _init_worker(sample_rate: int, n_mfcc: int, profile: Optional[str] = None):
+    """Import librosa and run one extraction so the first request isn't paying for it."""
+    global _extractor
+    from src.milestone_b.audio_features import AudioFeatureExtractor
+
+    _extractor = AudioFeatureExtractor(sample_rate=sample_rate, n_mfcc=n_mfcc, profile=profile)
+    try:
+        noise = np.random.default_rng(0).standard_normal(sample_rate // 2).astype(np.float32) * 0.01
+        _extractor.extract_from_array(noise, sample_rate)
+    except ImportError:
+        # librosa missing: requests will report it
+        pass
+
+
+def _extract(data: bytes, filename: Optional[str], pcm_sample_rate: Optional[int]) -> Dict:
+    return _extractor.extract_from_buffer(data, filename=filename, pcm_sample_rate=pcm_sample_rate)
+
+
+def _ready() -> bool:
+    return _extractor is not None
+
+
+class AudioFeatureService:
+    """
+    Decodes uploads and extracts features off the event loop.
+
+    librosa feature extraction holds the GIL for hundreds of milliseconds
+    per utterance, so it runs in worker processes (spawned, so they don't
+    inherit the server's threads) with librosa preloaded. At most
+    `max_pending` extractions are queued or running; beyond that callers
+    get AudioServiceBusy instead of an ever-growing queue. A request whose
+    client disconnects or that exceeds `timeout_s` is cancelled; a task
+    that has not started yet is removed from the queue, one that is already
+    running finishes in its worker and its result is discarded.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout_s: Optional[float] = None,
+        use_processes: Optional[bool] = None,
+        sample_rate: int = 22050,
+        n_mfcc: int = 13,
+        profile: Optional[str] = None,
+        poll_interval_s: float = 0.1
+    ):
+        """
+        Initialize feature service (workers start on first use or start()).
+
+        Args:
+            max_workers: Worker processes (or threads)
+            max_pending: Queued + running extractions before rejecting
+            timeout_s: Per-request limit
+            use_processes: Use a process pool (False: threads, e.g. for tests)
+            sample_rate: Extractor sample rate
+            n_mfcc: Extractor MFCC count
+            profile: Feature profile (default: Config.AUDIO_FEATURE_PROFILE)
+            poll_interval_s: How often a waiting request checks for disconnects
+        """
+        self.max_workers = max_workers or Config.AUDIO_WORKERS
+        self.max_pending = max_pending or Config.AUDIO_MAX_PENDING
+        self.timeout_s = timeout_s or Config.AUDIO_EXTRACT_TIMEOUT_S
+        self.use_processes = Config.AUDIO_USE_PROCESSES if use_processes is None else use_processes
+        self.sample_rate = sample_rate
+        self.n_mfcc = n_mfcc
+        self.profile = profile or Config.AUDIO_FEATURE_PROFILE
+        self.poll_interval_s = poll_interval_s
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.total_ms = 0.0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                initargs = (self.sample_rate, self.n_mfcc, self.profile)
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=initargs
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="audio-features",
+                        initializer=_init_worker,
+                        initargs=initargs
+                    )
+            return self._executor
+
+    def start(self):
+        """Start and warm every worker in the background (returns immediately)."""
+        executor = self._get_executor()
+        for _ in range(self.max_workers):
+            executor.submit(_ready)
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise AudioServiceBusy(f"{self._pending} audio extractions pending")
+            self._pending += 1
+
+    def _discard(self, executor: Executor):
+        """Drop a broken pool (a worker died, e.g. OOM) so the next submit starts a fresh one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        # Outside the lock: shutdown can run other futures' callbacks
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, executor: Executor, future: Future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            broken = isinstance(future.exception(), BrokenProcessPool)
+            if future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        if broken:
+            self._discard(executor)
+
+    def submit(self, data: bytes, filename: Optional[str] = None, pcm_sample_rate: Optional[int] = None) -> Future:
+        """
+        Queue an extraction (raises AudioServiceBusy when full).
+
+        Returns:
+            concurrent.futures.Future resolving to the feature dict
+        """
+        self._admit()
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_extract, data, filename, pcm_sample_rate)
+            except BrokenProcessPool:
+                # Broke since the last callback ran (e.g. during warm-up): retry once on a fresh pool
+                self._discard(executor)
+                executor = self._get_executor()
+                future = executor.submit(_extract, data, filename, pcm_sample_rate)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # Bound to the executor that ran it, so a late failure from a replaced pool can't reset the new one
+        future.add_done_callback(partial(self._on_done, executor))
+        return future
+
+    async def extract(
+        self,
+        data: bytes,
+        filename: Optional[str] = None,
+        pcm_sample_rate: Optional[int] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+    ) -> Dict:
+        """
+        Extract features without blocking the event loop.
+
+        Args:
+            data: Encoded audio bytes
+            filename: Original file name (helps the fallback decoder)
+            pcm_sample_rate: Sample rate for headerless 16-bit PCM
+            is_disconnected: Coroutine function reporting a client disconnect
+                (e.g. Request.is_disconnected)
+
+        Returns:
+            Feature dictionary
+
+        Raises:
+            AudioServiceBusy: Too many pending extractions
+            ExtractionCancelled: Client disconnected
+            asyncio.TimeoutError: Took longer than timeout_s
+        """
+        started = time.perf_counter()
+        future = self.submit(data, filename, pcm_sample_rate)
+        wrapped = asyncio.wrap_future(future)
+        deadline = started + self.timeout_s
+
+        try:
+            while True:
+                done, _ = await asyncio.wait({wrapped}, timeout=self.poll_interval_s)
+                if done:
+                    features = wrapped.result()
+                    with self._lock:
+                        self.total_ms += (time.perf_counter() - started) * 1000
+                    return features
+                if is_disconnected is not None and await is_disconnected():
+                    with self._lock:
+                        self.cancelled += 1
+                    raise ExtractionCancelled("client disconnected")
+                if time.perf_counter() >= deadline:
+                    with self._lock:
+                        self.timed_out += 1
+                    raise asyncio.TimeoutError(f"audio extraction exceeded {self.timeout_s}s")
+        except BaseException:
+            # Drops the task if it hasn't started; a running one is left to finish
+            future.cancel()
+            raise
+
+    def stats(self) -> Dict:
+        """Get queue-depth and latency metrics."""
+        with self._lock:
+            pending = self._pending
+            return {
+                "mode": "process" if self.use_processes else "thread",
+                "profile": self.profile,
+                "workers": self.max_workers,
+                "started": self._executor is not None,
+                "pending": pending,
+                "running": min(pending, self.max_workers),
+                "queued": max(0, pending - self.max_workers),
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "timed_out": self.timed_out,
+                "avg_ms": self.total_ms / self.completed if self.completed else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers, dropping queued tasks."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
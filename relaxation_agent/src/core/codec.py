@@ -0,0 +1,169 @@
+"""Compact binary encoding for logged emotion probabilities and audio features."""
+
+import json
+import struct
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+
+# Format tags; the byte after the tag is the schema version
+EMOTION_PROBS_TAG = b"EP"
+AUDIO_FEATURES_TAG = b"AF"
+SCHEMA_VERSION = 1
+
+# Label order is part of version 1 of the emotion_probs format. Frozen as a
+# literal: changing EMOTION_LABELS must not reinterpret rows already stored
+_LABELS_V1 = (
+    "neutral", "happy", "sad", "angry", "fearful",
+    "disgusted", "surprised", "calm", "anxious", "stressed",
+)
+_LABEL_INDEX_V1 = {label: i for i, label in enumerate(_LABELS_V1)}
+
+# Columns holding codec output (binary in exports)
+BINARY_COLUMNS = {"emotion_logs": ("emotion_probs", "audio_features")}
+
+Stored = Union[bytes, str, None]
+
+
+def encode_emotion_probs(probs: Optional[Dict[str, float]]) -> Stored:
+    """
+    Encode probabilities as a float32 vector over the version 1 labels.
+
+    Labels that are absent are stored as NaN and dropped on decode. Dicts
+    with labels outside that set fall back to JSON text.
+
+    Args:
+        probs: Emotion -> probability
+
+    Returns:
+        Tagged bytes (or JSON text, or None)
+    """
+    if probs is None:
+        return None
+    if any(label not in _LABEL_INDEX_V1 for label in probs):
+        return json.dumps({k: float(v) for k, v in probs.items()})
+
+    vector = np.full(len(_LABELS_V1), np.nan, dtype="<f4")
+    for label, value in probs.items():
+        vector[_LABEL_INDEX_V1[label]] = value
+    return EMOTION_PROBS_TAG + bytes([SCHEMA_VERSION]) + vector.tobytes()
+
+
+def decode_emotion_probs(value: Stored) -> Optional[Dict[str, float]]:
+    """Decode a stored emotion_probs value (binary or legacy JSON text)."""
+    if value is None:
+        return None
+    if isinstance(value, str) or value[:2] != EMOTION_PROBS_TAG:
+        return json.loads(value)
+    version = value[2]
+    if version != 1:
+        raise ValueError(f"Unsupported emotion_probs schema version: {version}")
+    vector = np.frombuffer(value, dtype="<f4", offset=3)
+    # str() gives the shortest float32 repr (0.01, not 0.009999999776)
+    return {
+        label: float(str(p)) for label, p in zip(_LABELS_V1, vector) if not np.isnan(p)
+    }
+
+
+def _is_numeric(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float, np.number)):
+        return True
+    if isinstance(value, (list, tuple, np.ndarray)):
+        try:
+            return np.asarray(value).dtype.kind in "iuf"
+        except (ValueError, TypeError):
+            return False
+    return False
+
+
+def encode_audio_features(features: Optional[Dict[str, Any]]) -> Stored:
+    """
+    Pack audio features into one float32 buffer.
+
+    Layout: tag, version byte, uint32 header length, JSON header
+    (field names and shapes, plus any non-numeric values), then the
+    concatenated little-endian float32 arrays.
+
+    Args:
+        features: Feature name -> scalar / list / NumPy array
+
+    Returns:
+        Tagged bytes (or None)
+    """
+    if not features:
+        return None
+
+    fields = []
+    extra = {}
+    chunks = []
+    for name, value in features.items():
+        if _is_numeric(value):
+            array = np.asarray(value, dtype="<f4")
+            fields.append([name, list(array.shape)])
+            chunks.append(array.tobytes())
+        else:
+            extra[name] = value
+
+    header = json.dumps({"fields": fields, "extra": extra}, separators=(",", ":"), default=str).encode("utf-8")
+    return (
+        AUDIO_FEATURES_TAG + bytes([SCHEMA_VERSION]) + struct.pack("<I", len(header))
+        + header + b"".join(chunks)
+    )
+
+
+def decode_audio_features(value: Stored, as_numpy: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Decode stored audio features (binary or legacy JSON text).
+
+    Args:
+        value: Stored column value
+        as_numpy: Return NumPy arrays instead of JSON-friendly lists/floats
+
+    Returns:
+        Feature dict
+    """
+    if value is None:
+        return None
+    if isinstance(value, str) or value[:2] != AUDIO_FEATURES_TAG:
+        return json.loads(value)
+    version = value[2]
+    if version != 1:
+        raise ValueError(f"Unsupported audio_features schema version: {version}")
+
+    (header_length,) = struct.unpack_from("<I", value, 3)
+    start = 7 + header_length
+    header = json.loads(value[7:start])
+    data = np.frombuffer(value, dtype="<f4", offset=start)
+
+    features: Dict[str, Any] = {}
+    offset = 0
+    for name, shape in header["fields"]:
+        size = int(np.prod(shape)) if shape else 1
+        array = data[offset:offset + size].reshape(shape)
+        offset += size
+        if as_numpy:
+            features[name] = array
+        else:
+            features[name] = array.item() if array.ndim == 0 else array.tolist()
+    features.update(header["extra"])
+    return features
+
+
+# Column decoders used when rows are returned to API callers
+DECODERS = {
+    "emotion_probs": decode_emotion_probs,
+    "audio_features": decode_audio_features,
+    "metadata": lambda v: json.loads(v) if v else None,
+    "notified_agents": lambda v: json.loads(v) if v else None,
+}
+
+
+def decode_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode any blob columns present in a row (others are left as they are)."""
+    return {
+        column: DECODERS[column](value) if column in DECODERS and value is not None else value
+        for column, value in row.items()
+    }
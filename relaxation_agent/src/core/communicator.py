@@ -1,37 +1,281 @@
 """Communication module for Redis pub/sub and REST callbacks."""
 
+import asyncio
 import json
-import redis
-from typing import Dict, Optional, List
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
 import httpx
+
 from .config import Config
+from .event_bus import create_stream_client, encode_fields
+from .alert_aggregator import AlertAggregator
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+logger = logging.getLogger("relaxation_agent.communicator")
+
+# Outbox operations
+PUBLISH = "publish"
+XADD = "xadd"
 
 
 class Communicator:
-    """Handles communication with other agents via Redis and REST."""
-    
-    def __init__(self):
-        self.redis_client = None
+    """
+    Handles communication with other agents via Redis and REST.
+
+    All I/O runs on a private asyncio loop in a background thread, so the
+    publish methods can be called from sync code, async endpoints or worker
+    threads without blocking: they only queue the message. The loop drains
+    the queue into pipelined Redis publishes (many channels, one round
+    trip) over a shared connection pool, and failed messages go to a
+    bounded retry queue with exponential backoff. Stress alerts are also
+    appended to the durable alert stream (see event_bus) in the same
+    pipeline. REST callbacks reuse one long-lived (HTTP/2 when available)
+    client per agent URL.
+
+    The loop, clients and queues belong to the process that created them:
+    a forked child (e.g. a pre-forking server worker) drops what it
+    inherited and builds its own on first use.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_batch_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_queue_size: Optional[int] = None,
+        aggregator: Optional[AlertAggregator] = None
+    ):
+        """
+        Initialize communicator.
+
+        Args:
+            redis_client: redis.asyncio client to use (default: one built from Config)
+            max_batch_size: Messages per pipelined publish
+            max_retries: Attempts per message before it is dropped
+            retry_queue_size: Messages kept for retry before the oldest is dropped
+            aggregator: Per-user alert debouncer for report_stress (default: from Config)
+        """
+        self.max_batch_size = max_batch_size or Config.PUBLISH_BATCH_SIZE
+        self.max_retries = max_retries if max_retries is not None else Config.PUBLISH_MAX_RETRIES
+        self.retry_queue_size = retry_queue_size or Config.PUBLISH_RETRY_QUEUE_SIZE
+        self.redis_client = redis_client
+        # Clients we built are rebuilt after a fork; a caller's client is kept
+        self._owns_redis_client = redis_client is None
+        self.connected = False
         self.pubsub = None
+        if aggregator is None and Config.ALERT_DEBOUNCE_ENABLED:
+            aggregator = AlertAggregator()
+        self.aggregator = aggregator
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._outbox: Optional[asyncio.Queue] = None
+        self._publisher_task: Optional[asyncio.Task] = None
+        self._retry: Deque[Tuple[float, int, str, str, str]] = deque()
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+
+        self.published = 0
+        self.batches = 0
+        self.retried = 0
+        self.dropped = 0
+
+        _communicators.add(self)
+        self._start()
         self._connect_redis()
-    
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def _after_fork_in_child(self):
+        """Drop the parent's loop, clients and queued messages (runs in the child right after fork)."""
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._outbox = None
+        self._publisher_task = None
+        self._retry = deque()
+        self._http_clients = {}
+        if self._owns_redis_client:
+            # Bound to the parent's loop and sockets
+            self.redis_client = None
+        self.connected = False
+        self.published = 0
+        self.batches = 0
+        self.retried = 0
+        self.dropped = 0
+
+    def _start(self):
+        """Start the I/O loop thread (again after a fork, reconnecting Redis)."""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            forked = self._pid is not None and self._pid != os.getpid()
+            self._pid = os.getpid()
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self._loop)
+                self._outbox = asyncio.Queue()
+                self._publisher_task = self._loop.create_task(self._publisher())
+                ready.set()
+                self._loop.run_forever()
+                self._loop.close()
+
+            self._thread = threading.Thread(target=run, name="communicator", daemon=True)
+            self._thread.start()
+            ready.wait()
+        if forked:
+            self._connect_redis()
+
+    def _has_client(self) -> bool:
+        """Make sure this process's loop is running and report whether Redis is configured."""
+        self._start()
+        return self.redis_client is not None
+
+    def _submit(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the I/O loop and wait for its result (from a non-loop thread)."""
+        self._start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _run_on_loop(self, coro):
+        """Await a coroutine on the I/O loop from another event loop."""
+        self._start()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
     def _connect_redis(self):
-        """Connect to Redis server."""
+        """Create the pooled Redis client and check the connection."""
+        async def connect():
+            if self.redis_client is None:
+                # Same factory as the alert consumers (shared in-process server in fake mode)
+                self.redis_client = create_stream_client(async_client=True)
+            await self.redis_client.ping()
+
         try:
-            self.redis_client = redis.Redis(
-                host=Config.REDIS_HOST,
-                port=Config.REDIS_PORT,
-                db=Config.REDIS_DB,
-                password=Config.REDIS_PASSWORD,
-                decode_responses=True
-            )
-            # Test connection
-            self.redis_client.ping()
-            print(f"Connected to Redis at {Config.REDIS_HOST}:{Config.REDIS_PORT}")
+            self._submit(connect(), timeout=5.0)
+            self.connected = True
+            logger.info(f"Connected to Redis at {Config.REDIS_HOST}:{Config.REDIS_PORT}")
         except Exception as e:
-            print(f"Warning: Could not connect to Redis: {e}")
-            self.redis_client = None
-    
+            # Messages are still queued and retried once Redis comes back
+            logger.warning(f"Could not connect to Redis: {e}")
+            self.connected = False
+
+    async def _next_batch(self) -> Tuple[List[Tuple[int, str, str, str]], int]:
+        """
+        Wait for queued or due-for-retry messages and return up to one batch.
+
+        Returns:
+            (batch of (attempt, op, key, payload), number taken from the outbox)
+        """
+        batch: List[Tuple[int, str, str, str]] = []
+
+        while self._retry and self._retry[0][0] <= time.monotonic() and len(batch) < self.max_batch_size:
+            batch.append(self._retry.popleft()[1:])
+
+        retries = len(batch)
+        if not batch:
+            timeout = None
+            if self._retry:
+                timeout = max(0.0, self._retry[0][0] - time.monotonic())
+            try:
+                batch.append(await asyncio.wait_for(self._outbox.get(), timeout))
+            except asyncio.TimeoutError:
+                return batch, 0
+
+        while len(batch) < self.max_batch_size and not self._outbox.empty():
+            batch.append(self._outbox.get_nowait())
+        return batch, len(batch) - retries
+
+    async def _publisher(self):
+        """Drain the outbox into pipelined publishes; failures go to the retry queue."""
+        while True:
+            batch, taken = await self._next_batch()
+            if not batch:
+                continue
+
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for _, op, key, payload in batch:
+                        if op == XADD:
+                            pipe.xadd(key, encode_fields(payload), maxlen=Config.ALERT_STREAM_MAXLEN, approximate=True)
+                        else:
+                            pipe.publish(key, payload)
+                    await pipe.execute()
+                self.connected = True
+                self.published += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.connected = False
+                logger.warning(f"Publish of {len(batch)} messages failed, will retry: {e}")
+                self._schedule_retry(batch)
+            finally:
+                for _ in range(taken):
+                    self._outbox.task_done()
+
+    def _schedule_retry(self, batch: List[Tuple[int, str, str, str]]):
+        """Queue failed messages with exponential backoff."""
+        for attempt, op, key, payload in batch:
+            if attempt + 1 >= self.max_retries:
+                self.dropped += 1
+                continue
+            delay = min(Config.PUBLISH_RETRY_BASE_DELAY * (2 ** attempt), 30.0)
+            if len(self._retry) >= self.retry_queue_size:
+                self._retry.popleft()
+                self.dropped += 1
+            self._retry.append((time.monotonic() + delay, attempt + 1, op, key, payload))
+            self.retried += 1
+        # Keep the earliest retry first
+        self._retry = deque(sorted(self._retry))
+
+    def _enqueue(self, items: List[Tuple[str, str, str]]):
+        """Queue (op, key, payload) commands from any thread."""
+        self._start()
+
+        def put():
+            for op, key, payload in items:
+                self._outbox.put_nowait((0, op, key, payload))
+
+        self._loop.call_soon_threadsafe(put)
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, channel: str, message: Dict) -> bool:
+        """
+        Queue a message for a Redis channel (non-blocking).
+
+        Returns:
+            True if queued
+        """
+        if not self._has_client():
+            return False
+        self._enqueue([(PUBLISH, channel, json.dumps(message))])
+        return True
+
+    def publish_many(self, messages: List[Tuple[str, Dict]]) -> bool:
+        """Queue several (channel, message) pairs; they share one pipelined round trip."""
+        if not self._has_client():
+            return False
+        self._enqueue([(PUBLISH, channel, json.dumps(message)) for channel, message in messages])
+        return True
+
     def publish_stress_alert(
         self,
         stress_score: float,
@@ -41,21 +285,18 @@ class Communicator:
         metadata: Optional[Dict] = None
     ) -> bool:
         """
-        Publish stress alert to Redis channel.
-        
+        Publish stress alert to the Redis channel and the durable alert stream.
+
         Args:
             stress_score: Stress score (0-1)
             stress_level: "high", "medium", or "low"
             emotion: Primary emotion detected
             user_id: Optional user identifier
             metadata: Optional additional metadata
-            
+
         Returns:
-            True if published successfully
+            True if queued for publishing
         """
-        if not self.redis_client:
-            return False
-        
         message = {
             "stress_score": stress_score,
             "stress_level": stress_level,
@@ -64,17 +305,53 @@ class Communicator:
             "timestamp": self._get_timestamp(),
             "metadata": metadata or {}
         }
-        
-        try:
-            self.redis_client.publish(
-                Config.REDIS_CHANNEL_STRESS_ALERT,
-                json.dumps(message)
-            )
-            return True
-        except Exception as e:
-            print(f"Error publishing stress alert: {e}")
+        if not self._has_client():
             return False
-    
+        payload = json.dumps(message)
+        items = [(PUBLISH, Config.REDIS_CHANNEL_STRESS_ALERT, payload)]
+        if Config.ALERT_STREAM_ENABLED:
+            items.append((XADD, Config.ALERT_STREAM, payload))
+        self._enqueue(items)
+        return True
+
+    def report_stress(
+        self,
+        stress_score: float,
+        stress_level: str,
+        emotion: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict] = None
+    ) -> bool:
+        """
+        Report an analysis result; publishes a stress alert only when it matters.
+
+        With an aggregator, alerts are limited to level transitions and
+        significant score changes per user (see AlertAggregator), and carry
+        how many samples were coalesced. Without one, every medium/high
+        result is published.
+
+        Args:
+            stress_score: Stress score (0-1)
+            stress_level: "high", "medium", or "low"
+            emotion: Primary emotion detected
+            user_id: Optional user identifier
+            metadata: Optional additional metadata
+
+        Returns:
+            True if an alert was queued for publishing
+        """
+        if self.aggregator is None:
+            if stress_level not in ("high", "medium"):
+                return False
+            return self.publish_stress_alert(stress_score, stress_level, emotion, user_id, metadata)
+
+        summary = self.aggregator.offer(user_id, stress_score, stress_level)
+        if summary is None:
+            return False
+        return self.publish_stress_alert(
+            stress_score, stress_level, emotion, user_id, {**(metadata or {}), "alert": summary}
+        )
+
     def publish_emotion_update(
         self,
         emotion_probs: Dict[str, float],
@@ -83,35 +360,44 @@ class Communicator:
     ) -> bool:
         """
         Publish emotion update to Redis channel.
-        
+
         Args:
             emotion_probs: Dictionary of emotion probabilities
             top_emotion: Primary emotion
             user_id: Optional user identifier
-            
+
         Returns:
-            True if published successfully
+            True if queued for publishing
         """
-        if not self.redis_client:
-            return False
-        
         message = {
             "emotions": emotion_probs,
             "top_emotion": top_emotion,
             "user_id": user_id,
             "timestamp": self._get_timestamp()
         }
-        
-        try:
-            self.redis_client.publish(
-                Config.REDIS_CHANNEL_EMOTION_UPDATE,
-                json.dumps(message)
+        return self.publish(Config.REDIS_CHANNEL_EMOTION_UPDATE, message)
+
+    # ------------------------------------------------------------------
+    # REST callbacks
+    # ------------------------------------------------------------------
+
+    def _http_client(self, base_url: str) -> httpx.AsyncClient:
+        """Long-lived client per agent URL (lives on the I/O loop)."""
+        client = self._http_clients.get(base_url)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                http2=HTTP2_AVAILABLE,
+                timeout=5.0,
+                limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60.0)
             )
-            return True
-        except Exception as e:
-            print(f"Error publishing emotion update: {e}")
-            return False
-    
+            self._http_clients[base_url] = client
+        return client
+
+    async def _post(self, base_url: str, path: str, payload: Dict) -> bool:
+        response = await self._http_client(base_url).post(path, json=payload)
+        return response.status_code == 200
+
     async def notify_route_agent(
         self,
         stress_level: str,
@@ -120,36 +406,33 @@ class Communicator:
     ) -> bool:
         """
         Send REST callback to Route Agent.
-        
+
         Args:
             stress_level: Stress level
             emotion: Primary emotion
             user_id: Optional user identifier
-            
+
         Returns:
             True if notification sent successfully
         """
         if not Config.ROUTE_AGENT_URL:
             return False
-        
+
         payload = {
             "stress_level": stress_level,
             "emotion": emotion,
             "user_id": user_id,
             "timestamp": self._get_timestamp()
         }
-        
+
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    f"{Config.ROUTE_AGENT_URL}/api/stress-update",
-                    json=payload
-                )
-                return response.status_code == 200
+            return await self._run_on_loop(
+                self._post(Config.ROUTE_AGENT_URL, "/api/stress-update", payload)
+            )
         except Exception as e:
-            print(f"Error notifying Route Agent: {e}")
+            logger.warning(f"Error notifying Route Agent: {e}")
             return False
-    
+
     async def notify_ui_agent(
         self,
         stress_score: float,
@@ -160,20 +443,20 @@ class Communicator:
     ) -> bool:
         """
         Send REST callback to UI Agent.
-        
+
         Args:
             stress_score: Stress score
             stress_level: Stress level
             emotion: Primary emotion
             prompt: Coping prompt
             user_id: Optional user identifier
-            
+
         Returns:
             True if notification sent successfully
         """
         if not Config.UI_AGENT_URL:
             return False
-        
+
         payload = {
             "stress_score": stress_score,
             "stress_level": stress_level,
@@ -182,20 +465,88 @@ class Communicator:
             "user_id": user_id,
             "timestamp": self._get_timestamp()
         }
-        
+
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    f"{Config.UI_AGENT_URL}/api/relaxation-update",
-                    json=payload
-                )
-                return response.status_code == 200
+            return await self._run_on_loop(
+                self._post(Config.UI_AGENT_URL, "/api/relaxation-update", payload)
+            )
         except Exception as e:
-            print(f"Error notifying UI Agent: {e}")
+            logger.warning(f"Error notifying UI Agent: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until queued messages have been attempted once (retries may remain).
+
+        Returns:
+            True if the outbox drained within the timeout
+        """
+        if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+            return True
+
+        async def drain():
+            await self._outbox.join()
+
+        try:
+            self._submit(drain(), timeout=timeout)
+            return True
+        except Exception:
             return False
-    
+
+    def close(self, timeout: float = 5.0):
+        """Flush, close Redis and HTTP clients and stop the I/O loop."""
+        if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+            return
+        self.flush(timeout)
+
+        async def shutdown():
+            self._publisher_task.cancel()
+            for client in self._http_clients.values():
+                await client.aclose()
+            self._http_clients.clear()
+            if self.redis_client is not None:
+                # aclose() is redis>=5.0.1; older clients only have close()
+                close = getattr(self.redis_client, "aclose", None) or self.redis_client.close
+                await close()
+
+        try:
+            self._submit(shutdown(), timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Error closing communicator: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict:
+        """Get publish and retry metrics."""
+        return {
+            "connected": self.connected,
+            "debounce": self.aggregator.stats() if self.aggregator else None,
+            "queued": self._outbox.qsize() if self._outbox is not None else 0,
+            "retry_queue": len(self._retry),
+            "published": self.published,
+            "batches": self.batches,
+            "retried": self.retried,
+            "dropped": self.dropped
+        }
+
     def _get_timestamp(self) -> str:
         """Get current timestamp as ISO string."""
-        from datetime import datetime
         return datetime.utcnow().isoformat() + "Z"
 
+
+_communicators: "weakref.WeakSet[Communicator]" = weakref.WeakSet()
+
+
+def _reset_communicators_after_fork():
+    """Reset every communicator inherited by a forked child."""
+    for communicator in list(_communicators):
+        communicator._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_communicators_after_fork)
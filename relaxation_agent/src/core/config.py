@@ -15,6 +15,53 @@ class Config:
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
     REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD")
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+    
+    # Publishing (pipelined, with background retries)
+    PUBLISH_BATCH_SIZE: int = int(os.getenv("PUBLISH_BATCH_SIZE", "64"))
+    PUBLISH_MAX_RETRIES: int = int(os.getenv("PUBLISH_MAX_RETRIES", "5"))
+    PUBLISH_RETRY_BASE_DELAY: float = float(os.getenv("PUBLISH_RETRY_BASE_DELAY", "0.5"))
+    PUBLISH_RETRY_QUEUE_SIZE: int = int(os.getenv("PUBLISH_RETRY_QUEUE_SIZE", "10000"))
+    
+    # Durable alert bus (Redis Streams with consumer groups)
+    ALERT_STREAM_ENABLED: bool = os.getenv("ALERT_STREAM_ENABLED", "true").lower() == "true"
+    ALERT_STREAM: str = os.getenv("ALERT_STREAM", "stress:alerts:stream")
+    ALERT_STREAM_MAXLEN: int = int(os.getenv("ALERT_STREAM_MAXLEN", "10000"))
+    ALERT_CONSUMER_BATCH_SIZE: int = int(os.getenv("ALERT_CONSUMER_BATCH_SIZE", "64"))
+    ALERT_CONSUMER_BLOCK_MS: int = int(os.getenv("ALERT_CONSUMER_BLOCK_MS", "1000"))
+    ALERT_CLAIM_IDLE_MS: int = int(os.getenv("ALERT_CLAIM_IDLE_MS", "60000"))
+    ALERT_BUS_FAKE: bool = os.getenv("ALERT_BUS_FAKE", "false").lower() == "true"
+    # Failed batches are retried with backoff; entries delivered this often go to the dead-letter stream
+    ALERT_MAX_DELIVERIES: int = int(os.getenv("ALERT_MAX_DELIVERIES", "5"))
+    ALERT_RETRY_BASE_DELAY_S: float = float(os.getenv("ALERT_RETRY_BASE_DELAY_S", "0.5"))
+    ALERT_DEAD_LETTER_STREAM: str = os.getenv("ALERT_DEAD_LETTER_STREAM", "stress:alerts:dead")
+    
+    # Alert debouncing per user (see alert_aggregator)
+    ALERT_DEBOUNCE_ENABLED: bool = os.getenv("ALERT_DEBOUNCE_ENABLED", "true").lower() == "true"
+    ALERT_MIN_INTERVAL_S: float = float(os.getenv("ALERT_MIN_INTERVAL_S", "30"))
+    ALERT_SCORE_DELTA: float = float(os.getenv("ALERT_SCORE_DELTA", "0.15"))
+    ALERT_HYSTERESIS: float = float(os.getenv("ALERT_HYSTERESIS", "0.05"))
+    ALERT_EMIT_RECOVERY: bool = os.getenv("ALERT_EMIT_RECOVERY", "false").lower() == "true"
+    
+    # Streaming (WebSocket) sessions
+    SESSION_SMOOTHING: float = float(os.getenv("SESSION_SMOOTHING", "0.3"))
+    SESSION_MIN_SCORE_CHANGE: float = float(os.getenv("SESSION_MIN_SCORE_CHANGE", "0.05"))
+    SESSION_LEVEL_CONFIRM_FRAMES: int = int(os.getenv("SESSION_LEVEL_CONFIRM_FRAMES", "2"))
+    
+    # User profile cache (per process, write-through)
+    PROFILE_CACHE_TTL_S: float = float(os.getenv("PROFILE_CACHE_TTL_S", "60"))
+    PROFILE_CACHE_SIZE: int = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+    
+    # Audio feature extraction workers
+    AUDIO_WORKERS: int = int(os.getenv("AUDIO_WORKERS", "2"))
+    AUDIO_USE_PROCESSES: bool = os.getenv("AUDIO_USE_PROCESSES", "true").lower() == "true"
+    AUDIO_MAX_PENDING: int = int(os.getenv("AUDIO_MAX_PENDING", "32"))
+    AUDIO_EXTRACT_TIMEOUT_S: float = float(os.getenv("AUDIO_EXTRACT_TIMEOUT_S", "30"))
+    # "full" (piptrack pitch + tempo) or "realtime" (shared STFT, YIN pitch, no tempo)
+    AUDIO_FEATURE_PROFILE: str = os.getenv("AUDIO_FEATURE_PROFILE", "full")
+    # Per-frame MFCCs for the sequence models; frame rate 0 keeps librosa's ~43 fps
+    AUDIO_MFCC_SEQUENCE: bool = os.getenv("AUDIO_MFCC_SEQUENCE", "true").lower() == "true"
+    AUDIO_MFCC_FRAME_RATE: float = float(os.getenv("AUDIO_MFCC_FRAME_RATE", "0"))
     
     # Redis Channels
     REDIS_CHANNEL_STRESS_ALERT: str = os.getenv("REDIS_CHANNEL_STRESS_ALERT", "stress:alerts")
@@ -31,6 +78,31 @@ class Config:
     MODEL_PATH: str = os.getenv("MODEL_PATH", "./models/emotion_classifier.pt")
     MODEL_TYPE: str = os.getenv("MODEL_TYPE", "cnn_lstm")
     
+    # Text analysis cache (0 disables)
+    ANALYSIS_CACHE_SIZE: int = int(os.getenv("ANALYSIS_CACHE_SIZE", "1024"))
+    
+    # Text encoder truncation length
+    TEXT_ENCODER_MAX_LENGTH: int = int(os.getenv("TEXT_ENCODER_MAX_LENGTH", "512"))
+    # Optional corpus (one utterance per line) to lower the length from at startup
+    TEXT_ENCODER_CALIBRATION_CORPUS: Optional[str] = os.getenv("TEXT_ENCODER_CALIBRATION_CORPUS") or None
+    
+    # Text encoder inference backend: eager, int8 or onnx (CPU)
+    TEXT_ENCODER_BACKEND: str = os.getenv("TEXT_ENCODER_BACKEND", "eager")
+    TEXT_ENCODER_THREADS: Optional[int] = int(os.getenv("TEXT_ENCODER_THREADS")) if os.getenv("TEXT_ENCODER_THREADS") else None
+    ONNX_MODEL_DIR: str = os.getenv("ONNX_MODEL_DIR", "./models/onnx")
+    
+    # Acoustic model backend: eager, int8, torchscript or torchscript_int8 (CPU)
+    ACOUSTIC_BACKEND: str = os.getenv("ACOUSTIC_BACKEND", "eager")
+    # Trained acoustic encoder (TorchScript export or state dict); empty uses random init
+    ACOUSTIC_ENCODER_PATH: str = os.getenv("ACOUSTIC_ENCODER_PATH", "")
+    
+    # Text encoder micro-batching
+    ENCODER_BATCH_MAX_SIZE: int = int(os.getenv("ENCODER_BATCH_MAX_SIZE", "16"))
+    ENCODER_BATCH_MAX_WAIT_MS: float = float(os.getenv("ENCODER_BATCH_MAX_WAIT_MS", "5"))
+    
+    # Load and warm up shared models at API startup (readiness shows in /health)
+    WARM_UP_MODELS: bool = os.getenv("WARM_UP_MODELS", "true").lower() == "true"
+    
     # Stress Thresholds
     STRESS_THRESHOLD_HIGH: float = float(os.getenv("STRESS_THRESHOLD_HIGH", "0.7"))
     STRESS_THRESHOLD_MEDIUM: float = float(os.getenv("STRESS_THRESHOLD_MEDIUM", "0.4"))
@@ -44,6 +116,23 @@ class Config:
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", "./logs/relaxation_agent.log")
     
+    # Write-behind analysis logging (batched inserts off the request path)
+    LOG_WRITE_BEHIND: bool = os.getenv("LOG_WRITE_BEHIND", "true").lower() == "true"
+    LOG_BATCH_SIZE: int = int(os.getenv("LOG_BATCH_SIZE", "256"))
+    LOG_FLUSH_INTERVAL_MS: float = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "200"))
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_QUEUE_PUT_TIMEOUT_MS: float = float(os.getenv("LOG_QUEUE_PUT_TIMEOUT_MS", "50"))
+    
+    # Retention (days; 0 keeps forever). Opt-in: nothing is deleted until a TTL
+    # is set. Expired raw rows are exported to Parquet
+    RETENTION_EMOTION_LOGS_DAYS: float = float(os.getenv("RETENTION_EMOTION_LOGS_DAYS", "0"))
+    RETENTION_STRESS_ALERTS_DAYS: float = float(os.getenv("RETENTION_STRESS_ALERTS_DAYS", "0"))
+    RETENTION_ROLLUP_MINUTE_DAYS: float = float(os.getenv("RETENTION_ROLLUP_MINUTE_DAYS", "0"))
+    RETENTION_ROLLUP_HOUR_DAYS: float = float(os.getenv("RETENTION_ROLLUP_HOUR_DAYS", "0"))
+    RETENTION_ROLLUP_DAY_DAYS: float = float(os.getenv("RETENTION_ROLLUP_DAY_DAYS", "0"))
+    RETENTION_EXPORT_DIR: Optional[str] = os.getenv("RETENTION_EXPORT_DIR", "./data/archive") or None
+    RETENTION_INTERVAL_HOURS: float = float(os.getenv("RETENTION_INTERVAL_HOURS", "6"))
+    
     # Agent URLs
     VOICE_AGENT_URL: str = os.getenv("VOICE_AGENT_URL", "http://localhost:8001")
     ROUTE_AGENT_URL: str = os.getenv("ROUTE_AGENT_URL", "http://localhost:8002")
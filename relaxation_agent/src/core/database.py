@@ -0,0 +1,140 @@
+"""Long-lived SQLite connections shared by the logger and profile store."""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .config import Config
+
+
+class Database:
+    """
+    Per-thread pool of long-lived SQLite connections.
+
+    Each thread (and each forked worker process) gets its own connection,
+    opened once and reused, in WAL mode with synchronous=NORMAL so readers
+    never block the writer and commits skip the per-transaction fsync of
+    the default rollback journal. Statements are prepared once per
+    connection through sqlite3's statement cache.
+    """
+
+    def __init__(self, db_path: str, statement_cache_size: int = 256, busy_timeout_ms: int = 5000):
+        """
+        Initialize database.
+
+        Args:
+            db_path: Path to the SQLite file
+            statement_cache_size: Prepared statements kept per connection
+            busy_timeout_ms: How long a writer waits for a lock before failing
+        """
+        self.db_path = db_path
+        self.statement_cache_size = statement_cache_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[Tuple[int, sqlite3.Connection]] = []
+        self._lock = threading.Lock()
+        # Bumped by close() so threads drop their stale connections
+        self._generation = 0
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            cached_statements=self.statement_cache_size,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        # Lets retention return freed pages (no-op on files created without it)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        # Connections must not cross a fork; reopen in the child
+        if conn is None or self._local.key != (os.getpid(), self._generation):
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.key = (os.getpid(), self._generation)
+            with self._lock:
+                self._connections.append((os.getpid(), conn))
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one transaction (commit on success, rollback on error)."""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def execute(self, sql: str, params: Sequence = ()) -> int:
+        """
+        Run one write statement in its own transaction.
+
+        Returns:
+            Number of affected rows
+        """
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def executemany(self, sql: str, rows: Iterable[Sequence]) -> int:
+        """Run a write statement for many parameter rows in one transaction."""
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
+
+    def executescript(self, script: str):
+        """Run a schema script (CREATE TABLE / INDEX ...)."""
+        self.connection().executescript(script)
+
+    def query(self, sql: str, params: Sequence = ()) -> List[Dict]:
+        """Run a read query and return rows as dicts."""
+        return [dict(row) for row in self.connection().execute(sql, params).fetchall()]
+
+    def query_one(self, sql: str, params: Sequence = ()) -> Optional[Dict]:
+        """Run a read query and return the first row as a dict (or None)."""
+        row = self.connection().execute(sql, params).fetchone()
+        return dict(row) if row is not None else None
+
+    def close(self):
+        """Close every connection opened by this process."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for pid, conn in connections:
+            # Leave connections inherited across a fork to their owner
+            if pid != os.getpid():
+                continue
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_path: Optional[str] = None) -> Database:
+    """
+    Get the shared Database for a path (Config.DATABASE_PATH by default).
+
+    Args:
+        db_path: Path to the SQLite file
+
+    Returns:
+        Process-wide Database instance for that path
+    """
+    db_path = db_path or Config.DATABASE_PATH
+    with _databases_lock:
+        if db_path not in _databases:
+            _databases[db_path] = Database(db_path)
+        return _databases[db_path]
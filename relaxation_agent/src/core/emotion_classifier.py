@@ -1,11 +1,17 @@
 """Emotion classification module using CNN-LSTM architecture."""
 
+import logging
+
 import numpy as np
 import torch
 import torch.nn as nn
-from typing import Dict, List, Optional, Tuple
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
+from .acoustic_export import ACOUSTIC_BACKENDS, load_acoustic_model, optimize_acoustic_model
+from .config import Config
+
 # Emotion labels (can be customized)
 EMOTION_LABELS = [
     "neutral",
@@ -20,6 +26,11 @@ EMOTION_LABELS = [
     "stressed"
 ]
 
+# Shortest frame sequence the CNN front ends accept (two stride-2 pooling layers)
+MIN_MODEL_FRAMES = 4
+
+logger = logging.getLogger("relaxation_agent.emotion_classifier")
+
 
 class CNNLSTMEmotionClassifier(nn.Module):
     """CNN-LSTM model for emotion classification from audio features."""
@@ -61,12 +72,14 @@ class CNNLSTMEmotionClassifier(nn.Module):
         self.relu = nn.ReLU()
         self.softmax = nn.Softmax(dim=1)
     
-    def forward(self, x: torch.Tensor) -> torch.Tensor:
+    def forward(self, x: torch.Tensor, lengths: Optional[torch.Tensor] = None) -> torch.Tensor:
         """
         Forward pass.
         
         Args:
             x: Input tensor of shape (batch, seq_len, features)
+            lengths: Real frames per sequence when x is zero-padded (each at
+                least MIN_MODEL_FRAMES); padding then doesn't affect the output
             
         Returns:
             Emotion probabilities
@@ -77,6 +90,10 @@ class CNNLSTMEmotionClassifier(nn.Module):
         # CNN layers with BatchNorm
         x = self.relu(self.bn1(self.conv1(x)))
         x = self.pool(x)
+        if lengths is not None:
+            # Zero the padding again so conv2 sees the same edges as an unpadded sequence
+            lengths = lengths // 2
+            x = x * (torch.arange(x.shape[2], device=x.device) < lengths[:, None].to(x.device))[:, None, :]
         x = self.relu(self.bn2(self.conv2(x)))
         x = self.pool(x)
         x = self.dropout_conv(x)
@@ -84,11 +101,18 @@ class CNNLSTMEmotionClassifier(nn.Module):
         # Reshape for LSTM: (batch, seq_len, features)
         x = x.transpose(1, 2)
         
-        # LSTM layers
-        lstm_out, _ = self.lstm(x)
-        
-        # Use last output
-        x = lstm_out[:, -1, :]
+        if lengths is None:
+            # LSTM layers
+            lstm_out, _ = self.lstm(x)
+            
+            # Use last output
+            x = lstm_out[:, -1, :]
+        else:
+            # Packed: the LSTM skips padding, then take each sequence's own last step
+            lengths = (lengths // 2).cpu()
+            packed = pack_padded_sequence(x, lengths, batch_first=True, enforce_sorted=False)
+            lstm_out, _ = pad_packed_sequence(self.lstm(packed)[0], batch_first=True)
+            x = lstm_out[torch.arange(lstm_out.shape[0]), lengths - 1]
         
         # Fully connected layers
         x = self.relu(self.fc1(x))
@@ -150,9 +174,24 @@ class TextEmotionClassifier:
 class EmotionClassifier:
     """Main emotion classifier interface."""
     
-    def __init__(self, model_path: Optional[str] = None, use_text_fallback: bool = True):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        use_text_fallback: bool = True,
+        backend: Optional[str] = None
+    ):
+        """
+        Initialize emotion classifier.
+        
+        Args:
+            model_path: Trained CNN-LSTM checkpoint or TorchScript export
+            use_text_fallback: Use the rule-based text classifier
+            backend: Acoustic inference backend (default: Config.ACOUSTIC_BACKEND);
+                ignored for TorchScript exports, which carry their own
+        """
         self.model_path = model_path
         self.use_text_fallback = use_text_fallback
+        self.backend = backend
         self.model = None
         self.text_classifier = TextEmotionClassifier() if use_text_fallback else None
         
@@ -160,20 +199,44 @@ class EmotionClassifier:
             self.load_model(model_path)
     
     def load_model(self, model_path: str):
-        """Load trained model from file."""
+        """
+        Load trained model from file (checkpoint or TorchScript export).
+        
+        An unreadable file is logged and leaves the classifier on its
+        fallbacks; a misconfigured backend is not, so it cannot quietly turn
+        every audio prediction into neutral.
+        
+        Raises:
+            ValueError: If the backend is unknown
+            RuntimeError: If the model cannot be prepared for the backend
+        """
+        backend = self.backend or Config.ACOUSTIC_BACKEND
+        if backend not in ACOUSTIC_BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}. Choose from {ACOUSTIC_BACKENDS}")
+        
         try:
-            checkpoint = torch.load(model_path, map_location='cpu')
-            if isinstance(checkpoint, dict) and 'model_state_dict' in checkpoint:
-                self.model = CNNLSTMEmotionClassifier()
-                self.model.load_state_dict(checkpoint['model_state_dict'])
-                self.model.eval()
-            else:
-                self.model = checkpoint
-                if isinstance(self.model, nn.Module):
-                    self.model.eval()
+            model = load_acoustic_model(model_path)
+            if model is None:
+                checkpoint = torch.load(model_path, map_location='cpu')
+                if isinstance(checkpoint, dict) and 'model_state_dict' in checkpoint:
+                    model = CNNLSTMEmotionClassifier()
+                    model.load_state_dict(checkpoint['model_state_dict'])
+                else:
+                    model = checkpoint
         except Exception as e:
-            print(f"Warning: Could not load model from {model_path}: {e}")
+            logger.warning(f"Could not load model from {model_path}: {e}")
             self.model = None
+            return
+        
+        if isinstance(model, nn.Module):
+            # eval() always; quantize/script per backend
+            try:
+                model = optimize_acoustic_model(model, backend)
+            except Exception as e:
+                raise RuntimeError(
+                    f"Could not prepare acoustic model {model_path} for backend {backend}: {e}"
+                ) from e
+        self.model = model
     
     def predict_from_text(self, text: str, preprocessed: Optional[Dict] = None) -> Dict[str, float]:
         """
@@ -192,12 +255,30 @@ class EmotionClassifier:
             # Default neutral
             return {label: 1.0 if label == "neutral" else 0.0 for label in EMOTION_LABELS}
     
+    @staticmethod
+    def _model_sequence(audio_features: Union[Dict[str, np.ndarray], np.ndarray]) -> np.ndarray:
+        """Per-frame model input (frames >= MIN_MODEL_FRAMES, n_mfcc) from features or a sequence."""
+        if isinstance(audio_features, dict):
+            sequence = audio_features.get('mfcc_sequence')
+            if sequence is None:
+                # Only the utterance mean: repeat it as a constant sequence
+                mfcc = np.asarray(audio_features.get('mfcc', np.zeros(13)), dtype=np.float32)
+                sequence = np.tile(mfcc.reshape(1, -1), (MIN_MODEL_FRAMES, 1))
+        else:
+            sequence = audio_features
+        sequence = np.asarray(sequence, dtype=np.float32)
+        if len(sequence) < MIN_MODEL_FRAMES:
+            # Repeat the last frame up to the shortest input the model accepts
+            sequence = np.vstack([sequence, np.tile(sequence[-1:], (MIN_MODEL_FRAMES - len(sequence), 1))])
+        return sequence
+    
     def predict_from_audio(self, audio_features: Dict[str, np.ndarray]) -> Dict[str, float]:
         """
         Predict emotion from audio features.
         
         Args:
-            audio_features: Dictionary with 'mfcc' and other features
+            audio_features: Dictionary with 'mfcc_sequence' (per-frame MFCCs)
+                or 'mfcc' (utterance mean) and other features
             
         Returns:
             Emotion probabilities
@@ -206,23 +287,52 @@ class EmotionClassifier:
             # Fallback to text if available, else neutral
             return {label: 1.0 if label == "neutral" else 0.0 for label in EMOTION_LABELS}
         
-        # Prepare input tensor
-        mfcc = audio_features.get('mfcc', np.zeros(13))
-        if len(mfcc.shape) == 1:
-            # Add sequence dimension: (1, seq_len, features)
-            mfcc = mfcc.reshape(1, -1, 1)
-        
-        # Convert to tensor
-        input_tensor = torch.FloatTensor(mfcc)
+        # Prepare input tensor: (1, frames, n_mfcc)
+        input_tensor = torch.from_numpy(self._model_sequence(audio_features)).unsqueeze(0)
         
         # Predict
-        with torch.no_grad():
-            outputs = self.model(input_tensor)
-            probs = outputs[0].numpy()
+        with torch.inference_mode():
+            probs = self.model(input_tensor)[0].numpy()
         
         # Map to emotion labels
         return {EMOTION_LABELS[i]: float(probs[i]) for i in range(len(EMOTION_LABELS))}
     
+    def predict_batch_from_audio(
+        self,
+        batch: List[Union[Dict[str, np.ndarray], np.ndarray]],
+        max_frames: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Predict emotions for many utterances in one forward pass.
+        
+        Sequences are zero-padded to the longest one and packed for the
+        BiLSTM, so each row matches predict_from_audio on that utterance.
+        
+        Args:
+            batch: Feature dicts (as for predict_from_audio) or (frames, n_mfcc) arrays
+            max_frames: Truncate longer utterances to this many frames
+            
+        Returns:
+            Array of shape (N, len(EMOTION_LABELS)) in EMOTION_LABELS order
+        """
+        if not batch:
+            return np.zeros((0, len(EMOTION_LABELS)), dtype=np.float32)
+        if self.model is None:
+            probs = np.zeros((len(batch), len(EMOTION_LABELS)), dtype=np.float32)
+            probs[:, EMOTION_LABELS.index("neutral")] = 1.0
+            return probs
+        
+        from .preprocessor import pad_sequences
+        
+        sequences = [self._model_sequence(item) for item in batch]
+        if max_frames is not None:
+            max_frames = max(max_frames, MIN_MODEL_FRAMES)
+        padded, lengths = pad_sequences(sequences, max_len=max_frames, min_len=MIN_MODEL_FRAMES)
+        
+        with torch.inference_mode():
+            probs = self.model(torch.from_numpy(padded), torch.from_numpy(lengths))
+        return probs.numpy()
+    
     def get_top_emotion(self, emotion_probs: Dict[str, float]) -> Tuple[str, float]:
         """Get the emotion with highest probability."""
         top_emotion = max(emotion_probs.items(), key=lambda x: x[1])
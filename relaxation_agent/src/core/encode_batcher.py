@@ -0,0 +1,167 @@
+"""Dynamic micro-batching for the text emotion encoder."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import torch
+
+
+class TextEncodeBatcher:
+    """
+    Collects concurrent `encode` calls into a single `encode_batch` pass.
+
+    Requests wait up to `max_wait_ms` for others to arrive (or until
+    `max_batch_size` are queued), then go through one `encode_batch` call
+    (which groups texts by length bucket and pads each group only to its
+    longest text) on a dedicated worker thread, so the event loop stays
+    free while the model runs. Each caller gets its own embedding back
+    through a future.
+    """
+
+    def __init__(
+        self,
+        encoder,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        pooling: str = "cls",
+        max_length: Optional[int] = None
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            encoder: TextEmotionEncoder (or any object with encode_batch)
+            max_batch_size: Maximum requests per forward pass
+            max_wait_ms: Maximum time the first request waits for company
+            pooling: Pooling strategy passed to encode_batch
+            max_length: Truncation length (None uses the encoder's default)
+        """
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.pooling = pooling
+        self.max_length = max_length
+
+        # One thread: batches run back to back and new requests queue up meanwhile
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Requests taken off the queue and not yet answered (collecting or encoding)
+        self._inflight: List[Tuple[str, asyncio.Future]] = []
+
+        self.batches = 0
+        self.items = 0
+
+    async def encode(self, text: str) -> torch.Tensor:
+        """
+        Encode one text, batched with any concurrent callers.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Tensor of shape (embedding_dim,)
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _ensure_worker(self):
+        """Start the batching task on the running loop (restarting if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="text-encoder")
+        if self._worker is None or self._loop is not loop or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or time is up."""
+        batch = self._inflight = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Skip callers that gave up while waiting
+        return [(text, future) for text, future in batch if not future.cancelled()]
+
+    async def _run(self):
+        """Batching loop."""
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await self._loop.run_in_executor(
+                    self._executor, self._encode, texts
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+            self._inflight = []
+
+    def _encode(self, texts: List[str]) -> torch.Tensor:
+        """Run the whole batch through the encoder (worker thread)."""
+        return self.encoder.encode_batch(
+            texts,
+            pooling=self.pooling,
+            max_length=self.max_length,
+            batch_size=len(texts),
+            # encode_batch already groups by length bucket; pad each group to its longest text only
+            padding="longest"
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """Get batching metrics."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
+
+    async def close(self):
+        """
+        Stop the batching task and worker thread (the next encode restarts them).
+
+        Every request still queued or in flight fails with RuntimeError("batcher closed").
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._worker = None
+
+        pending = self._inflight
+        self._inflight = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("batcher closed"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
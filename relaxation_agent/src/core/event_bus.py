@@ -0,0 +1,367 @@
+"""Durable alert bus on Redis Streams with per-agent consumer groups."""
+
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from .config import Config
+
+try:
+    import fakeredis
+    FAKEREDIS_AVAILABLE = True
+except ImportError:
+    FAKEREDIS_AVAILABLE = False
+
+
+logger = logging.getLogger("relaxation_agent.event_bus")
+
+# Handler receives a batch of (entry_id, event); raising leaves the batch unacked
+BatchHandler = Callable[[List[Tuple[str, Dict]]], None]
+
+
+def encode_fields(payload: str) -> Dict[str, str]:
+    """Stream entry fields for a JSON-encoded event."""
+    return {"data": payload}
+
+
+def decode_fields(fields: Optional[Dict]) -> Optional[Dict]:
+    """Event from stream entry fields (None for entries trimmed while pending)."""
+    if not fields or "data" not in fields:
+        return None
+    return json.loads(fields["data"])
+
+
+# In-process server shared by every fake-mode client that doesn't pass its own
+_fake_server = None
+
+
+def create_stream_client(fake: Optional[bool] = None, server=None, async_client: bool = False):
+    """
+    Create a Redis client for the alert stream.
+
+    The Communicator (producer) and the consumers both get their clients
+    here, so in fake mode they share one in-process server.
+
+    Args:
+        fake: Use an in-process fakeredis server (default: Config.ALERT_BUS_FAKE)
+        server: fakeredis.FakeServer to use in fake mode (default: a shared one)
+        async_client: Return a redis.asyncio client (pooled, for the Communicator)
+
+    Returns:
+        redis.Redis-compatible client with decode_responses=True
+    """
+    global _fake_server
+    fake = Config.ALERT_BUS_FAKE if fake is None else fake
+    if fake:
+        if not FAKEREDIS_AVAILABLE:
+            raise ImportError("fakeredis is required for the local alert bus mode: pip install fakeredis")
+        if server is None:
+            if _fake_server is None:
+                _fake_server = fakeredis.FakeServer()
+            server = _fake_server
+        client_class = fakeredis.FakeAsyncRedis if async_client else fakeredis.FakeRedis
+        return client_class(server=server, decode_responses=True)
+    if async_client:
+        return aioredis.Redis(
+            host=Config.REDIS_HOST,
+            port=Config.REDIS_PORT,
+            db=Config.REDIS_DB,
+            password=Config.REDIS_PASSWORD,
+            decode_responses=True,
+            max_connections=Config.REDIS_MAX_CONNECTIONS
+        )
+    return redis.Redis(
+        host=Config.REDIS_HOST,
+        port=Config.REDIS_PORT,
+        db=Config.REDIS_DB,
+        password=Config.REDIS_PASSWORD,
+        decode_responses=True
+    )
+
+
+class AlertBus:
+    """
+    Stress alerts on a Redis Stream.
+
+    Unlike pub/sub, entries stay in the stream (trimmed to roughly `maxlen`)
+    until every consumer group has read them, so an agent that restarts
+    picks up where it left off. Each agent reads through its own consumer
+    group; several consumers in one group share the load, and an entry is
+    only removed from a consumer's pending list once it is acked.
+    """
+
+    def __init__(self, client=None, stream: Optional[str] = None, maxlen: Optional[int] = None):
+        """
+        Initialize alert bus.
+
+        Args:
+            client: Sync redis client (default: create_stream_client())
+            stream: Stream key (default: Config.ALERT_STREAM)
+            maxlen: Approximate stream length cap (default: Config.ALERT_STREAM_MAXLEN)
+        """
+        self.client = client if client is not None else create_stream_client()
+        self.stream = stream or Config.ALERT_STREAM
+        self.maxlen = maxlen or Config.ALERT_STREAM_MAXLEN
+
+    def publish(self, event: Dict) -> str:
+        """
+        Append an event to the stream.
+
+        Returns:
+            Stream entry ID
+        """
+        return self.client.xadd(
+            self.stream, encode_fields(json.dumps(event)), maxlen=self.maxlen, approximate=True
+        )
+
+    def ensure_group(self, group: str, start_id: str = "$"):
+        """
+        Create a consumer group if it does not exist.
+
+        Args:
+            group: Group name (one per agent)
+            start_id: "$" for new entries only, "0" to replay what is in the stream
+        """
+        try:
+            self.client.xgroup_create(self.stream, group, id=start_id, mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def consumer(self, group: str, name: str, handler: BatchHandler, **kwargs) -> "AlertConsumer":
+        """Create a consumer in `group` (the group is created if needed)."""
+        return AlertConsumer(self, group, name, handler, **kwargs)
+
+    def info(self) -> Dict:
+        """Stream length and per-group pending / lag."""
+        try:
+            groups = self.client.xinfo_groups(self.stream)
+        except redis.ResponseError:
+            return {"stream": self.stream, "length": 0, "groups": []}
+        return {
+            "stream": self.stream,
+            "length": self.client.xlen(self.stream),
+            "groups": [
+                {
+                    "name": g["name"],
+                    "consumers": g["consumers"],
+                    "pending": g["pending"],
+                    "lag": g.get("lag"),
+                }
+                for g in groups
+            ]
+        }
+
+
+class AlertConsumer:
+    """
+    Batched reader for one consumer in a group.
+
+    Each poll first re-delivers this consumer's own pending entries (left
+    unacked by a crash or a failing handler), periodically claims entries
+    that other consumers have held for longer than `claim_idle_ms`, and
+    otherwise reads new entries with one blocking XREADGROUP of up to
+    `batch_size`. A batch is acked in one XACK after the handler returns.
+
+    After a failed batch, pending entries are only re-read once an
+    exponential backoff has passed; new entries keep flowing meanwhile.
+    Re-delivered entries whose XPENDING delivery count exceeds
+    `max_deliveries` are copied to the dead-letter stream and acked, so a
+    poison entry can't hold up the group forever.
+    """
+
+    def __init__(
+        self,
+        bus: AlertBus,
+        group: str,
+        name: str,
+        handler: BatchHandler,
+        batch_size: Optional[int] = None,
+        block_ms: Optional[int] = None,
+        claim_idle_ms: Optional[int] = None,
+        start_id: str = "$",
+        max_deliveries: Optional[int] = None,
+        retry_base_delay_s: Optional[float] = None,
+        dead_letter_stream: Optional[str] = None
+    ):
+        """
+        Initialize consumer.
+
+        Args:
+            bus: Alert bus to read from
+            group: Consumer group (one per agent)
+            name: Consumer name, unique within the group and stable across restarts
+            handler: Called with each batch of (entry_id, event)
+            batch_size: Max entries per read
+            block_ms: How long a read waits for new entries
+            claim_idle_ms: Idle time after which other consumers' entries are claimed (0 disables)
+            start_id: Where a newly created group starts ("$" or "0")
+            max_deliveries: Deliveries before an entry is dead-lettered
+            retry_base_delay_s: First backoff after a failed batch (doubles, capped at 30 s)
+            dead_letter_stream: Stream for entries that keep failing
+        """
+        self.bus = bus
+        self.group = group
+        self.name = name
+        self.handler = handler
+        self.batch_size = batch_size or Config.ALERT_CONSUMER_BATCH_SIZE
+        self.block_ms = block_ms if block_ms is not None else Config.ALERT_CONSUMER_BLOCK_MS
+        self.claim_idle_ms = claim_idle_ms if claim_idle_ms is not None else Config.ALERT_CLAIM_IDLE_MS
+        self.max_deliveries = max_deliveries or Config.ALERT_MAX_DELIVERIES
+        self.retry_base_delay_s = (
+            retry_base_delay_s if retry_base_delay_s is not None else Config.ALERT_RETRY_BASE_DELAY_S
+        )
+        self.dead_letter_stream = dead_letter_stream or Config.ALERT_DEAD_LETTER_STREAM
+
+        self._pending_first = True
+        self._retry_at = 0.0
+        self._consecutive_failures = 0
+        self._claim_cursor = "0-0"
+        self._last_claim = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.processed = 0
+        self.failed_batches = 0
+        self.dead_lettered = 0
+
+        bus.ensure_group(group, start_id)
+
+    def _read(self, stream_id: str, block: Optional[int] = None) -> List[Tuple[str, Optional[Dict]]]:
+        response = self.bus.client.xreadgroup(
+            self.group, self.name, {self.bus.stream: stream_id}, count=self.batch_size, block=block
+        )
+        return response[0][1] if response else []
+
+    def _claim(self) -> List[Tuple[str, Optional[Dict]]]:
+        if not self.claim_idle_ms or time.monotonic() - self._last_claim < self.claim_idle_ms / 1000:
+            return []
+        result = self.bus.client.xautoclaim(
+            self.bus.stream, self.group, self.name,
+            min_idle_time=self.claim_idle_ms, start_id=self._claim_cursor, count=self.batch_size
+        )
+        self._claim_cursor, entries = result[0], result[1]
+        if self._claim_cursor == "0-0":
+            # Full pass over the pending list done; wait before the next one
+            self._last_claim = time.monotonic()
+        return entries
+
+    def _next_entries(self, block_ms: Optional[int]) -> Tuple[List[Tuple[str, Optional[Dict]]], bool]:
+        """Next batch and whether it is a re-delivery (own pending or claimed)."""
+        if self._pending_first and time.monotonic() >= self._retry_at:
+            entries = self._read("0")
+            if entries:
+                return entries, True
+            self._pending_first = False
+        entries = self._claim()
+        if entries:
+            return entries, True
+        return self._read(">", block=block_ms), False
+
+    def _dead_letter(self, entries: List[Tuple[str, Optional[Dict]]]) -> List[Tuple[str, Optional[Dict]]]:
+        """Move entries delivered more than max_deliveries times aside; return the rest."""
+        ids = [entry_id for entry_id, _ in entries]
+        pending = self.bus.client.xpending_range(
+            self.bus.stream, self.group, min=min(ids), max=max(ids), count=len(ids), consumername=self.name
+        )
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+        dead = [(i, f) for i, f in entries if deliveries.get(i, 0) > self.max_deliveries]
+        if not dead:
+            return entries
+
+        pipe = self.bus.client.pipeline(transaction=False)
+        for entry_id, fields in dead:
+            pipe.xadd(self.dead_letter_stream, {
+                **(fields or {}),
+                "stream": self.bus.stream,
+                "group": self.group,
+                "entry_id": entry_id,
+                "deliveries": str(deliveries[entry_id]),
+            }, maxlen=self.bus.maxlen, approximate=True)
+        pipe.xack(self.bus.stream, self.group, *[entry_id for entry_id, _ in dead])
+        pipe.execute()
+        self.dead_lettered += len(dead)
+        logger.error(
+            f"Moved {len(dead)} alert entries to {self.dead_letter_stream} after "
+            f"{self.max_deliveries} failed deliveries in group {self.group}"
+        )
+        dead_ids = {entry_id for entry_id, _ in dead}
+        return [(i, f) for i, f in entries if i not in dead_ids]
+
+    def poll(self, block_ms: Optional[int] = None) -> int:
+        """
+        Read and handle one batch.
+
+        Args:
+            block_ms: Override for how long to wait for new entries (None: self.block_ms)
+
+        Returns:
+            Number of entries acked
+        """
+        entries, redelivered = self._next_entries(self.block_ms if block_ms is None else block_ms)
+        if redelivered and entries:
+            entries = self._dead_letter(entries)
+        if not entries:
+            return 0
+
+        ids = []
+        events = []
+        for entry_id, fields in entries:
+            ids.append(entry_id)
+            event = decode_fields(fields)
+            if event is not None:
+                events.append((entry_id, event))
+
+        try:
+            if events:
+                self.handler(events)
+        except Exception as e:
+            # Leave the batch pending; it is re-delivered once the backoff has passed
+            self.failed_batches += 1
+            self._consecutive_failures += 1
+            self._pending_first = True
+            delay = min(self.retry_base_delay_s * 2 ** (self._consecutive_failures - 1), 30.0)
+            self._retry_at = time.monotonic() + delay
+            logger.warning(
+                f"Alert handler failed for {len(events)} entries in group {self.group} "
+                f"(retry in {delay:.1f}s): {e}"
+            )
+            return 0
+
+        # Entries trimmed away while pending are acked too, so they don't linger
+        self.bus.client.xack(self.bus.stream, self.group, *ids)
+        self.processed += len(events)
+        if redelivered:
+            self._consecutive_failures = 0
+        return len(ids)
+
+    def run(self):
+        """Poll until stop() is called; errors are logged and polling continues."""
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except redis.ConnectionError as e:
+                logger.warning(f"Alert bus connection error: {e}")
+                self._stop.wait(1.0)
+            except Exception:
+                logger.exception(f"Alert consumer {self.group}/{self.name} poll failed")
+                self._stop.wait(1.0)
+
+    def start(self) -> threading.Thread:
+        """Poll on a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name=f"alerts-{self.group}-{self.name}", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread (after the current blocking read returns)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,239 @@
+"""Write-behind batching for analysis log inserts."""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .database import Database
+
+
+Prepare = Optional[Callable[[Sequence], Sequence]]
+
+
+class LogWriter:
+    """
+    Accepts log rows without touching the database and writes them from a
+    background thread in batched `executemany` transactions.
+
+    A batch is flushed when `max_batch_size` rows are pending or
+    `flush_interval_ms` has passed since the first one arrived. The queue
+    is bounded: when it is full, `submit` blocks for up to `put_timeout_ms`
+    and then writes the row itself, so a writer that falls behind slows
+    producers down instead of losing rows. Serialization (`prepare`) runs on
+    the writer thread, so callers normally only pay for a queue put. Batch hooks registered for a statement run in the same
+    transaction as its inserts (e.g. to maintain rollups). If a batch fails,
+    its rows are retried one per transaction and only the bad ones are lost.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        max_batch_size: int = 256,
+        flush_interval_ms: float = 200.0,
+        max_queue_size: int = 10000,
+        put_timeout_ms: float = 50.0
+    ):
+        """
+        Initialize writer.
+
+        Args:
+            db: Database to write to
+            max_batch_size: Rows per transaction
+            flush_interval_ms: Longest a row waits before being written
+            max_queue_size: Pending rows before producers are slowed down
+            put_timeout_ms: How long a producer waits on a full queue before writing the row itself
+        """
+        self.db = db
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.put_timeout = put_timeout_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[str, Sequence, Prepare]]]" = queue.Queue(max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._batch_hooks: Dict[str, Callable[[sqlite3.Connection, List[Sequence]], None]] = {}
+
+        # Counters are updated from producer threads as well as the writer
+        self._stats_lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.written_through = 0
+        self.errors = 0
+        self.rejected = 0
+
+    def _ensure_thread(self):
+        """Start the writer thread (again after a fork)."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid is not None and self._pid != os.getpid():
+                    # Rows queued by the parent belong to the parent's writer
+                    self._queue = queue.Queue(self._queue.maxsize)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def set_batch_hook(self, sql: str, hook: Callable[[sqlite3.Connection, List[Sequence]], None]):
+        """
+        Run `hook(conn, rows)` inside each batch transaction that inserts with `sql`.
+
+        Args:
+            sql: Statement the hook follows
+            hook: Callable given the connection and that statement's prepared rows
+        """
+        self._batch_hooks[sql] = hook
+
+    def submit(self, sql: str, row: Sequence, prepare: Prepare = None) -> bool:
+        """
+        Queue one row for insertion.
+
+        Args:
+            sql: Parameterized INSERT statement
+            row: Raw row values
+            prepare: Optional callable turning `row` into statement parameters (run on the writer thread)
+
+        Returns:
+            True if queued, False if the queue stayed full and the row was written synchronously
+        """
+        self._ensure_thread()
+        try:
+            self._queue.put((sql, row, prepare), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.written_through += 1
+            self._write_rows([(sql, row, prepare)])
+            return False
+
+    def _collect(self) -> List[Tuple[str, Sequence, Prepare]]:
+        """Wait for one row, then gather more until the batch is full or the interval ends."""
+        first = self._queue.get()
+        batch = [first]
+        if first is None:
+            return batch
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[str, Sequence, Prepare]]):
+        """Write one batch, one executemany per statement, in a single transaction."""
+        grouped: Dict[str, List[Sequence]] = defaultdict(list)
+        for sql, row, prepare in batch:
+            grouped[sql].append(prepare(row) if prepare else row)
+        with self.db.transaction() as conn:
+            for sql, rows in grouped.items():
+                conn.executemany(sql, rows)
+                hook = self._batch_hooks.get(sql)
+                if hook is not None:
+                    hook(conn, rows)
+        with self._stats_lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def _write_rows(self, batch: List[Tuple[str, Sequence, Prepare]]):
+        """Write a failed batch again one row per transaction, dropping only the rows that fail."""
+        for sql, row, prepare in batch:
+            try:
+                params = prepare(row) if prepare else row
+                with self.db.transaction() as conn:
+                    conn.execute(sql, params)
+                    hook = self._batch_hooks.get(sql)
+                    if hook is not None:
+                        hook(conn, [params])
+            except Exception as e:
+                with self._stats_lock:
+                    self.rejected += 1
+                print(f"Warning: Dropped a log row that could not be written: {e}")
+            else:
+                with self._stats_lock:
+                    self.written += 1
+
+    def _run(self):
+        """Writer loop; a None item stops it."""
+        while True:
+            batch = self._collect()
+            rows = [item for item in batch if item is not None]
+            try:
+                if rows:
+                    try:
+                        self._write(rows)
+                    except Exception as e:
+                        with self._stats_lock:
+                            self.errors += 1
+                        print(f"Warning: Failed to write {len(rows)} log rows, retrying one by one: {e}")
+                        self._write_rows(rows)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(rows) < len(batch):
+                return
+
+    def flush(self):
+        """Block until every queued row has been written."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Flush pending rows and stop the writer thread."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        """Get queue and throughput metrics."""
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "written_through": self.written_through,
+                "errors": self.errors,
+                "rejected": self.rejected
+            }
+
+
+_writers: Dict[str, LogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(db: Database, **kwargs) -> LogWriter:
+    """
+    Get the shared LogWriter for a database.
+
+    Args:
+        db: Database to write to
+        **kwargs: LogWriter settings (used on first creation only)
+
+    Returns:
+        Process-wide LogWriter for that database
+    """
+    with _writers_lock:
+        if db.db_path not in _writers:
+            _writers[db.db_path] = LogWriter(db, **kwargs)
+        return _writers[db.db_path]
+
+
+@atexit.register
+def close_log_writers():
+    """Flush and stop every writer (also run at interpreter exit)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
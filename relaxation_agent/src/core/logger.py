@@ -1,12 +1,105 @@
 """Logging and database module."""
 
-import sqlite3
+import base64
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Optional, List
-from datetime import datetime
+from typing import Dict, Optional, List, Sequence, Tuple, Union
+from datetime import datetime, timezone
 from .config import Config
+from .database import get_database
+from .log_writer import get_log_writer
+from .rollups import ROLLUP_SCHEMA, apply_rollups, rebuild_rollups, query_trend
+from .codec import encode_emotion_probs, encode_audio_features, decode_row
+
+
+EMOTION_LOG_INSERT = '''
+    INSERT INTO emotion_logs (
+        timestamp, user_id, text_input, emotion_probs, top_emotion,
+        stress_score, stress_level, prompt, audio_features, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+STRESS_ALERT_INSERT = '''
+    INSERT INTO stress_alerts (
+        timestamp, user_id, stress_score, stress_level, emotion,
+        notified_agents, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+# Queryable columns; blob columns are only read when asked for
+EMOTION_LOG_COLUMNS = (
+    "id", "timestamp", "user_id", "text_input", "emotion_probs", "top_emotion",
+    "stress_score", "stress_level", "prompt", "audio_features", "metadata"
+)
+EMOTION_LOG_BLOB_COLUMNS = ("emotion_probs", "audio_features", "metadata")
+# Per-frame model input; the summary features are enough for the log
+UNLOGGED_AUDIO_FEATURES = ("mfcc_sequence",)
+
+STRESS_ALERT_COLUMNS = (
+    "id", "timestamp", "user_id", "stress_score", "stress_level", "emotion",
+    "notified_agents", "metadata"
+)
+STRESS_ALERT_BLOB_COLUMNS = ("notified_agents", "metadata")
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    """Encode a (timestamp, id) position as an opaque page cursor."""
+    raw = json.dumps([timestamp, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a page cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return str(timestamp), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def to_timestamp(value: Union[str, datetime]) -> str:
+    """Convert a datetime (or ISO string) to the naive-UTC ISO form stored in the tables."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _encode_emotion_log(row):
+    """Encode the blob columns of an emotion_logs row (binary probs/features, JSON metadata)."""
+    (timestamp, user_id, text_input, emotion_probs, top_emotion,
+     stress_score, stress_level, prompt, audio_features, metadata) = row
+    if audio_features:
+        audio_features = {k: v for k, v in audio_features.items() if k not in UNLOGGED_AUDIO_FEATURES}
+    return (
+        timestamp, user_id, text_input, encode_emotion_probs(emotion_probs), top_emotion,
+        stress_score, stress_level, prompt,
+        encode_audio_features(audio_features),
+        json.dumps(metadata) if metadata else None
+    )
+
+
+def _update_rollups(conn, rows):
+    """Fold encoded emotion_logs rows into the stress/emotion rollups."""
+    apply_rollups(conn, [(row[0], row[1], row[4], row[5]) for row in rows])
+
+
+# Run in the same transaction as the matching inserts
+_INSERT_HOOKS = {EMOTION_LOG_INSERT: _update_rollups}
+
+
+def _encode_stress_alert(row):
+    """Serialize the JSON columns of a stress_alerts row."""
+    timestamp, user_id, stress_score, stress_level, emotion, notified_agents, metadata = row
+    return (
+        timestamp, user_id, stress_score, stress_level, emotion,
+        json.dumps(notified_agents) if notified_agents else None,
+        json.dumps(metadata) if metadata else None
+    )
 
 
 class Logger:
@@ -15,6 +108,18 @@ class Logger:
     def __init__(self):
         self.db_path = Config.DATABASE_PATH
         self.log_file = Config.LOG_FILE
+        self.db = get_database(self.db_path)
+        # Inserts are queued and written in batches off the request path
+        self.writer = get_log_writer(
+            self.db,
+            max_batch_size=Config.LOG_BATCH_SIZE,
+            flush_interval_ms=Config.LOG_FLUSH_INTERVAL_MS,
+            max_queue_size=Config.LOG_QUEUE_SIZE,
+            put_timeout_ms=Config.LOG_QUEUE_PUT_TIMEOUT_MS
+        ) if Config.LOG_WRITE_BEHIND else None
+        if self.writer is not None:
+            for sql, hook in _INSERT_HOOKS.items():
+                self.writer.set_batch_hook(sql, hook)
         self._setup_file_logging()
         self._setup_database()
     
@@ -36,14 +141,7 @@ class Logger:
     
     def _setup_database(self):
         """Setup SQLite database for persistent logging."""
-        db_dir = Path(self.db_path).parent
-        db_dir.mkdir(parents=True, exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
+        self.db.executescript('''
             CREATE TABLE IF NOT EXISTS emotion_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
@@ -56,10 +154,8 @@ class Logger:
                 prompt TEXT,
                 audio_features TEXT,
                 metadata TEXT
-            )
-        ''')
-        
-        cursor.execute('''
+            );
+            
             CREATE TABLE IF NOT EXISTS stress_alerts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
@@ -69,13 +165,61 @@ class Logger:
                 emotion TEXT,
                 notified_agents TEXT,
                 metadata TEXT
-            )
+            );
+            
+            -- Per-user history is read newest first
+            CREATE INDEX IF NOT EXISTS idx_emotion_logs_user_timestamp
+                ON emotion_logs (user_id, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_emotion_logs_timestamp
+                ON emotion_logs (timestamp);
+            CREATE INDEX IF NOT EXISTS idx_stress_alerts_user_timestamp
+                ON stress_alerts (user_id, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_stress_alerts_timestamp
+                ON stress_alerts (timestamp);
+            
+            -- Level filters, alone and per user
+            CREATE INDEX IF NOT EXISTS idx_emotion_logs_level_timestamp
+                ON emotion_logs (stress_level, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_emotion_logs_user_level_timestamp
+                ON emotion_logs (user_id, stress_level, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_stress_alerts_level_timestamp
+                ON stress_alerts (stress_level, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_stress_alerts_user_level_timestamp
+                ON stress_alerts (user_id, stress_level, timestamp);
         ''')
         
-        conn.commit()
-        conn.close()
+        # Rollups; backfill once when they are added to an existing log
+        self.db.executescript(ROLLUP_SCHEMA)
+        if (self.db.query_one("SELECT 1 AS found FROM stress_rollups LIMIT 1") is None
+                and self.db.query_one("SELECT 1 AS found FROM emotion_logs LIMIT 1") is not None):
+            with self.db.transaction() as conn:
+                rebuild_rollups(conn)
         self.logger.info(f"Database initialized at {self.db_path}")
     
+    def _insert(self, sql: str, row: tuple, encode):
+        """Queue a row on the write-behind writer, or write it now if disabled."""
+        if self.writer is not None:
+            if not self.writer.submit(sql, row, encode):
+                self.logger.warning("Log queue full, wrote a row synchronously")
+        else:
+            params = encode(row)
+            with self.db.transaction() as conn:
+                conn.execute(sql, params)
+                hook = _INSERT_HOOKS.get(sql)
+                if hook is not None:
+                    hook(conn, [params])
+    
+    def flush(self):
+        """
+        Wait until queued rows are written.
+        
+        Readers never call this (it blocks until the writer catches up), so
+        queries see queued rows only after the next batch, at most
+        LOG_FLUSH_INTERVAL_MS later. Call it when read-after-write matters.
+        """
+        if self.writer is not None:
+            self.writer.flush()
+    
     def log_emotion_analysis(
         self,
         text_input: Optional[str],
@@ -89,29 +233,18 @@ class Logger:
         metadata: Optional[Dict] = None
     ):
         """Log emotion analysis result to database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO emotion_logs (
-                timestamp, user_id, text_input, emotion_probs, top_emotion,
-                stress_score, stress_level, prompt, audio_features, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        self._insert(EMOTION_LOG_INSERT, (
             datetime.utcnow().isoformat(),
             user_id,
             text_input,
-            json.dumps(emotion_probs),
+            emotion_probs,
             top_emotion,
             stress_score,
             stress_level,
             prompt,
-            json.dumps(audio_features) if audio_features else None,
-            json.dumps(metadata) if metadata else None
-        ))
-        
-        conn.commit()
-        conn.close()
+            audio_features,
+            metadata
+        ), _encode_emotion_log)
         
         self.logger.info(
             f"Logged emotion analysis: {top_emotion} (stress: {stress_score:.2f}, level: {stress_level})"
@@ -127,59 +260,185 @@ class Logger:
         metadata: Optional[Dict] = None
     ):
         """Log stress alert to database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO stress_alerts (
-                timestamp, user_id, stress_score, stress_level, emotion,
-                notified_agents, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        self._insert(STRESS_ALERT_INSERT, (
             datetime.utcnow().isoformat(),
             user_id,
             stress_score,
             stress_level,
             emotion,
-            json.dumps(notified_agents) if notified_agents else None,
-            json.dumps(metadata) if metadata else None
-        ))
-        
-        conn.commit()
-        conn.close()
+            notified_agents,
+            metadata
+        ), _encode_stress_alert)
         
         self.logger.warning(
             f"Logged stress alert: {stress_level} stress ({stress_score:.2f}) - {emotion}"
         )
     
-    def get_emotion_history(
+    def _select_columns(
+        self,
+        columns: Sequence[str],
+        blob_columns: Sequence[str],
+        fields: Optional[Sequence[str]]
+    ) -> List[str]:
+        """Validate a projection; the default skips blob columns."""
+        if fields is None:
+            return [c for c in columns if c not in blob_columns]
+        if "*" in fields:
+            return list(columns)
+        unknown = set(fields) - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        # id and timestamp are needed for the cursor
+        return ["id", "timestamp"] + [c for c in columns if c in fields and c not in ("id", "timestamp")]
+    
+    def _query_page(
+        self,
+        table: str,
+        selected: List[str],
+        filters: Dict[str, str],
+        since: Optional[Union[str, datetime]],
+        until: Optional[Union[str, datetime]],
+        cursor: Optional[str],
+        limit: int,
+        decode: bool = False
+    ) -> Dict:
+        """Newest-first keyset page over (timestamp, id)."""
+        clauses = []
+        params: List = []
+        
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(to_timestamp(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(to_timestamp(until))
+        if cursor:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        
+        query = f"SELECT {', '.join(selected)} FROM {table}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        # Fetch one extra row to know whether another page exists
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        rows = self.db.query(query, params)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+        
+        if decode:
+            rows = [decode_row(row) for row in rows]
+        return {"items": rows, "next_cursor": next_cursor}
+    
+    def query_emotion_history(
         self,
         user_id: Optional[str] = None,
-        limit: int = 100
-    ) -> List[Dict]:
-        """Retrieve emotion analysis history."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        stress_level: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+        decode: bool = False
+    ) -> Dict:
+        """
+        Page through emotion analysis history, newest first.
         
-        if user_id:
-            cursor.execute('''
-                SELECT * FROM emotion_logs
-                WHERE user_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (user_id, limit))
-        else:
-            cursor.execute('''
-                SELECT * FROM emotion_logs
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (limit,))
+        Args:
+            user_id: Only this user's rows
+            stress_level: Only rows at this stress level
+            since: Inclusive lower time bound (UTC)
+            until: Exclusive upper time bound (UTC)
+            cursor: next_cursor from the previous page
+            limit: Page size
+            fields: Columns to return (default: all but the blob columns; ["*"] for everything)
+            decode: Decode blob columns into dicts (otherwise returned as stored)
+            
+        Returns:
+            Dict with 'items' and 'next_cursor' (None on the last page)
+        """
+        selected = self._select_columns(EMOTION_LOG_COLUMNS, EMOTION_LOG_BLOB_COLUMNS, fields)
+        return self._query_page(
+            "emotion_logs", selected,
+            {"user_id": user_id, "stress_level": stress_level},
+            since, until, cursor, limit, decode
+        )
+    
+    def query_stress_alerts(
+        self,
+        user_id: Optional[str] = None,
+        stress_level: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+        decode: bool = False
+    ) -> Dict:
+        """
+        Page through stress alerts, newest first.
         
-        rows = cursor.fetchall()
-        conn.close()
+        Args:
+            user_id: Only this user's alerts
+            stress_level: Only alerts at this stress level
+            since: Inclusive lower time bound (UTC)
+            until: Exclusive upper time bound (UTC)
+            cursor: next_cursor from the previous page
+            limit: Page size
+            fields: Columns to return (default: all but the blob columns; ["*"] for everything)
+            decode: Decode blob columns into dicts (otherwise returned as stored)
+            
+        Returns:
+            Dict with 'items' and 'next_cursor' (None on the last page)
+        """
+        selected = self._select_columns(STRESS_ALERT_COLUMNS, STRESS_ALERT_BLOB_COLUMNS, fields)
+        return self._query_page(
+            "stress_alerts", selected,
+            {"user_id": user_id, "stress_level": stress_level},
+            since, until, cursor, limit, decode
+        )
+    
+    def get_stress_trend(
+        self,
+        granularity: str = "hour",
+        user_id: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None
+    ) -> List[Dict]:
+        """
+        Stress and emotion trend from the rollup tables (cost grows with buckets, not rows).
         
-        return [dict(row) for row in rows]
+        Args:
+            granularity: 'minute', 'hour' or 'day'
+            user_id: One user's trend (None sums over all users)
+            since: Inclusive lower bound (default: last hour/day/30 days by granularity)
+            until: Inclusive upper bound
+            
+        Returns:
+            Per-bucket dicts with count, stress_mean, stress_max and emotions
+        """
+        return query_trend(
+            self.db.connection(),
+            granularity=granularity,
+            user_id=user_id,
+            since=to_timestamp(since) if since is not None else None,
+            until=to_timestamp(until) if until is not None else None
+        )
+    
+    def get_emotion_history(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict]:
+        """Retrieve emotion analysis history (full rows, blobs decoded)."""
+        return self.query_emotion_history(user_id=user_id, limit=limit, fields=["*"], decode=True)["items"]
     
     def get_stress_alerts(
         self,
@@ -187,28 +446,7 @@ class Logger:
         stress_level: Optional[str] = None,
         limit: int = 100
     ) -> List[Dict]:
-        """Retrieve stress alert history."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM stress_alerts WHERE 1=1'
-        params = []
-        
-        if user_id:
-            query += ' AND user_id = ?'
-            params.append(user_id)
-        
-        if stress_level:
-            query += ' AND stress_level = ?'
-            params.append(stress_level)
-        
-        query += ' ORDER BY timestamp DESC LIMIT ?'
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
-
+        """Retrieve stress alert history (full rows, blobs decoded)."""
+        return self.query_stress_alerts(
+            user_id=user_id, stress_level=stress_level, limit=limit, fields=["*"], decode=True
+        )["items"]
@@ -0,0 +1,159 @@
+"""Process-wide model registry (load once, warm up, share across pipelines)."""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import torch
+
+from .config import Config
+from .text_encoder import create_text_encoder
+from .encode_batcher import TextEncodeBatcher
+from .acoustic_encoder import create_acoustic_encoder
+from .acoustic_export import load_acoustic_model, optimize_acoustic_model
+
+
+class ModelRegistry:
+    """
+    Loads each named model at most once per process and hands the same
+    instance to every caller, so all pipeline variants share weights.
+
+    Loads are serialized per name: concurrent callers wait for the first
+    load instead of starting their own. A failed load is remembered and
+    re-raised rather than retried on every request.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._status: Dict[str, Dict] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        warm_up: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """
+        Get a model, loading (and warming) it on first use.
+
+        Args:
+            name: Registry key
+            factory: Zero-argument callable that builds the model
+            warm_up: Optional callable run once on the new model
+
+        Returns:
+            Shared model instance
+        """
+        if name in self._models:
+            return self._models[name]
+
+        with self._lock_for(name):
+            if name in self._models:
+                return self._models[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            start = time.perf_counter()
+            try:
+                model = factory()
+            except Exception as e:
+                self._errors[name] = e
+                self._status[name] = {"loaded": False, "warm": False, "error": str(e)}
+                raise
+            status = {"loaded": True, "warm": False, "load_seconds": time.perf_counter() - start}
+
+            if warm_up is not None:
+                start = time.perf_counter()
+                try:
+                    warm_up(model)
+                    status["warm"] = True
+                    status["warm_up_seconds"] = time.perf_counter() - start
+                except Exception as e:
+                    status["warm_up_error"] = str(e)
+
+            self._models[name] = model
+            self._status[name] = status
+            return model
+
+    def reset(self, name: str):
+        """Forget a model (or a remembered load failure) so it is rebuilt on next use."""
+        with self._lock_for(name):
+            self._models.pop(name, None)
+            self._errors.pop(name, None)
+            self._status.pop(name, None)
+
+    def mark_ready(self):
+        """Signal that startup warm-up has finished."""
+        self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        """True once startup warm-up has finished."""
+        return self._ready.is_set()
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-model load/warm-up status."""
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+registry = ModelRegistry()
+
+
+def _warm_up_text_encoder(encoder):
+    """Run dummy batches through the common length buckets."""
+    for words in (4, 24):
+        encoder.encode_batch([" ".join(["warm"] * words)] * 4)
+    encoder.encode("warm up")
+
+
+def get_text_encoder():
+    """Shared text encoder (DistilBERT, or the lite fallback)."""
+    return registry.get("text_encoder", create_text_encoder, warm_up=_warm_up_text_encoder)
+
+
+def get_text_batcher():
+    """Shared micro-batcher around the shared text encoder."""
+    return registry.get(
+        "text_encoder_batcher",
+        lambda: TextEncodeBatcher(
+            get_text_encoder(),
+            max_batch_size=Config.ENCODER_BATCH_MAX_SIZE,
+            max_wait_ms=Config.ENCODER_BATCH_MAX_WAIT_MS
+        )
+    )
+
+
+def get_acoustic_encoder(input_dim: int = 13):
+    """
+    Shared acoustic encoder for the given feature dimension.
+
+    Loaded from Config.ACOUSTIC_ENCODER_PATH when set (a TorchScript export
+    or a state dict), and prepared for Config.ACOUSTIC_BACKEND. Call it
+    under torch.inference_mode().
+    """
+
+    def build():
+        path = Config.ACOUSTIC_ENCODER_PATH
+        encoder = load_acoustic_model(path) if path and Path(path).exists() else None
+        if encoder is None:
+            encoder = create_acoustic_encoder(input_dim=input_dim)
+            if path and Path(path).exists():
+                encoder.load_state_dict(torch.load(path, map_location="cpu"))
+        return optimize_acoustic_model(encoder)
+
+    def warm_up(encoder):
+        # TorchScript specializes the graph over the first couple of calls
+        with torch.inference_mode():
+            for _ in range(2):
+                encoder(torch.zeros(1, 100, input_dim))
+
+    return registry.get(f"acoustic_encoder_{input_dim}", build, warm_up=warm_up)
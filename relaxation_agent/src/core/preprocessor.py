@@ -25,6 +25,76 @@ except LookupError:
     nltk.download('wordnet', quiet=True)
 
 
+def downsample_frames(frames: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Average consecutive frames in blocks of `factor` (a trailing partial block is averaged too).
+    
+    Args:
+        frames: Array of shape (n_frames, n_features)
+        factor: Frames per output frame
+        
+    Returns:
+        Array of shape (ceil(n_frames / factor), n_features)
+    """
+    if factor <= 1 or len(frames) == 0:
+        return frames
+    full = len(frames) // factor * factor
+    blocks = frames[:full].reshape(-1, factor, frames.shape[1]).mean(axis=1)
+    if full < len(frames):
+        blocks = np.vstack([blocks, frames[full:].mean(axis=0, keepdims=True)])
+    return blocks.astype(frames.dtype, copy=False)
+
+
+def pad_sequences(
+    sequences: List[np.ndarray],
+    max_len: Optional[int] = None,
+    min_len: int = 1,
+    pad_value: float = 0.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack variable-length frame sequences into one padded float32 batch.
+    
+    Args:
+        sequences: Arrays of shape (n_frames_i, n_features)
+        max_len: Truncate longer sequences to this many frames
+        min_len: Pad the batch to at least this many frames
+            (the acoustic models need MIN_MODEL_FRAMES)
+        pad_value: Value for padded frames
+        
+    Returns:
+        (batch of shape (N, T, n_features), int64 lengths of shape (N,))
+    """
+    sequences = [np.asarray(seq, dtype=np.float32).reshape(len(seq), -1) for seq in sequences]
+    lengths = np.array([len(seq) for seq in sequences], dtype=np.int64)
+    if max_len is not None:
+        lengths = np.minimum(lengths, max_len)
+    n_features = sequences[0].shape[1] if sequences else 0
+    
+    batch = np.full(
+        (len(sequences), max(int(lengths.max(initial=0)), min_len), n_features),
+        pad_value, dtype=np.float32
+    )
+    for i, (seq, length) in enumerate(zip(sequences, lengths)):
+        batch[i, :length] = seq[:length]
+    return batch, lengths
+
+
+def sequence_mask(lengths: np.ndarray, max_len: Optional[int] = None) -> np.ndarray:
+    """
+    Boolean mask of real (non-padded) frames.
+    
+    Args:
+        lengths: Sequence lengths of shape (N,)
+        max_len: Mask width (default: longest sequence)
+        
+    Returns:
+        Array of shape (N, max_len), True where a frame is real
+    """
+    lengths = np.asarray(lengths)
+    max_len = int(lengths.max(initial=0)) if max_len is None else max_len
+    return np.arange(max_len)[None, :] < lengths[:, None]
+
+
 class TextPreprocessor:
     """Preprocesses text input for emotion classification."""
     
@@ -108,11 +178,74 @@ class TextPreprocessor:
 
 
 class AudioPreprocessor:
-    """Preprocesses audio for emotion classification."""
+    """
+    Preprocesses audio for emotion classification.
+    
+    Two feature profiles produce the same keys (except tempo):
+    
+    - "full": librosa's per-feature functions, piptrack pitch and
+      beat-tracked tempo (the original feature set).
+    - "realtime": one magnitude STFT shared by MFCC, spectral centroid and
+      rolloff, and a single-pass zero-crossing count (all identical to
+      "full"), F0 from YIN on audio downsampled
+      to 8 kHz, and no tempo, which is meaningless for short speech and the
+      slowest step. "pitch" is then the mean voiced F0 rather than the mean
+      of all piptrack peaks, which includes harmonics.
+    
+    With `sequence` enabled, "mfcc_sequence" also holds the per-frame MFCCs
+    (float32, shape (frames, n_mfcc)) for the sequence models, block-averaged
+    down to at most `frame_rate` frames per second when that is set.
+    "mfcc" stays the utterance mean.
+    """
+    
+    PROFILES = ("full", "realtime")
     
-    def __init__(self, sample_rate: int = 22050, n_mfcc: int = 13):
+    N_FFT = 2048
+    HOP_LENGTH = 512
+    
+    # YIN settings for the realtime profile (speech F0 range)
+    F0_SAMPLE_RATE = 8000
+    F0_MIN = 65.0
+    F0_MAX = 400.0
+    
+    def __init__(
+        self,
+        sample_rate: int = 22050,
+        n_mfcc: int = 13,
+        profile: Optional[str] = None,
+        sequence: Optional[bool] = None,
+        frame_rate: Optional[float] = None
+    ):
+        """
+        Initialize audio preprocessor.
+        
+        Args:
+            sample_rate: Sample rate audio is loaded at
+            n_mfcc: Number of MFCC coefficients
+            profile: "full" or "realtime" (default: Config.AUDIO_FEATURE_PROFILE)
+            sequence: Also return per-frame MFCCs (default: Config.AUDIO_MFCC_SEQUENCE)
+            frame_rate: Max MFCC frames per second, 0 for the native ~43 fps
+                (default: Config.AUDIO_MFCC_FRAME_RATE)
+        """
+        from .config import Config
+        
+        profile = profile or Config.AUDIO_FEATURE_PROFILE
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown audio feature profile: {profile} (expected one of {self.PROFILES})")
         self.sample_rate = sample_rate
         self.n_mfcc = n_mfcc
+        self.profile = profile
+        self.sequence = Config.AUDIO_MFCC_SEQUENCE if sequence is None else sequence
+        self.frame_rate = Config.AUDIO_MFCC_FRAME_RATE if frame_rate is None else frame_rate
+        self._mel_bases: Dict[int, np.ndarray] = {}
+    
+    @staticmethod
+    def _librosa():
+        try:
+            import librosa
+        except ImportError:
+            raise ImportError("librosa is required for audio processing. Install with: pip install librosa")
+        return librosa
     
     def extract_features(self, audio_path: str) -> Dict[str, np.ndarray]:
         """
@@ -124,13 +257,44 @@ class AudioPreprocessor:
         Returns:
             Dictionary with MFCC, pitch, and other features
         """
-        try:
-            import librosa
-        except ImportError:
-            raise ImportError("librosa is required for audio processing. Install with: pip install librosa")
+        librosa = self._librosa()
         
         # Load audio
         y, sr = librosa.load(audio_path, sr=self.sample_rate)
+        return self.extract_features_from_array(y, sr)
+    
+    def extract_features_from_array(self, audio_array: np.ndarray, 
+                                   sample_rate: int = None) -> Dict[str, np.ndarray]:
+        """
+        Extract features from audio array.
+        
+        Args:
+            audio_array: Audio signal as numpy array
+            sample_rate: Sample rate (uses self.sample_rate if None)
+            
+        Returns:
+            Dictionary with extracted features
+        """
+        sr = sample_rate or self.sample_rate
+        if self.profile == "realtime":
+            features, mfccs = self._realtime_features(audio_array, sr)
+        else:
+            features, mfccs = self._full_features(audio_array, sr)
+        if self.sequence:
+            features["mfcc_sequence"] = self._mfcc_sequence(mfccs, sr)
+        return features
+    
+    def _mfcc_sequence(self, mfccs: np.ndarray, sr: int) -> np.ndarray:
+        """Per-frame MFCCs as (frames, n_mfcc) float32, downsampled to frame_rate."""
+        frames = np.ascontiguousarray(mfccs.T, dtype=np.float32)
+        if self.frame_rate:
+            native_rate = sr / self.HOP_LENGTH
+            frames = downsample_frames(frames, int(np.ceil(native_rate / self.frame_rate)))
+        return frames
+    
+    def _full_features(self, y: np.ndarray, sr: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Original feature set (piptrack pitch, beat-tracked tempo), plus the MFCC matrix."""
+        librosa = self._librosa()
         
         # Extract MFCC features
         mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=self.n_mfcc)
@@ -148,7 +312,7 @@ class AudioPreprocessor:
         # Extract tempo
         tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
         
-        return {
+        features = {
             "mfcc": mfccs_mean,
             "pitch": np.array([pitch_mean], dtype=np.float32),
             "spectral_centroid": np.mean(spectral_centroids),
@@ -157,46 +321,73 @@ class AudioPreprocessor:
             "tempo": np.array([tempo], dtype=np.float32),
             "duration": len(y) / sr
         }
+        return features, mfccs
     
-    def extract_features_from_array(self, audio_array: np.ndarray, 
-                                   sample_rate: int = None) -> Dict[str, np.ndarray]:
-        """
-        Extract features from audio array.
+    def _realtime_features(self, y: np.ndarray, sr: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Shared-STFT feature set with YIN pitch and no tempo, plus the MFCC matrix."""
+        librosa = self._librosa()
         
-        Args:
-            audio_array: Audio signal as numpy array
-            sample_rate: Sample rate (uses self.sample_rate if None)
-            
-        Returns:
-            Dictionary with extracted features
-        """
-        try:
-            import librosa
-        except ImportError:
-            raise ImportError("librosa is required for audio processing.")
+        from scipy.fft import dct
         
-        sr = sample_rate or self.sample_rate
+        # One STFT (librosa's defaults, so values match the full profile)
+        magnitude = np.abs(librosa.stft(y, n_fft=self.N_FFT, hop_length=self.HOP_LENGTH))
+        # Same computation as librosa.feature.mfcc, minus rebuilding the mel filterbank per call
+        mel = self._mel_basis(sr) @ (magnitude ** 2)
+        mfccs = dct(librosa.power_to_db(mel), axis=-2, type=2, norm="ortho")[:self.n_mfcc]
+        spectral_centroids = librosa.feature.spectral_centroid(S=magnitude, sr=sr)[0]
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sr)[0]
+        zero_crossing_rate = self._zero_crossing_rate(y)
         
-        # Extract features (similar to extract_features)
-        mfccs = librosa.feature.mfcc(y=audio_array, sr=sr, n_mfcc=self.n_mfcc)
-        mfccs_mean = np.mean(mfccs, axis=1)
-        
-        pitches, magnitudes = librosa.piptrack(y=audio_array, sr=sr)
-        pitch_mean = np.mean(pitches[pitches > 0]) if np.any(pitches > 0) else 0.0
-        
-        spectral_centroids = librosa.feature.spectral_centroid(y=audio_array, sr=sr)[0]
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_array, sr=sr)[0]
-        zero_crossing_rate = librosa.feature.zero_crossing_rate(audio_array)[0]
-        
-        tempo, _ = librosa.beat.beat_track(y=audio_array, sr=sr)
-        
-        return {
-            "mfcc": mfccs_mean,
-            "pitch": np.array([pitch_mean], dtype=np.float32),
+        features = {
+            "mfcc": np.mean(mfccs, axis=1),
+            "pitch": np.array([self._yin_pitch(y, sr)], dtype=np.float32),
             "spectral_centroid": np.mean(spectral_centroids),
             "spectral_rolloff": np.mean(spectral_rolloff),
             "zero_crossing_rate": np.mean(zero_crossing_rate),
-            "tempo": np.array([tempo], dtype=np.float32),
-            "duration": len(audio_array) / sr
+            "duration": len(y) / sr
         }
-
+        return features, mfccs
+    
+    def _mel_basis(self, sr: int) -> np.ndarray:
+        """Mel filterbank for a sample rate, built once."""
+        if sr not in self._mel_bases:
+            librosa = self._librosa()
+            self._mel_bases[sr] = librosa.filters.mel(sr=sr, n_fft=self.N_FFT)
+        return self._mel_bases[sr]
+    
+    def _zero_crossing_rate(self, y: np.ndarray) -> np.ndarray:
+        """
+        Per-frame zero-crossing rate, equal to librosa.feature.zero_crossing_rate(y)[0].
+        
+        Counts sign changes once over the whole signal and takes per-frame
+        differences of the running count instead of framing the signal.
+        """
+        padded = np.pad(y, self.N_FFT // 2, mode="edge")
+        padded = np.where(np.abs(padded) <= 1e-10, 0, padded)
+        crossings = np.concatenate([[0], np.cumsum(np.signbit(padded[1:]) != np.signbit(padded[:-1]))])
+        starts = np.arange(1 + (len(padded) - self.N_FFT) // self.HOP_LENGTH) * self.HOP_LENGTH
+        return (crossings[starts + self.N_FFT - 1] - crossings[starts]) / self.N_FFT
+    
+    def _yin_pitch(self, y: np.ndarray, sr: int) -> float:
+        """Mean F0 over voiced frames, from YIN on downsampled audio (0.0 if unvoiced)."""
+        librosa = self._librosa()
+        
+        y_low = librosa.resample(y, orig_sr=sr, target_sr=self.F0_SAMPLE_RATE, res_type="soxr_qq") \
+            if sr != self.F0_SAMPLE_RATE else y
+        # 40 ms frames, 20 ms hop: enough lag range for F0_MIN, few frames to search
+        frame_length, hop_length = 320, 160
+        if len(y_low) < frame_length:
+            return 0.0
+        
+        f0 = librosa.yin(
+            y_low, fmin=self.F0_MIN, fmax=self.F0_MAX, sr=self.F0_SAMPLE_RATE,
+            frame_length=frame_length, hop_length=hop_length
+        )
+        rms = librosa.feature.rms(y=y_low, frame_length=frame_length, hop_length=hop_length)[0]
+        n = min(len(f0), len(rms))
+        f0, rms = f0[:n], rms[:n]
+        
+        # YIN has no voicing decision: drop quiet frames and frames stuck at the search bounds
+        voiced = (rms > 0.1 * rms.max()) & (f0 > self.F0_MIN * 1.01) & (f0 < self.F0_MAX * 0.99) \
+            if rms.max() > 0 else np.zeros(n, dtype=bool)
+        return float(np.mean(f0[voiced])) if np.any(voiced) else 0.0
@@ -0,0 +1,189 @@
+"""User profile storage: SQLite with a shared in-memory TTL cache."""
+
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import Config
+from .database import Database, get_database
+from .profile_interpreter import PROFILE_TABLE_SCHEMA, UserProfile
+
+
+_MISSING = object()
+
+
+class ProfileStore:
+    """
+    Profiles read through a per-process cache and written through to SQLite.
+
+    Profiles are read on every enhanced analysis, route calculation and UI
+    update but change rarely, so lookups (including "no profile" results)
+    are cached for `ttl_s`. Saves and deletes update the database first and
+    then the cache, so this process never serves a stale profile; other
+    worker processes see the change once their entry expires.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        ttl_s: Optional[float] = None,
+        max_size: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize profile store.
+
+        Args:
+            db: Database holding the user_profiles table
+            ttl_s: Seconds a cached lookup stays valid (0 disables caching)
+            max_size: Cached users before LRU eviction
+            clock: Monotonic time source (seconds)
+        """
+        self.db = db
+        self.ttl_s = ttl_s if ttl_s is not None else Config.PROFILE_CACHE_TTL_S
+        self.max_size = max_size or Config.PROFILE_CACHE_SIZE
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Optional[UserProfile]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.db.executescript(PROFILE_TABLE_SCHEMA)
+
+    def _cached(self, user_id: str) -> Tuple[object, int]:
+        """Cached profile (or _MISSING) and the write count it was read at."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= self.clock():
+                self.misses += 1
+                return _MISSING, self._writes
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1], self._writes
+
+    def _remember(self, user_id: str, profile: Optional[UserProfile], read_at: Optional[int] = None):
+        """Cache a profile; a read is dropped if a write happened since `read_at`."""
+        with self._lock:
+            if read_at is None:
+                self._writes += 1
+            elif read_at != self._writes:
+                return
+            if self.ttl_s <= 0:
+                return
+            self._entries[user_id] = (self.clock() + self.ttl_s, profile)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _load(self, user_id: str) -> Optional[UserProfile]:
+        row = self.db.query_one("SELECT * FROM user_profiles WHERE user_id = ?", (user_id,))
+        if row is None:
+            return None
+        return UserProfile(
+            user_id=row["user_id"],
+            profile_type=row["profile_type"],
+            stress_tolerance=row["stress_tolerance"],
+            custom_threshold=row["custom_threshold"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+
+    def get(self, user_id: str) -> Optional[UserProfile]:
+        """
+        Get a user's profile.
+
+        Returns:
+            A copy of the profile (safe to modify before save), or None
+        """
+        profile, read_at = self._cached(user_id)
+        if profile is _MISSING:
+            profile = self._load(user_id)
+            self._remember(user_id, profile, read_at)
+        return dataclasses.replace(profile) if profile is not None else None
+
+    def save(self, profile: UserProfile):
+        """Insert or replace a profile (database first, then cache)."""
+        self.db.execute("""
+            INSERT OR REPLACE INTO user_profiles
+            (user_id, profile_type, stress_tolerance, custom_threshold, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            profile.user_id,
+            profile.profile_type,
+            profile.stress_tolerance,
+            profile.custom_threshold,
+            profile.created_at,
+            profile.updated_at
+        ))
+        self._remember(profile.user_id, dataclasses.replace(profile))
+
+    def delete(self, user_id: str) -> bool:
+        """
+        Delete a profile.
+
+        Returns:
+            True if a profile was deleted
+        """
+        deleted = self.db.execute("DELETE FROM user_profiles WHERE user_id = ?", (user_id,)) > 0
+        self._remember(user_id, None)
+        return deleted
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop one user's cached profile (or all of them)."""
+        with self._lock:
+            self._writes += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        """Get cache metrics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+_stores: Dict[str, ProfileStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_profile_store(db_path: Optional[str] = None) -> ProfileStore:
+    """
+    Get the shared ProfileStore for a database path (Config.DATABASE_PATH by default).
+
+    Every module should look profiles up through this store (or the helpers
+    below) so that writes invalidate the one cache everyone reads.
+    """
+    db_path = db_path or Config.DATABASE_PATH
+    with _stores_lock:
+        if db_path not in _stores:
+            _stores[db_path] = ProfileStore(get_database(db_path))
+        return _stores[db_path]
+
+
+def get_user_profile(user_id: str) -> Optional[UserProfile]:
+    """Get a user's profile from the shared store (None if missing or unreadable)."""
+    try:
+        return get_profile_store().get(user_id)
+    except Exception:
+        return None
+
+
+def save_user_profile(profile: UserProfile):
+    """Save a profile through the shared store."""
+    get_profile_store().save(profile)
+
+
+def delete_user_profile(user_id: str) -> bool:
+    """Delete a profile through the shared store."""
+    return get_profile_store().delete(user_id)
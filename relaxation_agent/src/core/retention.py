@@ -0,0 +1,277 @@
+"""Retention for analysis logs: TTL per table, Parquet export, incremental vacuum."""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import Config
+from .database import Database
+from .codec import BINARY_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger("relaxation_agent.retention")
+
+
+class RetentionManager:
+    """
+    Expires old rows so the SQLite file stays bounded on long-running devices.
+
+    Raw emotion_logs / stress_alerts rows older than their TTL are exported
+    to zstd-compressed Parquet (one directory per table per run, one part
+    file per batch) and deleted in batches; a batch is only deleted once its
+    part file is closed and fsynced. Their stress and emotion statistics
+    survive in the rollup tables, which are maintained on insert; the rollups
+    themselves are compacted by dropping fine buckets (minute, hour) once
+    coarser ones cover them. Freed pages are returned with incremental
+    vacuum; converting a legacy file to incremental auto-vacuum needs a full
+    VACUUM, which only runs when an operator calls full_vacuum().
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        table_ttl_days: Optional[Dict[str, float]] = None,
+        rollup_ttl_days: Optional[Dict[str, float]] = None,
+        export_dir: Optional[str] = None,
+        batch_size: int = 5000,
+        vacuum_pages: int = 2000
+    ):
+        """
+        Initialize retention manager.
+
+        Args:
+            db: Database to prune
+            table_ttl_days: Days to keep raw rows per table (0 keeps forever)
+            rollup_ttl_days: Days to keep rollups per granularity (0 keeps forever)
+            export_dir: Directory for Parquet exports (None deletes without exporting)
+            batch_size: Rows exported and deleted per transaction
+            vacuum_pages: Free pages returned to the OS per run
+        """
+        self.db = db
+        self.table_ttl_days = table_ttl_days if table_ttl_days is not None else {
+            "emotion_logs": Config.RETENTION_EMOTION_LOGS_DAYS,
+            "stress_alerts": Config.RETENTION_STRESS_ALERTS_DAYS,
+        }
+        self.rollup_ttl_days = rollup_ttl_days if rollup_ttl_days is not None else {
+            "minute": Config.RETENTION_ROLLUP_MINUTE_DAYS,
+            "hour": Config.RETENTION_ROLLUP_HOUR_DAYS,
+            "day": Config.RETENTION_ROLLUP_DAY_DAYS,
+        }
+        self.export_dir = export_dir
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Optional[Dict] = None
+
+    @staticmethod
+    def _cutoff(days: float, now: datetime) -> str:
+        return (now - timedelta(days=days)).isoformat()
+
+    def _arrow_schema(self, table: str, columns: List[str]):
+        """Arrow schema from the table's declared SQLite column types."""
+        declared = {
+            row["name"]: (row["type"] or "").upper()
+            for row in self.db.query(f"PRAGMA table_info({table})")
+        }
+        types = {"INTEGER": pa.int64(), "REAL": pa.float64(), "BLOB": pa.binary()}
+        # Codec columns are declared TEXT but hold tagged binary (older rows: JSON text)
+        for column in BINARY_COLUMNS.get(table, ()):
+            declared[column] = "BLOB"
+        return pa.schema([(column, types.get(declared.get(column), pa.string())) for column in columns])
+
+    def _export_dir(self, table: str, now: datetime) -> Path:
+        """Directory for one run's Parquet part files of a table."""
+        return Path(self.export_dir) / table / f"{table}_{now.strftime('%Y%m%dT%H%M%S')}"
+
+    @staticmethod
+    def _fsync_dir(path: Path):
+        """Persist directory entries (new files) on POSIX; a no-op where directories can't be opened."""
+        try:
+            fd = os.open(str(path), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _export_batch(self, table: str, columns: List[str], rows: List, path: Path):
+        """Write one batch to its own Parquet file, then close and fsync it."""
+        data = {column: [row[i] for row in rows] for i, column in enumerate(columns)}
+        for column in BINARY_COLUMNS.get(table, ()):
+            if column in data:
+                data[column] = [v.encode("utf-8") if isinstance(v, str) else v for v in data[column]]
+        batch = pa.Table.from_pydict(data, schema=self._arrow_schema(table, columns))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Hidden name: dataset readers skip it if a crash leaves it behind
+        partial = path.with_name(f".{path.name}.tmp")
+        with open(partial, "wb") as f:
+            pq.write_table(batch, f, compression="zstd")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, path)
+        self._fsync_dir(path.parent)
+
+    def expire_table(self, table: str, days: float, now: Optional[datetime] = None) -> Dict:
+        """
+        Export and delete rows older than the TTL.
+
+        Args:
+            table: Table name (must have id and timestamp columns)
+            days: TTL in days (0 or less keeps everything)
+            now: Reference time (UTC, default now)
+
+        Returns:
+            Dict with deleted row count and export path
+        """
+        if days <= 0:
+            return {"deleted": 0, "export": None}
+        if self.export_dir and not PYARROW_AVAILABLE:
+            # Never drop rows we were asked to archive
+            logger.warning(
+                "pyarrow not installed: skipping retention for %s (rows are kept; "
+                "install pyarrow or unset RETENTION_EXPORT_DIR)", table
+            )
+            return {"deleted": 0, "export": None, "skipped": "pyarrow not installed"}
+
+        now = now or datetime.utcnow()
+        cutoff = self._cutoff(days, now)
+        conn = self.db.connection()
+        export = self._export_dir(table, now) if self.export_dir else None
+        parts = 0
+        deleted = 0
+
+        while True:
+            cursor = conn.execute(
+                f"SELECT * FROM {table} WHERE timestamp < ? ORDER BY timestamp, id LIMIT ?",
+                (cutoff, self.batch_size)
+            )
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            if export is not None:
+                # The rows must be durable on disk before they leave the database;
+                # a crash in between re-exports them on the next run instead of losing them
+                self._export_batch(table, columns, rows, export / f"part-{parts:05d}.parquet")
+                parts += 1
+
+            with self.db.transaction() as tx:
+                tx.executemany(f"DELETE FROM {table} WHERE id = ?", [(row["id"],) for row in rows])
+            deleted += len(rows)
+
+        return {"deleted": deleted, "export": str(export) if parts else None, "files": parts}
+
+    def compact_rollups(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Drop rollup buckets older than their granularity's TTL."""
+        now = now or datetime.utcnow()
+        removed = {}
+        with self.db.transaction() as conn:
+            for granularity, days in self.rollup_ttl_days.items():
+                if days <= 0:
+                    continue
+                cutoff = self._cutoff(days, now)
+                count = 0
+                for table in ("stress_rollups", "emotion_rollups"):
+                    count += conn.execute(
+                        f"DELETE FROM {table} WHERE granularity = ? AND bucket < ?",
+                        (granularity, cutoff)
+                    ).rowcount
+                removed[granularity] = count
+        return removed
+
+    def vacuum(self) -> Dict[str, int]:
+        """
+        Return up to `vacuum_pages` free pages to the OS with incremental vacuum.
+
+        Never rewrites the file: on a legacy database that is not in incremental
+        auto-vacuum mode nothing is freed and `needs_full_vacuum` is set, and an
+        operator has to call full_vacuum() once (e.g. in a maintenance window).
+        """
+        conn = self.db.connection()
+        incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if incremental:
+            conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return {
+            "pages_freed": free_before - free_after,
+            "free_pages_left": free_after,
+            "needs_full_vacuum": not incremental
+        }
+
+    def full_vacuum(self) -> Dict[str, int]:
+        """
+        Rewrite the whole file with VACUUM, switching it to incremental auto-vacuum.
+
+        Operator action only: VACUUM holds the write lock and needs free disk
+        space for a full copy of the database while it runs.
+        """
+        with self._lock:
+            conn = self.db.connection()
+            pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+            # Only takes effect for an existing file after a full VACUUM
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+            return {
+                "pages_before": pages_before,
+                "pages_after": pages_after,
+                "auto_vacuum": conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            }
+
+    def run(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Run one retention pass over every table.
+
+        Returns:
+            Per-table results, rollup compaction counts and vacuum stats
+        """
+        with self._lock:
+            now = now or datetime.utcnow()
+            result = {
+                "tables": {
+                    table: self.expire_table(table, days, now)
+                    for table, days in self.table_ttl_days.items()
+                },
+                "rollups": self.compact_rollups(now),
+                "vacuum": self.vacuum(),
+                "ran_at": now.isoformat()
+            }
+            self.last_run = result
+            return result
+
+    def start(self, interval_hours: float) -> threading.Thread:
+        """Run retention every `interval_hours` on a background thread."""
+        def loop():
+            while True:
+                try:
+                    self.run()
+                except Exception as e:
+                    logger.exception("Retention run failed: %s", e)
+                if self._stop.wait(interval_hours * 3600):
+                    return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="retention", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
@@ -0,0 +1,185 @@
+"""Incrementally maintained stress/emotion rollups per user and time bucket."""
+
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Bucket key = prefix of the ISO timestamp stored in emotion_logs
+GRANULARITIES: Dict[str, int] = {
+    "minute": len("YYYY-MM-DDTHH:MM"),
+    "hour": len("YYYY-MM-DDTHH"),
+    "day": len("YYYY-MM-DD"),
+}
+
+# Default look-back window per granularity
+DEFAULT_WINDOWS: Dict[str, timedelta] = {
+    "minute": timedelta(hours=1),
+    "hour": timedelta(days=1),
+    "day": timedelta(days=30),
+}
+
+ROLLUP_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS stress_rollups (
+        user_id TEXT NOT NULL,
+        granularity TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        stress_sum REAL NOT NULL,
+        stress_max REAL NOT NULL,
+        PRIMARY KEY (user_id, granularity, bucket)
+    );
+
+    CREATE TABLE IF NOT EXISTS emotion_rollups (
+        user_id TEXT NOT NULL,
+        granularity TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        emotion TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, granularity, bucket, emotion)
+    );
+
+    -- All-user trends
+    CREATE INDEX IF NOT EXISTS idx_stress_rollups_bucket
+        ON stress_rollups (granularity, bucket);
+    CREATE INDEX IF NOT EXISTS idx_emotion_rollups_bucket
+        ON emotion_rollups (granularity, bucket);
+'''
+
+STRESS_ROLLUP_UPSERT = '''
+    INSERT INTO stress_rollups (user_id, granularity, bucket, count, stress_sum, stress_max)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, granularity, bucket) DO UPDATE SET
+        count = count + excluded.count,
+        stress_sum = stress_sum + excluded.stress_sum,
+        stress_max = MAX(stress_max, excluded.stress_max)
+'''
+
+EMOTION_ROLLUP_UPSERT = '''
+    INSERT INTO emotion_rollups (user_id, granularity, bucket, emotion, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, granularity, bucket, emotion) DO UPDATE SET
+        count = count + excluded.count
+'''
+
+
+def aggregate(samples: Sequence[Tuple[str, Optional[str], str, float]]) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Pre-aggregate samples into rollup deltas.
+
+    Args:
+        samples: (timestamp, user_id, top_emotion, stress_score) tuples
+
+    Returns:
+        (stress rows, emotion rows) for STRESS_ROLLUP_UPSERT / EMOTION_ROLLUP_UPSERT
+    """
+    stress: Dict[tuple, List[float]] = {}
+    emotions: Dict[tuple, int] = defaultdict(int)
+
+    for timestamp, user_id, top_emotion, stress_score in samples:
+        user_id = user_id or ""
+        score = float(stress_score or 0.0)
+        for granularity, width in GRANULARITIES.items():
+            key = (user_id, granularity, timestamp[:width])
+            entry = stress.get(key)
+            if entry is None:
+                stress[key] = [1, score, score]
+            else:
+                entry[0] += 1
+                entry[1] += score
+                entry[2] = max(entry[2], score)
+            if top_emotion:
+                emotions[key + (top_emotion,)] += 1
+
+    stress_rows = [key + tuple(values) for key, values in stress.items()]
+    emotion_rows = [key + (count,) for key, count in emotions.items()]
+    return stress_rows, emotion_rows
+
+
+def apply_rollups(conn: sqlite3.Connection, samples: Sequence[Tuple[str, Optional[str], str, float]]):
+    """Fold samples into the rollup tables (inside the caller's transaction)."""
+    stress_rows, emotion_rows = aggregate(samples)
+    if stress_rows:
+        conn.executemany(STRESS_ROLLUP_UPSERT, stress_rows)
+    if emotion_rows:
+        conn.executemany(EMOTION_ROLLUP_UPSERT, emotion_rows)
+
+
+def rebuild_rollups(conn: sqlite3.Connection):
+    """Recompute every rollup from emotion_logs (used to backfill existing logs)."""
+    conn.execute("DELETE FROM stress_rollups")
+    conn.execute("DELETE FROM emotion_rollups")
+    cursor = conn.execute(
+        "SELECT timestamp, user_id, top_emotion, stress_score FROM emotion_logs"
+    )
+    while True:
+        samples = cursor.fetchmany(5000)
+        if not samples:
+            break
+        apply_rollups(conn, [tuple(row) for row in samples])
+
+
+def query_trend(
+    conn: sqlite3.Connection,
+    granularity: str = "hour",
+    user_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> List[Dict]:
+    """
+    Read stress and emotion rollups for a time window.
+
+    Args:
+        conn: Database connection
+        granularity: 'minute', 'hour' or 'day'
+        user_id: One user's trend (None sums over all users)
+        since: Inclusive lower bound (naive-UTC ISO timestamp)
+        until: Inclusive upper bound (naive-UTC ISO timestamp)
+
+    Returns:
+        One dict per bucket, oldest first, with count, stress_mean,
+        stress_max and an emotion distribution
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    width = GRANULARITIES[granularity]
+
+    if since is None:
+        start = datetime.utcnow() - DEFAULT_WINDOWS[granularity]
+        since = start.isoformat()
+
+    clauses = ["granularity = ?", "bucket >= ?"]
+    params: List = [granularity, since[:width]]
+    if until is not None:
+        clauses.append("bucket <= ?")
+        params.append(until[:width])
+    if user_id is not None:
+        clauses.append("user_id = ?")
+        params.append(user_id)
+    where = " AND ".join(clauses)
+
+    buckets: Dict[str, Dict] = {}
+    for bucket, count, stress_sum, stress_max in conn.execute(f'''
+        SELECT bucket, SUM(count), SUM(stress_sum), MAX(stress_max)
+        FROM stress_rollups WHERE {where}
+        GROUP BY bucket ORDER BY bucket
+    ''', params):
+        buckets[bucket] = {
+            "bucket": bucket,
+            "count": count,
+            "stress_mean": stress_sum / count if count else 0.0,
+            "stress_max": stress_max,
+            "emotions": {}
+        }
+
+    for bucket, emotion, count in conn.execute(f'''
+        SELECT bucket, emotion, SUM(count)
+        FROM emotion_rollups WHERE {where}
+        GROUP BY bucket, emotion
+    ''', params):
+        if bucket in buckets:
+            total = buckets[bucket]["count"]
+            buckets[bucket]["emotions"][emotion] = count / total if total else 0.0
+
+    return list(buckets.values())
@@ -2,16 +2,43 @@
 
 import torch
 import torch.nn as nn
-from typing import Optional, List
-import os
+from typing import Dict, Optional, List, Tuple, Union
+import numpy as np
+import gc
+import json
+from pathlib import Path
+from .config import Config
 
 try:
-    from transformers import AutoModel, AutoTokenizer
+    from transformers import AutoConfig, AutoModel, AutoTokenizer
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
     print("Warning: transformers library not available. Install with: pip install transformers")
 
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# Inference backends: full-precision PyTorch, dynamic int8 PyTorch, ONNX Runtime
+TEXT_ENCODER_BACKENDS = ("eager", "int8", "onnx")
+
+# ONNX opset of exported graphs; part of the export's cache key
+ONNX_OPSET = 14
+
+# Padded sequence lengths a batch can be rounded up to
+LENGTH_BUCKETS = (16, 32, 64, 128, 256, 512)
+
+
+def bucket_for_length(length: int, buckets: Tuple[int, ...] = LENGTH_BUCKETS) -> int:
+    """Smallest bucket that fits `length` tokens (largest bucket if none does)."""
+    for bucket in buckets:
+        if length <= bucket:
+            return bucket
+    return buckets[-1]
+
 
 class TextEmotionEncoder:
     """
@@ -25,7 +52,12 @@ class TextEmotionEncoder:
         self, 
         model_name: str = "distilbert-base-uncased",
         device: Optional[str] = None,
-        cache_dir: Optional[str] = None
+        cache_dir: Optional[str] = None,
+        max_length: Optional[int] = None,
+        backend: str = "eager",
+        num_threads: Optional[int] = None,
+        onnx_path: Optional[str] = None,
+        revision: Optional[str] = None
     ):
         """
         Initialize text emotion encoder.
@@ -34,37 +66,174 @@ class TextEmotionEncoder:
             model_name: HuggingFace model identifier
             device: Device to run on ('cpu', 'cuda', or None for auto)
             cache_dir: Directory to cache model files
+            max_length: Default truncation length (see calibrate_max_length)
+            backend: 'eager' (PyTorch fp32), 'int8' (dynamically quantized
+                Linear layers) or 'onnx' (ONNX Runtime); int8 and onnx run on CPU
+            num_threads: Intra-op CPU threads (None keeps the library default)
+            onnx_path: Where to export/load the ONNX graph (onnx backend only;
+                default is keyed by model, revision and opset under ONNX_MODEL_DIR)
+            revision: Model revision (branch, tag or commit) to load
+        
+        The onnx backend keeps no PyTorch model once its session exists, and
+        does not load one at all when a matching export is cached. If the
+        export or session fails, the encoder falls back to the eager backend.
         """
         if not TRANSFORMERS_AVAILABLE:
             raise ImportError(
                 "transformers library required. Install with: pip install transformers"
             )
+        if backend not in TEXT_ENCODER_BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}. Choose from {TEXT_ENCODER_BACKENDS}")
+        if backend == "onnx" and not ONNXRUNTIME_AVAILABLE:
+            raise ImportError(
+                "onnxruntime required for the onnx backend. Install with: pip install onnxruntime"
+            )
         
         self.model_name = model_name
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.backend = backend
+        self.num_threads = num_threads
+        self.max_length = max_length or Config.TEXT_ENCODER_MAX_LENGTH
+        # Quantized and ONNX backends are CPU-only
+        if backend == "eager":
+            self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        else:
+            self.device = "cpu"
+        
+        if num_threads:
+            torch.set_num_threads(num_threads)
         
-        # Load tokenizer and model
+        # Load tokenizer and config (the model itself only if a backend needs it)
         print(f"Loading text encoder: {model_name}...")
+        self.cache_dir = cache_dir
         self.tokenizer = AutoTokenizer.from_pretrained(
             model_name, 
-            cache_dir=cache_dir
+            cache_dir=cache_dir,
+            revision=revision
         )
-        self.model = AutoModel.from_pretrained(
-            model_name,
-            cache_dir=cache_dir
-        )
-        self.model.to(self.device)
-        self.model.eval()
+        model_config = AutoConfig.from_pretrained(model_name, cache_dir=cache_dir, revision=revision)
+        # Resolved hub commit, so a moved branch gets a fresh export
+        self.revision = getattr(model_config, "_commit_hash", None) or revision or "local"
+        self._requested_revision = revision
         
         # Get embedding dimension
-        self.embedding_dim = self.model.config.hidden_size
-        print(f"Text encoder loaded. Embedding dimension: {self.embedding_dim}")
+        self.embedding_dim = model_config.hidden_size
+        
+        self.model = None
+        self.onnx_session = None
+        if backend == "onnx":
+            onnx_path = onnx_path or str(Path(Config.ONNX_MODEL_DIR) / self._onnx_filename())
+            try:
+                self.onnx_session = self._load_onnx_session(onnx_path)
+            except Exception as e:
+                print(f"Warning: ONNX backend unavailable ({e}), using eager backend instead")
+                self.backend = "eager"
+            # Only needed for the export; the session holds its own weights
+            self.model = None
+            gc.collect()
+        
+        if self.onnx_session is None:
+            self.model = self._load_model()
+            if self.backend == "int8":
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {nn.Linear}, dtype=torch.qint8
+                )
+        
+        print(f"Text encoder loaded ({self.backend}). Embedding dimension: {self.embedding_dim}")
+    
+    def _load_model(self) -> nn.Module:
+        """Load the PyTorch transformer in eval mode on self.device."""
+        model = AutoModel.from_pretrained(
+            self.model_name,
+            cache_dir=self.cache_dir,
+            revision=self._requested_revision
+        )
+        model.to(self.device)
+        model.eval()
+        return model
+    
+    def _onnx_metadata(self) -> Dict[str, str]:
+        """What an ONNX export was built from; a cached export is reused only if this matches."""
+        return {"model_name": self.model_name, "revision": self.revision, "opset": ONNX_OPSET}
+    
+    def _onnx_filename(self) -> str:
+        """Default export filename, keyed by model, revision and opset."""
+        return f"{self.model_name.replace('/', '_')}-{self.revision[:12]}-opset{ONNX_OPSET}.onnx"
+    
+    def _export_onnx(self, onnx_path: str):
+        """Export the transformer to ONNX with dynamic batch and sequence axes."""
+        
+        class _HiddenStates(nn.Module):
+            """Return last_hidden_state only, so the graph has a single output."""
+            
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+            
+            def forward(self, input_ids, attention_mask):
+                return self.model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+        
+        Path(onnx_path).parent.mkdir(parents=True, exist_ok=True)
+        if self.model is None:
+            self.model = self._load_model()
+        dummy = self.tokenizer(["warm up"], return_tensors="pt")
+        export_kwargs = dict(
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"}
+            },
+            opset_version=ONNX_OPSET
+        )
+        args = (dummy["input_ids"], dummy["attention_mask"])
+        try:
+            torch.onnx.export(_HiddenStates(self.model), args, onnx_path, dynamo=False, **export_kwargs)
+        except TypeError:
+            # Older torch without the dynamo switch
+            torch.onnx.export(_HiddenStates(self.model), args, onnx_path, **export_kwargs)
+        Path(onnx_path + ".json").write_text(json.dumps(self._onnx_metadata()))
+        print(f"Exported text encoder to {onnx_path}")
+    
+    def _load_onnx_session(self, onnx_path: str):
+        """Load an ONNX Runtime CPU session, exporting first if the cached export is missing or stale."""
+        sidecar = Path(onnx_path + ".json")
+        try:
+            cached = json.loads(sidecar.read_text()) == self._onnx_metadata()
+        except (OSError, ValueError):
+            cached = False
+        if not (cached and Path(onnx_path).exists()):
+            self._export_onnx(onnx_path)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        return ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+    
+    def _forward(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """Run the selected backend and return last_hidden_state."""
+        if self.onnx_session is not None:
+            outputs = self.onnx_session.run(
+                ["last_hidden_state"],
+                {
+                    "input_ids": inputs["input_ids"].cpu().numpy().astype(np.int64),
+                    "attention_mask": inputs["attention_mask"].cpu().numpy().astype(np.int64)
+                }
+            )
+            return torch.from_numpy(outputs[0])
+        
+        with torch.inference_mode():
+            return self.model(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"]
+            ).last_hidden_state
     
     def encode(
         self, 
         text: str, 
         pooling: str = "cls",
-        max_length: int = 512
+        max_length: Optional[int] = None
     ) -> torch.Tensor:
         """
         Encode text into emotion embedding.
@@ -72,104 +241,163 @@ class TextEmotionEncoder:
         Args:
             text: Input text string
             pooling: Pooling strategy ('cls', 'mean', 'max')
-            max_length: Maximum sequence length
+            max_length: Maximum sequence length (defaults to self.max_length)
             
         Returns:
             Tensor of shape (embedding_dim,) - emotion embedding vector
         """
-        # Tokenize
+        # Tokenize (a single text never needs padding)
         inputs = self.tokenizer(
             text, 
             return_tensors="pt",
             truncation=True,
-            max_length=max_length,
-            padding=True
+            max_length=max_length or self.max_length
         )
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
         
         # Encode
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            hidden_states = outputs.last_hidden_state  # (batch, seq_len, hidden_dim)
-        
-        # Pooling
-        if pooling == "cls":
-            # Use [CLS] token embedding
-            embedding = hidden_states[0, 0, :]  # (hidden_dim,)
-        elif pooling == "mean":
-            # Mean pooling (excluding padding)
-            attention_mask = inputs["attention_mask"]
-            mask_expanded = attention_mask.unsqueeze(-1).expand(hidden_states.size())
-            masked_hidden = hidden_states * mask_expanded
-            sum_hidden = masked_hidden.sum(dim=1)
-            sum_mask = attention_mask.sum(dim=1, keepdim=True)
-            embedding = sum_hidden / sum_mask
-            embedding = embedding[0]  # Remove batch dimension
-        elif pooling == "max":
-            # Max pooling
-            embedding = hidden_states.max(dim=1)[0][0]
-        else:
-            raise ValueError(f"Unknown pooling strategy: {pooling}")
+        hidden_states = self._forward(inputs)  # (batch, seq_len, hidden_dim)
         
+        embedding = self._pool(hidden_states, inputs["attention_mask"], pooling)[0]
         return embedding.cpu()
     
     def encode_batch(
         self, 
         texts: List[str],
         pooling: str = "cls",
-        max_length: int = 512,
-        batch_size: int = 32
+        max_length: Optional[int] = None,
+        batch_size: int = 32,
+        padding: Union[bool, str] = True
     ) -> torch.Tensor:
         """
         Encode batch of texts.
         
+        Texts are sorted by token length and split into length buckets so
+        short utterances are never padded up to a long one; embeddings are
+        returned in the original input order.
+        
         Args:
             texts: List of input text strings
             pooling: Pooling strategy
-            max_length: Maximum sequence length
+            max_length: Maximum sequence length (defaults to self.max_length)
             batch_size: Batch size for processing
+            padding: True or 'longest' pads each chunk to its longest text,
+                'max_length' pads each chunk to its bucket boundary
             
         Returns:
             Tensor of shape (batch_size, embedding_dim)
         """
-        all_embeddings = []
+        if not texts:
+            return torch.empty(0, self.embedding_dim)
         
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
-            
-            # Tokenize batch
-            inputs = self.tokenizer(
-                batch_texts,
+        max_length = max_length or self.max_length
+        
+        # Tokenize without padding to get true lengths
+        encoded = self.tokenizer(
+            list(texts),
+            truncation=True,
+            max_length=max_length
+        )
+        input_ids = encoded["input_ids"]
+        
+        embeddings = [None] * len(texts)
+        for chunk, bucket in self._length_buckets(input_ids, batch_size, max_length):
+            if padding == "max_length":
+                pad_kwargs = {"padding": "max_length", "max_length": bucket}
+            else:
+                pad_kwargs = {"padding": "longest"}
+            inputs = self.tokenizer.pad(
+                {"input_ids": [input_ids[i] for i in chunk]},
                 return_tensors="pt",
-                truncation=True,
-                max_length=max_length,
-                padding=True
+                **pad_kwargs
             )
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
             
             # Encode
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                hidden_states = outputs.last_hidden_state
-            
-            # Pooling
-            if pooling == "cls":
-                embeddings = hidden_states[:, 0, :]  # Use [CLS] token
-            elif pooling == "mean":
-                attention_mask = inputs["attention_mask"]
-                mask_expanded = attention_mask.unsqueeze(-1).expand(hidden_states.size())
-                masked_hidden = hidden_states * mask_expanded
-                sum_hidden = masked_hidden.sum(dim=1)
-                sum_mask = attention_mask.sum(dim=1, keepdim=True)
-                embeddings = sum_hidden / sum_mask
-            elif pooling == "max":
-                embeddings = hidden_states.max(dim=1)[0]
-            else:
-                raise ValueError(f"Unknown pooling strategy: {pooling}")
+            hidden_states = self._forward(inputs)
             
-            all_embeddings.append(embeddings.cpu())
+            pooled = self._pool(hidden_states, inputs["attention_mask"], pooling).cpu()
+            # Restore original order
+            for row, idx in enumerate(chunk):
+                embeddings[idx] = pooled[row]
         
-        return torch.cat(all_embeddings, dim=0)
+        return torch.stack(embeddings, dim=0)
+    
+    @staticmethod
+    def _length_buckets(
+        input_ids: List[List[int]],
+        batch_size: int,
+        max_length: int
+    ) -> List[Tuple[List[int], int]]:
+        """
+        Group text indices into chunks of similar length.
+        
+        Returns:
+            List of (indices, bucket_length); each chunk holds at most
+            batch_size texts that all fall into the same length bucket
+        """
+        order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+        chunks = []
+        current, current_bucket = [], None
+        
+        for idx in order:
+            bucket = min(bucket_for_length(len(input_ids[idx])), max_length)
+            if current and (bucket != current_bucket or len(current) >= batch_size):
+                chunks.append((current, current_bucket))
+                current = []
+            current.append(idx)
+            current_bucket = bucket
+        
+        if current:
+            chunks.append((current, current_bucket))
+        return chunks
+    
+    @staticmethod
+    def _pool(
+        hidden_states: torch.Tensor,
+        attention_mask: torch.Tensor,
+        pooling: str
+    ) -> torch.Tensor:
+        """Pool token states into one embedding per sequence."""
+        if pooling == "cls":
+            # Use [CLS] token embedding
+            return hidden_states[:, 0, :]
+        elif pooling == "mean":
+            # Mean pooling (excluding padding)
+            mask_expanded = attention_mask.unsqueeze(-1).expand(hidden_states.size()).to(hidden_states.dtype)
+            sum_hidden = (hidden_states * mask_expanded).sum(dim=1)
+            sum_mask = attention_mask.sum(dim=1, keepdim=True).clamp(min=1)
+            return sum_hidden / sum_mask
+        elif pooling == "max":
+            # Max pooling (padding positions excluded)
+            masked = hidden_states.masked_fill(attention_mask.unsqueeze(-1) == 0, float("-inf"))
+            return masked.max(dim=1)[0]
+        else:
+            raise ValueError(f"Unknown pooling strategy: {pooling}")
+    
+    def calibrate_max_length(self, texts: List[str], percentile: float = 99.0) -> int:
+        """
+        Lower the default truncation length from a corpus of typical inputs.
+        
+        The result never exceeds the current max_length, so calibration can
+        only shorten what gets encoded.
+        
+        Args:
+            texts: Representative utterances (e.g. transcribed driving speech)
+            percentile: Token-length percentile to keep untruncated
+            
+        Returns:
+            New max_length (rounded up to a length bucket)
+        """
+        if not texts:
+            raise ValueError("Calibration corpus is empty")
+        lengths = [len(ids) for ids in self.tokenizer(list(texts), truncation=False)["input_ids"]]
+        self.max_length = min(
+            bucket_for_length(int(np.ceil(np.percentile(lengths, percentile)))),
+            self.max_length,
+            self.tokenizer.model_max_length
+        )
+        return self.max_length
     
     def __call__(self, text: str, **kwargs) -> torch.Tensor:
         """Convenience method: encoder(text) instead of encoder.encode(text)."""
@@ -198,9 +426,18 @@ class TextEmotionEncoderLite:
         return torch.stack(embeddings)
 
 
+def load_calibration_corpus(path: str) -> List[str]:
+    """Read a calibration corpus: one utterance per line, blank lines skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
 def create_text_encoder(
     model_name: str = "distilbert-base-uncased",
     use_lite: bool = False,
+    backend: Optional[str] = None,
+    num_threads: Optional[int] = None,
+    calibration_corpus: Optional[str] = None,
     **kwargs
 ) -> TextEmotionEncoder:
     """
@@ -209,6 +446,12 @@ def create_text_encoder(
     Args:
         model_name: HuggingFace model name
         use_lite: Force use of lite encoder (for testing)
+        backend: 'eager', 'int8' or 'onnx' (defaults to Config.TEXT_ENCODER_BACKEND)
+        num_threads: CPU threads (defaults to Config.TEXT_ENCODER_THREADS)
+        calibration_corpus: Utterance file to calibrate max_length from
+            (defaults to Config.TEXT_ENCODER_CALIBRATION_CORPUS; ignored when
+            max_length is passed). If it is unset or unreadable the encoder
+            keeps TEXT_ENCODER_MAX_LENGTH.
         **kwargs: Additional arguments for TextEmotionEncoder
         
     Returns:
@@ -217,5 +460,24 @@ def create_text_encoder(
     if use_lite or not TRANSFORMERS_AVAILABLE:
         return TextEmotionEncoderLite()
     
-    return TextEmotionEncoder(model_name=model_name, **kwargs)
+    backend = backend or Config.TEXT_ENCODER_BACKEND
+    if backend == "onnx" and not ONNXRUNTIME_AVAILABLE:
+        print("Warning: onnxruntime not available, using eager backend instead")
+        backend = "eager"
+    
+    encoder = TextEmotionEncoder(
+        model_name=model_name,
+        backend=backend,
+        num_threads=num_threads or Config.TEXT_ENCODER_THREADS,
+        **kwargs
+    )
+    
+    calibration_corpus = calibration_corpus or Config.TEXT_ENCODER_CALIBRATION_CORPUS
+    if calibration_corpus and kwargs.get("max_length") is None:
+        try:
+            max_length = encoder.calibrate_max_length(load_calibration_corpus(calibration_corpus))
+            print(f"Text encoder max_length calibrated to {max_length} from {calibration_corpus}")
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not calibrate text encoder ({e}), keeping max_length={encoder.max_length}")
+    return encoder
 
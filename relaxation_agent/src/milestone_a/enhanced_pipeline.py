@@ -1,24 +1,23 @@
 """Enhanced Relaxation Agent Pipeline - Full 10-stage implementation."""
 
 import torch
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.core.preprocessor import TextPreprocessor, AudioPreprocessor
-from src.core.text_encoder import TextEmotionEncoder, create_text_encoder
-from src.core.acoustic_encoder import AcousticEmotionEncoder, create_acoustic_encoder
 from src.core.multimodal_fusion import MultimodalFusion
 from src.core.emotion_classifier import EmotionClassifier, EMOTION_LABELS
 from src.core.stress_scorer import StressScorer
 from src.core.profile_interpreter import ProfileInterpreter, UserProfile
 from src.core.prompt_generator import CopingPromptGenerator
-from src.core.voice_style_generator import VoiceStyleGenerator, create_voice_style_generator
-from src.core.communicator import Communicator
+from src.core.voice_style_generator import create_voice_style_generator
 from src.core.logger import Logger
 from src.core.config import Config
+from src.core.analysis_cache import AnalysisCache
+from src.core.model_registry import get_text_encoder, get_text_batcher, get_acoustic_encoder
 
 
 class EnhancedRelaxationAgentPipeline:
@@ -63,7 +62,8 @@ class EnhancedRelaxationAgentPipeline:
         self.use_text_encoder = use_text_encoder
         try:
             if use_text_encoder:
-                self.text_encoder = create_text_encoder()
+                # Shared with every other pipeline in the process
+                self.text_encoder = get_text_encoder()
                 print("Text encoder (DistilBERT) initialized")
             else:
                 self.text_encoder = None
@@ -73,6 +73,9 @@ class EnhancedRelaxationAgentPipeline:
             self.text_encoder = None
             self.use_text_encoder = False
         
+        # Batches concurrent encode calls from async endpoints (one per process)
+        self.text_batcher = get_text_batcher() if self.text_encoder is not None else None
+        
         # Stage 3: Acoustic encoder (optional)
         self.use_acoustic_encoder = use_acoustic_encoder and use_fusion
         if use_acoustic_encoder:
@@ -109,6 +112,53 @@ class EnhancedRelaxationAgentPipeline:
         # Supporting services
         self.logger = Logger() if enable_logging else None
         self.communicator = None  # Will be set if needed
+        
+        # Memoizes preprocessing, embeddings and emotion probs per utterance
+        self.analysis_cache = (
+            AnalysisCache(max_size=Config.ANALYSIS_CACHE_SIZE)
+            if Config.ANALYSIS_CACHE_SIZE > 0 else None
+        )
+    
+    def _cached(self, namespace: str, text: str, compute: Callable[[], Any], **options) -> Any:
+        """Run compute() through the analysis cache when it is enabled."""
+        if self.analysis_cache is None:
+            return compute()
+        return self.analysis_cache.get_or_compute(namespace, text, compute, **options)
+    
+    def _embedding_options(self) -> Dict:
+        """Cache options identifying how an embedding was produced."""
+        encoder = self.text_encoder
+        return {
+            "model": getattr(encoder, "model_name", type(encoder).__name__),
+            "backend": getattr(encoder, "backend", None),
+            "max_length": getattr(encoder, "max_length", None),
+            "pooling": self.text_batcher.pooling if self.text_batcher else "cls"
+        }
+    
+    async def encode_text_async(self, text: str) -> Optional[torch.Tensor]:
+        """
+        Encode text through the micro-batcher, so concurrent requests share
+        one forward pass. Pass the result to process(text_embedding=...).
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Text embedding, or None if the text encoder is disabled
+        """
+        if not (self.use_text_encoder and self.text_batcher):
+            return None
+        
+        options = self._embedding_options()
+        if self.analysis_cache is not None:
+            cached = self.analysis_cache.get("text_embedding", text, **options)
+            if cached is not None:
+                return cached
+        
+        embedding = await self.text_batcher.encode(text)
+        if self.analysis_cache is not None:
+            self.analysis_cache.put("text_embedding", text, embedding, **options)
+        return embedding
     
     def process(
         self,
@@ -116,7 +166,8 @@ class EnhancedRelaxationAgentPipeline:
         audio_features: Optional[Dict] = None,
         user_profile: Optional[UserProfile] = None,
         user_id: Optional[str] = None,
-        publish_alerts: bool = False
+        publish_alerts: bool = False,
+        text_embedding: Optional[torch.Tensor] = None
     ) -> Dict:
         """
         Process input through full pipeline.
@@ -127,6 +178,7 @@ class EnhancedRelaxationAgentPipeline:
             user_profile: Optional user profile for personalization
             user_id: Optional user identifier
             publish_alerts: Whether to publish alerts via Redis
+            text_embedding: Precomputed text embedding (e.g. from encode_text_async)
             
         Returns:
             Complete analysis result dictionary
@@ -139,24 +191,34 @@ class EnhancedRelaxationAgentPipeline:
         audio_processed = None
         
         if text:
-            text_processed = self.text_preprocessor.preprocess(text)
+            text_processed = self._cached(
+                "preprocess", text,
+                lambda: self.text_preprocessor.preprocess(text)
+            )
         
         if audio_features:
             # Audio features should already be extracted
             audio_processed = audio_features
         
         # Stage 2: Text encoding
-        text_emb = None
+        text_emb = text_embedding
         emotion_probs_from_text = None
         
         if text:
             if self.use_text_encoder and self.text_encoder:
-                # Use DistilBERT
-                text_emb = self.text_encoder.encode(text)
+                # Use DistilBERT (repeat utterances skip the forward pass)
+                if text_emb is None:
+                    options = self._embedding_options()
+                    text_emb = self._cached(
+                        "text_embedding", text,
+                        lambda: self.text_encoder.encode(text, pooling=options["pooling"]),
+                        **options
+                    )
             else:
                 # Fall back to rule-based classification
-                emotion_probs_from_text = self.emotion_classifier.predict_from_text(
-                    text, text_processed
+                emotion_probs_from_text = self._cached(
+                    "emotion_probs", text,
+                    lambda: self.emotion_classifier.predict_from_text(text, text_processed)
                 )
         
         # Stage 3: Acoustic encoding
@@ -169,14 +231,16 @@ class EnhancedRelaxationAgentPipeline:
                 if mfcc_dim == 0:
                     mfcc_dim = 13  # Default
                 self.acoustic_input_dim = mfcc_dim
-                self.acoustic_encoder = create_acoustic_encoder(input_dim=mfcc_dim)
+                self.acoustic_encoder = get_acoustic_encoder(input_dim=mfcc_dim)
             
             # Prepare input for encoder (sequence format)
             from src.milestone_b.audio_features import AudioFeatureExtractor
             extractor = AudioFeatureExtractor()
-            model_input = extractor.prepare_for_model(audio_features, sequence_length=100)
+            # Per-frame MFCCs at their own length (no tiling to a fixed 100 frames)
+            model_input = extractor.prepare_for_model(audio_features, sequence_length=None)
             audio_input_tensor = torch.FloatTensor(model_input).unsqueeze(0)
-            audio_emb = self.acoustic_encoder(audio_input_tensor).squeeze(0)
+            with torch.inference_mode():
+                audio_emb = self.acoustic_encoder(audio_input_tensor).squeeze(0)
         
         # Stage 4: Multimodal fusion (if both available)
         fused_emb = None
@@ -190,7 +254,10 @@ class EnhancedRelaxationAgentPipeline:
         if emotion_probs_from_text is None:
             # Use text-based or combined classification
             if text:
-                emotion_probs = self.emotion_classifier.predict_from_text(text, text_processed)
+                emotion_probs = self._cached(
+                    "emotion_probs", text,
+                    lambda: self.emotion_classifier.predict_from_text(text, text_processed)
+                )
             else:
                 # Audio-only: would need trained model
                 emotion_probs = {label: 1.0 if label == "neutral" else 0.0 
@@ -252,14 +319,13 @@ class EnhancedRelaxationAgentPipeline:
             )
         
         # Publishing alerts
-        if publish_alerts and stress_result["stress_level"] in ["high", "medium"]:
-            if self.communicator:
-                self.communicator.publish_stress_alert(
-                    stress_score=stress_result.get("stress_score_normalized", stress_result["stress_score"]),
-                    stress_level=stress_result["stress_level"],
-                    emotion=top_emotion,
-                    user_id=user_id
-                )
+        if publish_alerts and self.communicator:
+            self.communicator.report_stress(
+                stress_score=stress_result.get("stress_score_normalized", stress_result["stress_score"]),
+                stress_level=stress_result["stress_level"],
+                emotion=top_emotion,
+                user_id=user_id
+            )
         
         return {
             "input": {
@@ -8,7 +8,7 @@ This is the first milestone - a working text-only prototype that:
 - Returns results via console or REST
 """
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import sys
 from pathlib import Path
 
@@ -21,6 +21,8 @@ from src.core.stress_scorer import StressScorer
 from src.core.prompt_generator import CopingPromptGenerator
 from src.core.voice_style_generator import create_voice_style_generator
 from src.core.logger import Logger
+from src.core.analysis_cache import AnalysisCache
+from src.core.config import Config
 
 
 class RelaxationAgentPipeline:
@@ -34,6 +36,30 @@ class RelaxationAgentPipeline:
         self.voice_style_generator = create_voice_style_generator()
         self.logger = Logger() if enable_logging else None
         self.communicator = None  # Will be added in Milestone D
+        self.analysis_cache = (
+            AnalysisCache(max_size=Config.ANALYSIS_CACHE_SIZE)
+            if Config.ANALYSIS_CACHE_SIZE > 0 else None
+        )
+    
+    def analyze_text(self, text: str) -> Tuple[Dict, Dict[str, float]]:
+        """
+        Preprocess and classify text, reusing cached results for repeat utterances.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Tuple of (preprocessed text dict, emotion probabilities)
+        """
+        def compute():
+            preprocessed = self.text_preprocessor.preprocess(text)
+            emotion_probs = self.emotion_classifier.predict_from_text(text, preprocessed)
+            return preprocessed, emotion_probs
+        
+        if self.analysis_cache is None:
+            return compute()
+        
+        return self.analysis_cache.get_or_compute("text_analysis", text, compute)
     
     def process_text(
         self,
@@ -52,11 +78,8 @@ class RelaxationAgentPipeline:
         Returns:
             Dictionary with analysis results
         """
-        # Preprocess text
-        preprocessed = self.text_preprocessor.preprocess(text)
-        
-        # Classify emotion
-        emotion_probs = self.emotion_classifier.predict_from_text(text, preprocessed)
+        # Preprocess text and classify emotion (cached for repeat utterances)
+        preprocessed, emotion_probs = self.analyze_text(text)
         top_emotion, top_prob = self.emotion_classifier.get_top_emotion(emotion_probs)
         
         # Compute stress score
@@ -97,15 +120,14 @@ class RelaxationAgentPipeline:
                 user_id=user_id
             )
         
-        # Publish alerts if high stress
-        if publish_alerts and stress_result["stress_level"] in ["high", "medium"]:
-            if self.communicator:
-                self.communicator.publish_stress_alert(
-                    stress_score=stress_result["stress_score"],
-                    stress_level=stress_result["stress_level"],
-                    emotion=top_emotion,
-                    user_id=user_id
-                )
+        # Publish alerts (debounced per user)
+        if publish_alerts and self.communicator:
+            self.communicator.report_stress(
+                stress_score=stress_result["stress_score"],
+                stress_level=stress_result["stress_level"],
+                emotion=top_emotion,
+                user_id=user_id
+            )
         
         return {
             "input_text": text,
@@ -4,16 +4,32 @@ import numpy as np
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
+from src.core.emotion_classifier import MIN_MODEL_FRAMES
 from src.core.preprocessor import AudioPreprocessor, TextPreprocessor
+from src.core.audio_io import AudioSource, load_audio
 
 
 class AudioFeatureExtractor:
     """Extracts audio features for emotion classification."""
     
-    def __init__(self, sample_rate: int = 22050, n_mfcc: int = 13):
-        self.preprocessor = AudioPreprocessor(sample_rate=sample_rate, n_mfcc=n_mfcc)
+    def __init__(
+        self,
+        sample_rate: int = 22050,
+        n_mfcc: int = 13,
+        profile: Optional[str] = None,
+        sequence: Optional[bool] = None,
+        frame_rate: Optional[float] = None
+    ):
+        self.preprocessor = AudioPreprocessor(
+            sample_rate=sample_rate,
+            n_mfcc=n_mfcc,
+            profile=profile,
+            sequence=sequence,
+            frame_rate=frame_rate
+        )
         self.sample_rate = sample_rate
         self.n_mfcc = n_mfcc
+        self.profile = self.preprocessor.profile
     
     def extract_from_file(self, audio_path: str) -> Dict[str, np.ndarray]:
         """Extract features from audio file."""
@@ -27,22 +43,55 @@ class AudioFeatureExtractor:
             sample_rate or self.sample_rate
         )
     
+    def extract_from_buffer(
+        self,
+        source: AudioSource,
+        filename: Optional[str] = None,
+        pcm_sample_rate: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Extract features from encoded audio in memory (e.g. an upload).
+        
+        Args:
+            source: Audio bytes or a binary file object
+            filename: Original file name, used only by the fallback decoder
+            pcm_sample_rate: Sample rate if the input is headerless 16-bit PCM
+            
+        Returns:
+            Dictionary of extracted features
+        """
+        audio_array, sample_rate = load_audio(
+            source,
+            sample_rate=self.sample_rate,
+            filename=filename,
+            pcm_sample_rate=pcm_sample_rate
+        )
+        return self.extract_from_array(audio_array, sample_rate)
+    
     def prepare_for_model(self, features: Dict[str, np.ndarray], 
-                         sequence_length: int = 100) -> np.ndarray:
+                         sequence_length: Optional[int] = 100) -> np.ndarray:
         """
         Prepare features for CNN-LSTM model input.
         
+        Uses the per-frame MFCCs ("mfcc_sequence") when present; features
+        with only the mean MFCC vector are repeated as a constant sequence.
+        
         Args:
             features: Dictionary of extracted features
-            sequence_length: Desired sequence length for model
+            sequence_length: Desired sequence length for model (None keeps
+                the utterance's own length, at least MIN_MODEL_FRAMES)
             
         Returns:
             Array of shape (sequence_length, n_mfcc) ready for model
         """
-        mfcc = features.get('mfcc', np.zeros(self.n_mfcc))
+        mfcc = features.get('mfcc_sequence')
+        if mfcc is None:
+            mfcc = features.get('mfcc', np.zeros(self.n_mfcc))
+        mfcc = np.asarray(mfcc, dtype=np.float32)
+        if sequence_length is None:
+            sequence_length = max(len(mfcc) if mfcc.ndim > 1 else 0, MIN_MODEL_FRAMES)
         
         # If MFCC is 1D, we need to create a sequence
-        # For now, we'll pad/repeat to create a sequence
         if len(mfcc.shape) == 1:
             # Repeat MFCC to create sequence
             mfcc_sequence = np.tile(mfcc, (sequence_length, 1))
@@ -0,0 +1,84 @@
+"""Tests for the acoustic model inference backends."""
+
+import numpy as np
+import pytest
+import torch
+from src.core.acoustic_encoder import create_acoustic_encoder
+from src.core.acoustic_export import (
+    ACOUSTIC_BACKENDS, export_acoustic_model, load_acoustic_model, optimize_acoustic_model
+)
+from src.core.emotion_classifier import EMOTION_LABELS, CNNLSTMEmotionClassifier, EmotionClassifier
+
+
+def inputs(batch_size=3, frames=40, n_mfcc=13):
+    torch.manual_seed(1)
+    return torch.randn(batch_size, frames, n_mfcc), torch.tensor([frames, 17, 4][:batch_size])
+
+
+@pytest.mark.parametrize("backend", ACOUSTIC_BACKENDS)
+def test_backends_match_eager(backend):
+    """Every backend runs in eval mode and stays close to the fp32 model."""
+    torch.manual_seed(0)
+    model = CNNLSTMEmotionClassifier()
+    x, lengths = inputs()
+    with torch.inference_mode():
+        reference = model.eval()(x, lengths)
+        model.train()
+        optimized = optimize_acoustic_model(model, backend)
+        output = optimized(x, lengths)
+    # Frozen TorchScript modules drop the flag altogether
+    assert not getattr(optimized, "training", False)
+    assert output.shape == (3, len(EMOTION_LABELS))
+    assert torch.allclose(output, reference, atol=1e-3 if "int8" in backend else 1e-6)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        optimize_acoustic_model(CNNLSTMEmotionClassifier(), "fp16")
+
+
+def test_classifier_rejects_bad_backend(tmp_path, monkeypatch):
+    """A misconfigured backend fails loudly instead of leaving the classifier without a model."""
+    import src.core.emotion_classifier as emotion_classifier
+
+    torch.save({"model_state_dict": CNNLSTMEmotionClassifier().state_dict()}, tmp_path / "checkpoint.pt")
+    with pytest.raises(ValueError):
+        EmotionClassifier(str(tmp_path / "checkpoint.pt"), backend="fp16")
+
+    def unscriptable(model, backend):
+        raise torch.jit.Error("pack_padded_sequence is not supported")
+
+    monkeypatch.setattr(emotion_classifier, "optimize_acoustic_model", unscriptable)
+    with pytest.raises(RuntimeError, match="torchscript"):
+        EmotionClassifier(str(tmp_path / "checkpoint.pt"), backend="torchscript")
+
+def test_export_and_load(tmp_path):
+    """A TorchScript export loads without the model class and gives the same outputs."""
+    encoder = create_acoustic_encoder(input_dim=13)
+    path = export_acoustic_model(encoder, str(tmp_path / "encoder.pt"))
+    loaded = load_acoustic_model(path)
+    x, _ = inputs()
+    with torch.inference_mode():
+        assert torch.allclose(loaded(x), optimize_acoustic_model(encoder, "torchscript_int8")(x))
+
+    torch.save(encoder.state_dict(), tmp_path / "state.pt")
+    assert load_acoustic_model(str(tmp_path / "state.pt")) is None
+
+
+def test_classifier_loads_export(tmp_path):
+    """EmotionClassifier accepts both checkpoints and TorchScript exports."""
+    torch.manual_seed(0)
+    model = CNNLSTMEmotionClassifier()
+    torch.save({"model_state_dict": model.state_dict()}, tmp_path / "checkpoint.pt")
+    export_acoustic_model(model, str(tmp_path / "export.pt"), backend="torchscript")
+
+    features = [np.random.default_rng(0).standard_normal((30, 13)).astype(np.float32)]
+    from_checkpoint = EmotionClassifier(str(tmp_path / "checkpoint.pt"), backend="eager")
+    from_export = EmotionClassifier(str(tmp_path / "export.pt"))
+    assert isinstance(from_export.model, torch.jit.ScriptModule)
+    assert not from_checkpoint.model.training
+    assert np.allclose(
+        from_checkpoint.predict_batch_from_audio(features),
+        from_export.predict_batch_from_audio(features),
+        atol=1e-6
+    )
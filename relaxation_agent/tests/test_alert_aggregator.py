@@ -0,0 +1,86 @@
+"""Tests for per-user alert debouncing."""
+
+import pytest
+from src.core.alert_aggregator import AlertAggregator
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def aggregator(clock):
+    return AlertAggregator(min_interval_s=30, score_delta=0.15, hysteresis=0.05, emit_recovery=False, clock=clock)
+
+
+def test_repeats_are_coalesced(aggregator, clock):
+    """A steady stream of similar samples yields one alert."""
+    assert aggregator.offer("u1", 0.75, "high")["reason"] == "first"
+    for i in range(50):
+        clock.now += 1
+        assert aggregator.offer("u1", 0.75 + (i % 3) * 0.02, "high") is None
+
+    stats = aggregator.stats()
+    assert stats["emitted"] == 1
+    assert stats["suppressed"] == 50
+
+
+def test_escalation_is_immediate(aggregator, clock):
+    """Rising levels are published right away, with the coalesced count."""
+    aggregator.offer("u1", 0.5, "medium")
+    clock.now += 1
+    aggregator.offer("u1", 0.55, "medium")
+    clock.now += 1
+
+    alert = aggregator.offer("u1", 0.8, "high")
+    assert alert == {"reason": "escalation", "previous_level": "medium", "coalesced": 1, "peak_score": 0.8}
+
+
+def test_hysteresis_prevents_flapping(aggregator, clock):
+    """A score hovering around a threshold does not toggle the level."""
+    aggregator.offer("u1", 0.72, "high")
+    clock.now += 60
+    # Just under the boundary, within the hysteresis margin
+    assert aggregator.offer("u1", 0.69, "medium") is None
+    assert aggregator.offer("u1", 0.71, "high") is None
+    # Clearly lower
+    assert aggregator.offer("u1", 0.6, "medium")["reason"] == "deescalation"
+
+
+def test_score_change_respects_min_interval(aggregator, clock):
+    """Significant changes within a level wait for the minimum interval."""
+    aggregator.offer("u1", 0.45, "medium")
+    clock.now += 5
+    assert aggregator.offer("u1", 0.65, "medium") is None
+    clock.now += 30
+    assert aggregator.offer("u1", 0.65, "medium")["reason"] == "score_change"
+
+
+def test_recovery_resets_state(aggregator, clock):
+    """Falling to low is silent by default, so the next rise is a fresh alert."""
+    aggregator.offer("u1", 0.8, "high")
+    clock.now += 60
+    assert aggregator.offer("u1", 0.2, "low") is None
+    clock.now += 1
+    assert aggregator.offer("u1", 0.5, "medium")["reason"] == "escalation"
+
+
+def test_users_are_independent(aggregator):
+    """State is kept per user; samples without a user are never suppressed."""
+    assert aggregator.offer("u1", 0.8, "high")
+    assert aggregator.offer("u2", 0.8, "high")
+    assert aggregator.offer(None, 0.8, "high")
+    assert aggregator.offer(None, 0.8, "high")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
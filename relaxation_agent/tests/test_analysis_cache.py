@@ -0,0 +1,78 @@
+"""Tests for the text analysis cache."""
+
+import pytest
+from src.core.analysis_cache import AnalysisCache, normalize_text
+
+
+def test_normalize_text():
+    """Case and whitespace differences map to the same key."""
+    assert normalize_text("  I'm   STRESSED ") == "i'm stressed"
+    assert AnalysisCache.make_key("probs", "Too much traffic") == \
+        AnalysisCache.make_key("probs", "too much  traffic")
+
+
+def test_options_change_key():
+    """Options are part of the key."""
+    assert AnalysisCache.make_key("emb", "hi", pooling="cls") != \
+        AnalysisCache.make_key("emb", "hi", pooling="mean")
+    assert AnalysisCache.make_key("emb", "hi") != AnalysisCache.make_key("probs", "hi")
+
+
+def test_get_or_compute_hits():
+    """Repeat lookups skip the computation and are counted as hits."""
+    cache = AnalysisCache(max_size=10)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"anxious": 0.9}
+
+    assert cache.get_or_compute("probs", "I'm stressed", compute) == {"anxious": 0.9}
+    assert cache.get_or_compute("probs", "i'm  stressed", compute) == {"anxious": 0.9}
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted first."""
+    cache = AnalysisCache(max_size=2)
+    cache.put("probs", "a", 1)
+    cache.put("probs", "b", 2)
+    cache.get("probs", "a")
+    cache.put("probs", "c", 3)
+
+    assert cache.get("probs", "a") == 1
+    assert cache.get("probs", "b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_values_are_copied():
+    """Mutating a returned value does not change the cached entry."""
+    cache = AnalysisCache(max_size=10)
+    preprocessed = {"tokens": ["too", "much", "traffic"]}
+    cache.put("preprocess", "too much traffic", preprocessed)
+    preprocessed["tokens"].append("stored")
+
+    first = cache.get("preprocess", "too much traffic")
+    first["tokens"].append("mutated")
+
+    assert cache.get("preprocess", "too much traffic") == {"tokens": ["too", "much", "traffic"]}
+
+def test_pipeline_reuses_analysis():
+    """Repeat utterances do not re-run the classifier."""
+    from src.milestone_a.text_prototype import RelaxationAgentPipeline
+
+    pipeline = RelaxationAgentPipeline(enable_logging=False)
+    first = pipeline.process_text("I'm stressed")
+    second = pipeline.process_text("I'm   stressed")
+
+    assert first["emotion"] == second["emotion"]
+    assert pipeline.analysis_cache.stats()["hits"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -68,3 +68,69 @@ def test_get_stress_alerts():
     assert "alerts" in data
     assert "count" in data
 
+
+
+SESSION_URL = "/ws/session?user_id=ws_user&publish_alerts=false&use_text_encoder=false&use_profile=false"
+
+
+def test_session_pushes_updates():
+    """Streaming session sends an update for the first frame and answers pings."""
+    with client.websocket_connect(SESSION_URL) as ws:
+        assert ws.receive_json()["type"] == "session"
+
+        ws.send_json({"type": "frame", "text": "I'm feeling really stressed and anxious"})
+        update = ws.receive_json()
+        assert update["type"] == "update"
+        assert update["changed"] == ["initial"]
+        assert 0.0 <= update["stress_score"] <= 1.0
+
+        ws.send_json({"type": "ping"})
+        state = ws.receive_json()
+        assert state["type"] == "state"
+        assert state["frame"] == 1
+
+        ws.send_json({"type": "end"})
+
+
+def test_session_suppresses_unchanged_frames():
+    """Repeating the same frame produces no further updates."""
+    with client.websocket_connect(SESSION_URL) as ws:
+        ws.receive_json()
+        for _ in range(3):
+            ws.send_json({"type": "frame", "text": "Traffic is fine today"})
+        ws.send_json({"type": "ping"})
+
+        messages = [ws.receive_json(), ws.receive_json()]
+        assert [m["type"] for m in messages] == ["update", "state"]
+        assert messages[1]["frame"] == 3
+
+
+def test_session_reports_bad_frames():
+    """Invalid frames get an error message and the session stays open."""
+    with client.websocket_connect(SESSION_URL) as ws:
+        ws.receive_json()
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"type": "frame"})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json()["type"] == "state"
+
+
+def test_session_setup_failure_closes(monkeypatch):
+    """If the pipeline cannot be built, the client gets an error and a 1011 close."""
+    import src.api.main as main
+    from starlette.websockets import WebSocketDisconnect
+
+    def broken_pipeline(**kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(main, "get_enhanced_pipeline", broken_pipeline)
+    with client.websocket_connect(SESSION_URL) as ws:
+        error = ws.receive_json()
+        assert error["type"] == "error"
+        assert "model unavailable" in error["detail"]
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 1011
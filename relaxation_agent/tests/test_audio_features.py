@@ -0,0 +1,120 @@
+"""Tests for audio feature profiles and sequence model input."""
+
+import numpy as np
+import pytest
+from src.core.emotion_classifier import EMOTION_LABELS, CNNLSTMEmotionClassifier, EmotionClassifier
+from src.core.preprocessor import AudioPreprocessor, downsample_frames, pad_sequences, sequence_mask
+
+
+def harmonic_tone(f0=220.0, sample_rate=22050, seconds=1.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    y = sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 4))
+    return (0.3 * y / np.abs(y).max()).astype(np.float32)
+
+
+def test_pad_sequences_and_mask():
+    """Variable-length sequences are zero-padded with their lengths and mask."""
+    batch, lengths = pad_sequences([np.ones((3, 2)), np.ones((5, 2)), np.ones((1, 2))], min_len=4)
+    assert batch.shape == (3, 5, 2) and batch.dtype == np.float32
+    assert lengths.tolist() == [3, 5, 1]
+    assert batch[0, 3:].sum() == 0 and batch[1].sum() == 10
+
+    mask = sequence_mask(lengths)
+    assert mask.sum(axis=1).tolist() == [3, 5, 1]
+    assert np.array_equal(batch.sum(axis=2) > 0, mask)
+
+    short, lengths = pad_sequences([np.ones((2, 2))], min_len=4)
+    assert short.shape == (1, 4, 2) and lengths.tolist() == [2]
+
+    truncated, lengths = pad_sequences([np.ones((10, 2)), np.ones((3, 2))], max_len=6)
+    assert truncated.shape == (2, 6, 2) and lengths.tolist() == [6, 3]
+
+
+def test_downsample_frames():
+    frames = np.arange(10, dtype=np.float32).reshape(5, 2)
+    assert downsample_frames(frames, 1) is frames
+    assert downsample_frames(frames, 2).tolist() == [[1, 2], [5, 6], [8, 9]]
+
+
+def test_predict_from_audio_shapes():
+    """Per-frame MFCCs and mean-only features both reach the model as (1, frames, n_mfcc)."""
+    classifier = EmotionClassifier()
+    classifier.model = CNNLSTMEmotionClassifier().eval()
+
+    for features in (
+        {"mfcc_sequence": np.random.randn(57, 13).astype(np.float32)},
+        {"mfcc_sequence": np.random.randn(2, 13).astype(np.float32)},
+        {"mfcc": np.random.randn(13).astype(np.float32)},
+    ):
+        probs = classifier.predict_from_audio(features)
+        assert list(probs) == EMOTION_LABELS
+        assert sum(probs.values()) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_predict_batch_matches_single():
+    """Padded, packed batch inference gives each utterance's single-utterance result."""
+    classifier = EmotionClassifier()
+    classifier.model = CNNLSTMEmotionClassifier().eval()
+    rng = np.random.default_rng(0)
+    batch = [rng.standard_normal((n, 13)).astype(np.float32) for n in (2, 4, 7, 31, 120)]
+    batch.append({"mfcc": rng.standard_normal(13).astype(np.float32)})
+
+    probs = classifier.predict_batch_from_audio(batch)
+    assert probs.shape == (len(batch), len(EMOTION_LABELS))
+    for row, item in zip(probs, batch):
+        features = item if isinstance(item, dict) else {"mfcc_sequence": item}
+        single = classifier.predict_from_audio(features)
+        assert np.allclose(row, [single[label] for label in EMOTION_LABELS], atol=1e-6)
+
+    truncated = classifier.predict_batch_from_audio([batch[-2]], max_frames=31)
+    assert np.allclose(truncated[0], classifier.predict_batch_from_audio([batch[-2][:31]])[0], atol=1e-6)
+
+
+def test_predict_batch_without_model():
+    probs = EmotionClassifier().predict_batch_from_audio([np.zeros((10, 13))] * 3)
+    assert probs.shape == (3, len(EMOTION_LABELS))
+    assert probs[:, EMOTION_LABELS.index("neutral")].tolist() == [1.0, 1.0, 1.0]
+    assert EmotionClassifier().predict_batch_from_audio([]).shape == (0, len(EMOTION_LABELS))
+
+
+def test_realtime_matches_full_spectral_features():
+    """The shared-STFT profile reproduces MFCC, centroid, rolloff and ZCR."""
+    pytest.importorskip("librosa")
+    y = harmonic_tone()
+    full = AudioPreprocessor(profile="full").extract_features_from_array(y)
+    fast = AudioPreprocessor(profile="realtime").extract_features_from_array(y)
+
+    assert np.allclose(full["mfcc"], fast["mfcc"], rtol=1e-4, atol=1e-3)
+    for name in ("spectral_centroid", "spectral_rolloff", "zero_crossing_rate", "duration"):
+        assert fast[name] == pytest.approx(full[name], rel=1e-5)
+    assert "tempo" in full and "tempo" not in fast
+    assert np.allclose(full["mfcc_sequence"], fast["mfcc_sequence"], rtol=1e-4, atol=1e-3)
+
+
+def test_mfcc_sequence():
+    """Per-frame MFCCs are float32 (frames, n_mfcc), optionally downsampled."""
+    pytest.importorskip("librosa")
+    y = harmonic_tone(seconds=2.0)
+    native = AudioPreprocessor(sequence=True, frame_rate=0).extract_features_from_array(y)
+    sequence = native["mfcc_sequence"]
+    assert sequence.dtype == np.float32 and sequence.shape == (87, 13)
+    assert np.allclose(sequence.mean(axis=0), native["mfcc"], atol=1e-3)
+
+    downsampled = AudioPreprocessor(sequence=True, frame_rate=20).extract_features_from_array(y)
+    assert downsampled["mfcc_sequence"].shape == (29, 13)
+    assert "mfcc_sequence" not in AudioPreprocessor(sequence=False).extract_features_from_array(y)
+
+
+def test_realtime_pitch_is_f0():
+    """YIN pitch tracks the fundamental; silence gives 0."""
+    pytest.importorskip("librosa")
+    preprocessor = AudioPreprocessor(profile="realtime")
+    pitch = preprocessor.extract_features_from_array(harmonic_tone(220.0))["pitch"]
+    assert pitch.dtype == np.float32 and pitch.shape == (1,)
+    assert pitch[0] == pytest.approx(220.0, rel=0.02)
+    assert preprocessor.extract_features_from_array(np.zeros(22050, dtype=np.float32))["pitch"][0] == 0.0
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        AudioPreprocessor(profile="fastest")
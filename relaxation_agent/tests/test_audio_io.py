@@ -0,0 +1,52 @@
+"""Tests for in-memory audio decoding."""
+
+import io
+
+import numpy as np
+import pytest
+from src.core.audio_io import SOUNDFILE_AVAILABLE, decode_pcm16, load_audio
+
+
+def tone(sample_rate=16000, seconds=0.5):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_decode_pcm16():
+    """Raw PCM is scaled to [-1, 1] and stereo is averaged."""
+    pcm = np.array([0, 16384, -32768, 32767], dtype="<i2").tobytes()
+    assert decode_pcm16(pcm).tolist() == pytest.approx([0.0, 0.5, -1.0, 32767 / 32768])
+    assert decode_pcm16(pcm, channels=2).tolist() == pytest.approx([0.25, -0.5 / 32768])
+
+
+def test_load_raw_pcm():
+    """Headerless PCM is decoded at the declared rate."""
+    y = tone()
+    pcm = (y * 32767).astype("<i2").tobytes()
+    decoded, sr = load_audio(pcm, pcm_sample_rate=16000)
+    assert sr == 16000
+    assert np.allclose(decoded, y, atol=1e-3)
+
+
+@pytest.mark.skipif(not SOUNDFILE_AVAILABLE, reason="soundfile not installed")
+def test_load_wav_from_buffer():
+    """WAV bytes decode in memory, with optional resampling."""
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, tone(), 16000, format="WAV", subtype="FLOAT")
+
+    decoded, sr = load_audio(buffer.getvalue())
+    assert sr == 16000
+    assert np.allclose(decoded, tone())
+
+    pytest.importorskip("librosa")
+    buffer.seek(0)
+    resampled, sr = load_audio(buffer, sample_rate=22050)
+    assert sr == 22050
+    assert len(resampled) == 11025
+    assert resampled.dtype == np.float32
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
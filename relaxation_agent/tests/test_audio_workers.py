@@ -0,0 +1,147 @@
+"""Tests for the audio feature worker pool."""
+
+import asyncio
+import io
+import threading
+
+import numpy as np
+import pytest
+from src.core import audio_workers
+from src.core.audio_workers import AudioFeatureService, AudioServiceBusy, ExtractionCancelled
+
+
+@pytest.fixture
+def blocked(monkeypatch):
+    """Replace extraction with one that waits for the test to release it."""
+    release = threading.Event()
+    calls = []
+
+    def extract(data, filename, pcm_sample_rate):
+        calls.append(data)
+        release.wait(5)
+        return {"size": len(data)}
+
+    monkeypatch.setattr(audio_workers, "_extract", extract)
+    yield release, calls
+    release.set()
+
+
+def thread_service(**kwargs):
+    return AudioFeatureService(use_processes=False, max_workers=1, poll_interval_s=0.01, **kwargs)
+
+
+def test_rejects_when_full(blocked):
+    """Beyond max_pending, callers are told to back off instead of queueing."""
+    release, _ = blocked
+    service = thread_service(max_pending=2)
+    futures = [service.submit(b"a"), service.submit(b"b")]
+
+    with pytest.raises(AudioServiceBusy):
+        service.submit(b"c")
+    assert service.stats()["queued"] == 1
+
+    release.set()
+    assert [f.result(5) for f in futures] == [{"size": 1}, {"size": 1}]
+    service.shutdown()
+    assert service.stats()["rejected"] == 1
+
+
+def test_disconnect_cancels_queued_work(blocked):
+    """A queued extraction is dropped when its client disconnects."""
+    release, calls = blocked
+    service = thread_service(max_pending=4)
+
+    async def scenario():
+        async def gone():
+            return True
+
+        running = service.submit(b"first")
+        with pytest.raises(ExtractionCancelled):
+            await service.extract(b"second", is_disconnected=gone)
+        release.set()
+        running.result(5)
+
+    asyncio.run(scenario())
+    service.shutdown()
+
+    assert calls == [b"first"]
+    assert service.stats()["cancelled"] == 1
+    assert service.stats()["pending"] == 0
+
+
+def test_timeout(blocked):
+    """Extractions exceeding the timeout raise and are counted."""
+    service = thread_service(timeout_s=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(service.extract(b"slow"))
+    assert service.stats()["timed_out"] == 1
+    blocked[0].set()
+    service.shutdown()
+
+
+def test_broken_pool_is_shut_down_and_replaced(monkeypatch):
+    """A broken pool is shut down and replaced, whether a task or submit() finds it."""
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    monkeypatch.setattr(audio_workers, "_extract", lambda data, filename, pcm_sample_rate: {"size": len(data)})
+
+    class BrokenPool:
+        def __init__(self):
+            self.shutdown_calls = []
+
+        def submit(self, *args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            self.shutdown_calls.append(kwargs)
+
+    service = thread_service()
+    broken = service._executor = BrokenPool()
+    assert service.submit(b"abc").result(5) == {"size": 3}
+    assert broken.shutdown_calls == [{"wait": False, "cancel_futures": True}]
+    healthy = service._executor
+    assert healthy is not broken
+
+    # A late failure from the old pool must not discard the new one
+    late = Future()
+    late.set_exception(BrokenProcessPool("worker died"))
+    with service._lock:
+        service._pending += 1
+    service._on_done(broken, late)
+    assert service._executor is healthy and len(broken.shutdown_calls) == 1
+
+    failed = Future()
+    failed.set_exception(BrokenProcessPool("worker died"))
+    with service._lock:
+        service._pending += 1
+    service._on_done(healthy, failed)
+    assert service._executor is None
+    assert service.stats()["failed"] == 2 and service.stats()["pending"] == 0
+    service.shutdown()
+
+
+def test_process_pool_matches_inline_extraction():
+    """Worker processes produce the same features as in-process extraction."""
+    pytest.importorskip("librosa")
+    sf = pytest.importorskip("soundfile")
+    from src.milestone_b.audio_features import AudioFeatureExtractor
+
+    t = np.arange(16000) / 16000
+    buffer = io.BytesIO()
+    sf.write(buffer, (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), 16000, format="WAV")
+    data = buffer.getvalue()
+
+    service = AudioFeatureService(use_processes=True, max_workers=1)
+    try:
+        features = asyncio.run(service.extract(data))
+    finally:
+        service.shutdown()
+
+    expected = AudioFeatureExtractor().extract_from_buffer(data)
+    assert np.allclose(features["mfcc"], expected["mfcc"])
+    assert service.stats()["completed"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
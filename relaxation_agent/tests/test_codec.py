@@ -0,0 +1,82 @@
+"""Tests for the binary log column codec."""
+
+import json
+
+import numpy as np
+import pytest
+from src.core.codec import (
+    _LABELS_V1, encode_emotion_probs, decode_emotion_probs,
+    encode_audio_features, decode_audio_features, decode_row
+)
+from src.core.emotion_classifier import EMOTION_LABELS
+
+
+def test_emotion_probs_roundtrip():
+    """Probabilities round-trip through a float32 vector."""
+    probs = {label: 1.0 / len(EMOTION_LABELS) for label in EMOTION_LABELS}
+    encoded = encode_emotion_probs(probs)
+
+    assert isinstance(encoded, bytes)
+    assert len(encoded) == 3 + 4 * len(EMOTION_LABELS)
+    assert decode_emotion_probs(encoded) == pytest.approx(probs)
+
+
+def test_labels_v1_are_pinned():
+    """The version 1 label order is frozen; stored rows must keep decoding the same way."""
+    assert _LABELS_V1 == (
+        "neutral", "happy", "sad", "angry", "fearful",
+        "disgusted", "surprised", "calm", "anxious", "stressed",
+    )
+    nan = b"\x00\x00\xc0\x7f"
+    stored = b"EP\x01" + nan * 7 + b"\x00\x00\x00\x3f" + nan + b"\x00\x00\x80\x3e"
+    assert decode_emotion_probs(stored) == {"calm": 0.5, "stressed": 0.25}
+    assert encode_emotion_probs({"calm": 0.5, "stressed": 0.25}) == stored
+
+
+def test_emotion_probs_partial_and_unknown_labels():
+    """Missing labels stay missing; unknown labels fall back to JSON."""
+    assert decode_emotion_probs(encode_emotion_probs({"calm": 0.5})) == {"calm": 0.5}
+
+    encoded = encode_emotion_probs({"joy": 0.7})
+    assert isinstance(encoded, str)
+    assert decode_emotion_probs(encoded) == pytest.approx({"joy": 0.7})
+
+
+def test_audio_features_roundtrip():
+    """NumPy arrays and scalars pack into one buffer; other values ride in the header."""
+    features = {
+        "mfcc": np.random.default_rng(0).normal(size=13),
+        "pitch": np.array([180.5], dtype=np.float32),
+        "duration": 2.5,
+        "source": "mic"
+    }
+    encoded = encode_audio_features(features)
+    decoded = decode_audio_features(encoded)
+
+    assert decoded["mfcc"] == pytest.approx(features["mfcc"].tolist(), rel=1e-6)
+    assert decoded["pitch"] == pytest.approx([180.5])
+    assert decoded["duration"] == 2.5
+    assert decoded["source"] == "mic"
+    assert decode_audio_features(encoded, as_numpy=True)["mfcc"].dtype == np.float32
+    # Smaller than the JSON it replaces
+    assert len(encoded) < len(json.dumps({k: np.asarray(v).tolist() if k != "source" else v
+                                          for k, v in features.items()}))
+
+
+def test_legacy_json_rows_decode():
+    """Rows written before the binary format still decode."""
+    row = {
+        "id": 1,
+        "emotion_probs": json.dumps({"calm": 1.0}),
+        "audio_features": json.dumps({"mfcc": [1.0, 2.0]}),
+        "metadata": None
+    }
+    decoded = decode_row(row)
+
+    assert decoded["emotion_probs"] == {"calm": 1.0}
+    assert decoded["audio_features"] == {"mfcc": [1.0, 2.0]}
+    assert decoded["metadata"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
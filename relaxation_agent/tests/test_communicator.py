@@ -0,0 +1,180 @@
+"""Tests for the non-blocking communicator."""
+
+import json
+import os
+import select
+import time
+
+import pytest
+from src.core.config import Config
+from src.core.communicator import Communicator
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def publish(self, channel, payload):
+        self.commands.append((channel, payload))
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        self.commands.append((stream, fields["data"]))
+
+    async def execute(self):
+        if self.redis.failures > 0:
+            self.redis.failures -= 1
+            raise ConnectionError("redis down")
+        self.redis.round_trips += 1
+        self.redis.messages.extend(self.commands)
+        return [1] * len(self.commands)
+
+
+class FakeRedis:
+    """Minimal redis.asyncio stand-in recording pipelined publishes."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.round_trips = 0
+        self.messages = []
+
+    async def ping(self):
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(Config, "PUBLISH_RETRY_BASE_DELAY", 0.01)
+
+
+def test_publishes_are_pipelined():
+    """Queued messages on several channels go out in one round trip."""
+    redis = FakeRedis()
+    communicator = Communicator(redis_client=redis, max_batch_size=64)
+    communicator.publish_many([
+        (Config.REDIS_CHANNEL_STRESS_ALERT, {"n": i}) if i % 2 else
+        (Config.REDIS_CHANNEL_EMOTION_UPDATE, {"n": i})
+        for i in range(10)
+    ])
+    assert communicator.flush()
+
+    assert redis.round_trips == 1
+    assert {channel for channel, _ in redis.messages} == {
+        Config.REDIS_CHANNEL_STRESS_ALERT, Config.REDIS_CHANNEL_EMOTION_UPDATE
+    }
+    assert communicator.stats()["published"] == 10
+    communicator.close()
+
+
+def test_failed_publish_is_retried(fast_retries):
+    """A failing round trip is retried in the background, not dropped."""
+    redis = FakeRedis(failures=2)
+    communicator = Communicator(redis_client=redis, max_retries=5)
+
+    assert communicator.publish_stress_alert(0.9, "high", "anxious", user_id="u1")
+    for _ in range(100):
+        if redis.messages:
+            break
+        time.sleep(0.01)
+
+    # Channel publish and stream entry
+    assert [key for key, _ in redis.messages] == [Config.REDIS_CHANNEL_STRESS_ALERT, Config.ALERT_STREAM]
+    assert json.loads(redis.messages[0][1])["user_id"] == "u1"
+    stats = communicator.stats()
+    assert stats["retried"] == 4
+    assert stats["dropped"] == 0
+    assert stats["connected"]
+    communicator.close()
+
+
+def test_gives_up_after_max_retries(fast_retries):
+    """Messages are dropped (and counted) once retries are exhausted."""
+    redis = FakeRedis(failures=100)
+    communicator = Communicator(redis_client=redis, max_retries=2)
+    communicator.publish("test", {"n": 1})
+
+    for _ in range(100):
+        if communicator.stats()["dropped"]:
+            break
+        time.sleep(0.01)
+
+    stats = communicator.stats()
+    assert stats["dropped"] == 1
+    assert stats["retry_queue"] == 0
+    assert not stats["connected"]
+    communicator.close()
+
+
+def test_report_stress_is_debounced():
+    """Repeated reports for one user publish a single alert."""
+    from src.core.alert_aggregator import AlertAggregator
+
+    redis = FakeRedis()
+    communicator = Communicator(redis_client=redis, aggregator=AlertAggregator(min_interval_s=60))
+    published = [communicator.report_stress(0.8, "high", "anxious", user_id="u1") for _ in range(20)]
+    communicator.flush()
+
+    assert published.count(True) == 1
+    alert = json.loads(redis.messages[0][1])
+    assert alert["metadata"]["alert"]["reason"] == "first"
+    assert communicator.stats()["debounce"]["suppressed"] == 19
+    communicator.close()
+
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_builds_its_own_client(monkeypatch):
+    """A child process gets a fresh loop and Redis client instead of the parent's."""
+    from src.core import event_bus
+
+    monkeypatch.setattr(Config, "ALERT_BUS_FAKE", True)
+    monkeypatch.setattr(event_bus, "_fake_server", None)
+    communicator = Communicator()
+    parent_client = communicator.redis_client
+    parent_thread = communicator._thread
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            queued = communicator.publish("test", {"n": 1})
+            flushed = communicator.flush()
+            result = {
+                "queued": queued,
+                "flushed": flushed,
+                "new_client": communicator.redis_client is not parent_client,
+                "new_thread": communicator._thread is not parent_thread,
+                "published": communicator.stats()["published"],
+            }
+            os.write(write_fd, json.dumps(result).encode())
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    ready, _, _ = select.select([read_fd], [], [], 10)
+    result = json.loads(os.read(read_fd, 4096)) if ready else None
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert result == {
+        "queued": True, "flushed": True, "new_client": True, "new_thread": True, "published": 1
+    }
+    # The parent's communicator is untouched
+    assert communicator.redis_client is parent_client
+    communicator.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
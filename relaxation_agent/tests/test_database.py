@@ -0,0 +1,152 @@
+"""Tests for the pooled SQLite storage layer."""
+
+import threading
+
+import pytest
+from src.core.config import Config
+from src.core.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "test.db"))
+    yield database
+    database.close()
+
+
+def test_wal_mode(db):
+    """Connections use WAL journaling."""
+    mode = db.query_one("PRAGMA journal_mode")
+    assert list(mode.values())[0] == "wal"
+
+
+def test_connection_reused_per_thread(db):
+    """A thread keeps its connection; other threads get their own."""
+    conn = db.connection()
+    assert db.connection() is conn
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_close_reopens(db):
+    """After close() the next call opens a fresh connection."""
+    conn = db.connection()
+    db.close()
+    assert db.connection() is not conn
+    assert db.query_one("SELECT 1 AS one") == {"one": 1}
+
+
+def test_transaction_rolls_back(db):
+    """Errors inside a transaction roll back every statement in it."""
+    db.execute("CREATE TABLE t (x INTEGER)")
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+    assert db.query("SELECT * FROM t") == []
+
+    db.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+    assert len(db.query("SELECT * FROM t")) == 2
+
+
+def test_logger_uses_indexes(tmp_path, monkeypatch):
+    """Logger creates the (user_id, timestamp) index and queries through it."""
+    from src.core.logger import Logger
+
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / "logger.db"))
+    logger = Logger()
+    logger.log_emotion_analysis(
+        text_input="hi", emotion_probs={"calm": 1.0}, top_emotion="calm",
+        stress_score=0.1, stress_level="low", prompt="", user_id="u1"
+    )
+    logger.flush()
+
+    history = logger.get_emotion_history(user_id="u1")
+    assert len(history) == 1 and history[0]["top_emotion"] == "calm"
+
+    plan = logger.db.query(
+        "EXPLAIN QUERY PLAN SELECT * FROM emotion_logs WHERE user_id = ? "
+        "ORDER BY timestamp DESC LIMIT 10", ("u1",)
+    )
+    assert any("idx_emotion_logs_user_timestamp" in row["detail"] for row in plan)
+
+
+@pytest.fixture
+def logger(tmp_path, monkeypatch):
+    from src.core.logger import Logger
+
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / "history.db"))
+    logger = Logger()
+    for i in range(25):
+        logger.log_emotion_analysis(
+            text_input=f"t{i}", emotion_probs={"calm": 1.0}, top_emotion="calm",
+            stress_score=i / 25, stress_level="high" if i % 2 else "low", prompt="",
+            user_id="u1" if i % 5 else "u2", audio_features={"mfcc": [0.0] * 13}
+        )
+    logger.flush()
+    return logger
+
+
+def test_history_pages_with_cursor(logger):
+    """Keyset pages cover every row once, newest first."""
+    ids, cursor = [], None
+    while True:
+        page = logger.query_emotion_history(user_id="u1", cursor=cursor, limit=7)
+        ids += [row["id"] for row in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(ids) == 20
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_history_projection(logger):
+    """Blob columns are skipped unless requested."""
+    row = logger.query_emotion_history(limit=1)["items"][0]
+    assert "audio_features" not in row and "emotion_probs" not in row
+
+    row = logger.query_emotion_history(limit=1, fields=["emotion_probs"])["items"][0]
+    assert set(row) == {"id", "timestamp", "emotion_probs"}
+
+    with pytest.raises(ValueError):
+        logger.query_emotion_history(fields=["password"])
+
+
+def test_history_filters(logger):
+    """Level and time-range filters narrow the page."""
+    high = logger.query_emotion_history(stress_level="high", limit=100)["items"]
+    assert len(high) == 12
+    assert all(row["stress_level"] == "high" for row in high)
+
+    middle = high[5]["timestamp"]
+    newer = logger.query_emotion_history(since=middle, limit=100)["items"]
+    older = logger.query_emotion_history(until=middle, limit=100)["items"]
+    assert len(newer) + len(older) == 25
+
+
+
+def test_user_level_history_uses_index(logger):
+    """A per-user level filter is answered from (user_id, stress_level, timestamp), newest first."""
+    statements = []
+    conn = logger.db.connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        page = logger.query_emotion_history(user_id="u1", stress_level="high", limit=5)
+    finally:
+        conn.set_trace_callback(None)
+    assert len(page["items"]) == 5
+    assert all(row["user_id"] == "u1" and row["stress_level"] == "high" for row in page["items"])
+
+    query = next(sql for sql in statements if sql.startswith("SELECT") and "stress_level =" in sql)
+    plan = " | ".join(row["detail"] for row in logger.db.query(f"EXPLAIN QUERY PLAN {query}"))
+    assert "idx_emotion_logs_user_level_timestamp" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""Tests for text encoder micro-batching."""
+
+import asyncio
+import pytest
+import torch
+from src.core.encode_batcher import TextEncodeBatcher
+
+
+class FakeEncoder:
+    """Records encode_batch calls; embedding is [len(text)] per text."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode_batch(self, texts, **kwargs):
+        self.calls.append((list(texts), kwargs))
+        return torch.tensor([[float(len(t))] for t in texts])
+
+
+def test_concurrent_requests_share_forward_pass():
+    """Concurrent encodes run as one batch and each caller gets its own row."""
+    encoder = FakeEncoder()
+    batcher = TextEncodeBatcher(encoder, max_batch_size=8, max_wait_ms=50)
+    texts = ["hi", "too much traffic", "I'm stressed"]
+
+    async def run():
+        results = await asyncio.gather(*(batcher.encode(t) for t in texts))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert len(encoder.calls) == 1
+    assert encoder.calls[0][0] == texts
+    assert encoder.calls[0][1]["batch_size"] == len(texts)
+    assert encoder.calls[0][1]["padding"] == "longest"
+    assert [r.item() for r in results] == [float(len(t)) for t in texts]
+
+
+def test_max_batch_size_splits_batches():
+    """Requests beyond max_batch_size go into another forward pass."""
+    encoder = FakeEncoder()
+    batcher = TextEncodeBatcher(encoder, max_batch_size=2, max_wait_ms=50)
+
+    async def run():
+        await asyncio.gather(*(batcher.encode(f"text {i}") for i in range(5)))
+        await batcher.close()
+
+    asyncio.run(run())
+
+    assert [len(texts) for texts, _ in encoder.calls] == [2, 2, 1]
+    assert batcher.stats()["items"] == 5
+
+
+def test_errors_propagate_to_callers():
+    """A failing forward pass fails every request in the batch."""
+
+    class BrokenEncoder:
+        def encode_batch(self, texts, **kwargs):
+            raise RuntimeError("model failed")
+
+    batcher = TextEncodeBatcher(BrokenEncoder(), max_wait_ms=10)
+
+    async def run():
+        try:
+            with pytest.raises(RuntimeError):
+                await batcher.encode("hello")
+        finally:
+            await batcher.close()
+
+    asyncio.run(run())
+
+
+
+def test_close_fails_queued_and_inflight_requests():
+    """close() fails the batch being encoded and everything still queued."""
+    import threading
+
+    release = threading.Event()
+
+    class SlowEncoder(FakeEncoder):
+        def encode_batch(self, texts, **kwargs):
+            release.wait(5)
+            return super().encode_batch(texts, **kwargs)
+
+    batcher = TextEncodeBatcher(SlowEncoder(), max_batch_size=2, max_wait_ms=1)
+
+    async def run():
+        tasks = [asyncio.ensure_future(batcher.encode(f"text {i}")) for i in range(5)]
+        # Let the first batch reach the encoder while the rest wait in the queue
+        while not batcher._inflight or batcher._queue.qsize() < 3:
+            await asyncio.sleep(0.01)
+        await batcher.close()
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 5
+    for result in results:
+        assert isinstance(result, RuntimeError) and str(result) == "batcher closed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
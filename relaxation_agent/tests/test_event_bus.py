@@ -0,0 +1,190 @@
+"""Tests for the Redis Streams alert bus (local fakeredis mode)."""
+
+import time
+
+import pytest
+from src.core.config import Config
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from src.core.event_bus import AlertBus, create_stream_client
+
+
+@pytest.fixture
+def bus():
+    return AlertBus(create_stream_client(fake=True, server=fakeredis.FakeServer()), stream="test:alerts")
+
+
+def publish(bus, count):
+    return [bus.publish({"n": i, "stress_level": "high"}) for i in range(count)]
+
+
+def test_each_group_gets_every_alert(bus):
+    """Route and UI groups each see the full stream; acked entries leave pending."""
+    received = {"route": [], "ui": []}
+    consumers = [
+        bus.consumer(group, "c1", lambda batch, g=group: received[g].extend(e["n"] for _, e in batch), start_id="0")
+        for group in received
+    ]
+    publish(bus, 5)
+
+    for consumer in consumers:
+        assert consumer.poll(block_ms=0) == 5
+
+    assert received == {"route": [0, 1, 2, 3, 4], "ui": [0, 1, 2, 3, 4]}
+    assert all(group["pending"] == 0 for group in bus.info()["groups"])
+
+
+def test_consumers_in_group_share_load(bus):
+    """Consumers in one group split the entries between them."""
+    seen = []
+    first = bus.consumer("route", "a", lambda batch: seen.extend(i for i, _ in batch), batch_size=4)
+    second = bus.consumer("route", "b", lambda batch: seen.extend(i for i, _ in batch), batch_size=4)
+    ids = publish(bus, 8)
+
+    assert first.poll(block_ms=0) == 4
+    assert second.poll(block_ms=0) == 4
+    assert sorted(seen) == sorted(ids)
+
+
+def test_failed_batch_is_redelivered(bus):
+    """A handler error leaves the batch pending for the next poll."""
+    calls = []
+
+    def handler(batch):
+        calls.append([e["n"] for _, e in batch])
+        if len(calls) == 1:
+            raise RuntimeError("downstream unavailable")
+
+    consumer = bus.consumer("route", "c1", handler, retry_base_delay_s=0)
+    publish(bus, 3)
+
+    assert consumer.poll(block_ms=0) == 0
+    assert bus.info()["groups"][0]["pending"] == 3
+    assert consumer.poll(block_ms=0) == 3
+    assert calls == [[0, 1, 2], [0, 1, 2]]
+    assert consumer.failed_batches == 1
+
+
+def test_failed_batch_backs_off(bus):
+    """Pending entries wait out the backoff while new entries are still handled."""
+    calls = []
+
+    def handler(batch):
+        calls.append([e["n"] for _, e in batch])
+        if len(calls) == 1:
+            raise RuntimeError("downstream unavailable")
+
+    consumer = bus.consumer("route", "c1", handler, retry_base_delay_s=0.2)
+    publish(bus, 2)
+    assert consumer.poll(block_ms=0) == 0
+
+    bus.publish({"n": 9})
+    assert consumer.poll(block_ms=0) == 1
+    assert consumer.poll(block_ms=0) == 0
+    assert calls == [[0, 1], [9]]
+
+    time.sleep(0.25)
+    assert consumer.poll(block_ms=0) == 2
+    assert calls[-1] == [0, 1]
+
+
+def test_poison_entry_is_dead_lettered(bus):
+    """An entry that keeps failing is moved to the dead-letter stream and acked."""
+    def handler(batch):
+        if any(e["n"] == 0 for _, e in batch):
+            raise RuntimeError("cannot handle")
+
+    consumer = bus.consumer(
+        "route", "c1", handler, batch_size=1, retry_base_delay_s=0,
+        max_deliveries=3, dead_letter_stream="test:alerts:dead"
+    )
+    publish(bus, 2)
+
+    for _ in range(5):
+        consumer.poll(block_ms=0)
+
+    assert consumer.dead_lettered == 1
+    dead = bus.client.xrange("test:alerts:dead")
+    assert len(dead) == 1
+    assert dead[0][1]["group"] == "route" and int(dead[0][1]["deliveries"]) > 3
+    assert consumer.processed == 1
+    assert bus.info()["groups"][0]["pending"] == 0
+
+
+def test_run_survives_unexpected_errors(bus, monkeypatch):
+    """A non-connection error is logged and the consumer keeps polling."""
+    consumer = bus.consumer("route", "c1", lambda batch: None, block_ms=10)
+    polls = []
+
+    def flaky_poll(block_ms=None):
+        polls.append(1)
+        if len(polls) == 1:
+            raise ValueError("bad entry")
+        return 0
+
+    monkeypatch.setattr(consumer, "poll", flaky_poll)
+    monkeypatch.setattr(consumer._stop, "wait", lambda timeout: None)
+    consumer.start()
+    time.sleep(0.05)
+    consumer.stop(timeout=1)
+    assert len(polls) > 1
+
+
+def test_stale_entries_are_claimed(bus):
+    """Entries held by a dead consumer are claimed by a live one."""
+    dead = bus.consumer("route", "dead", lambda batch: None)
+    publish(bus, 2)
+    dead._read(">")  # read but never acked
+
+    claimed = []
+    live = bus.consumer("route", "live", lambda batch: claimed.extend(e["n"] for _, e in batch), claim_idle_ms=1)
+    time.sleep(0.01)
+
+    assert live.poll(block_ms=0) == 2
+    assert claimed == [0, 1]
+
+
+def test_communicator_appends_to_stream(monkeypatch):
+    """Stress alerts published by the Communicator land on the stream."""
+    from src.core.communicator import Communicator
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(Config, "ALERT_STREAM", "test:alerts")
+    bus = AlertBus(create_stream_client(fake=True, server=server))
+    received = []
+    consumer = bus.consumer("route", "c1", lambda batch: received.extend(e for _, e in batch))
+
+    communicator = Communicator(redis_client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    communicator.publish_stress_alert(0.9, "high", "anxious", user_id="u1")
+    communicator.flush()
+
+    assert consumer.poll(block_ms=0) == 1
+    assert received[0]["user_id"] == "u1"
+    communicator.close()
+
+
+def test_fake_mode_shares_server(monkeypatch):
+    """In fake mode the Communicator and consumers use the same in-process server."""
+    from src.core import event_bus
+    from src.core.communicator import Communicator
+
+    monkeypatch.setattr(Config, "ALERT_BUS_FAKE", True)
+    monkeypatch.setattr(Config, "ALERT_STREAM", "test:alerts:shared")
+    monkeypatch.setattr(event_bus, "_fake_server", None)
+    bus = AlertBus()
+    received = []
+    consumer = bus.consumer("route", "c1", lambda batch: received.extend(e for _, e in batch))
+
+    communicator = Communicator()
+    assert communicator.connected
+    communicator.publish_stress_alert(0.9, "high", "anxious", user_id="u2")
+    communicator.flush()
+
+    assert consumer.poll(block_ms=0) == 1
+    assert received[0]["user_id"] == "u2"
+    communicator.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
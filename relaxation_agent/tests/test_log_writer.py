@@ -0,0 +1,108 @@
+"""Tests for write-behind log batching."""
+
+import threading
+import time
+
+import pytest
+from src.core.database import Database
+from src.core.log_writer import LogWriter
+
+
+INSERT = "INSERT INTO t (x) VALUES (?)"
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "test.db"))
+    database.execute("CREATE TABLE t (x INTEGER)")
+    yield database
+    database.close()
+
+
+def test_rows_written_in_batches(db):
+    """Queued rows are written together and visible after flush."""
+    writer = LogWriter(db, max_batch_size=50, flush_interval_ms=50)
+    for i in range(120):
+        assert writer.submit(INSERT, (i,))
+    writer.flush()
+
+    assert len(db.query("SELECT * FROM t")) == 120
+    stats = writer.stats()
+    assert stats["written"] == 120
+    assert stats["batches"] < 120
+    writer.close()
+
+
+def test_prepare_runs_on_writer(db):
+    """prepare() turns raw rows into statement parameters."""
+    writer = LogWriter(db, flush_interval_ms=10)
+    writer.submit(INSERT, ("21",), prepare=lambda row: (int(row[0]) * 2,))
+    writer.close()
+
+    assert db.query("SELECT x FROM t") == [{"x": 42}]
+
+
+def test_close_flushes(db):
+    """close() writes everything still queued."""
+    writer = LogWriter(db, max_batch_size=1000, flush_interval_ms=10000)
+    for i in range(10):
+        writer.submit(INSERT, (i,))
+    writer.close()
+
+    assert len(db.query("SELECT * FROM t")) == 10
+
+
+def test_full_queue_writes_through(db):
+    """A full queue makes the producer wait briefly, then write the row itself."""
+    writer = LogWriter(db, max_batch_size=1, max_queue_size=2, put_timeout_ms=20)
+    release = threading.Event()
+    # Stall the writer thread inside a batch
+    writer.submit(INSERT, (0,), prepare=lambda row: (release.wait(), row)[1])
+
+    start = time.monotonic()
+    accepted = [writer.submit(INSERT, (i,)) for i in range(1, 10)]
+    elapsed = time.monotonic() - start
+    assert not all(accepted)
+    # Every overflowing producer waited out the timeout, and no longer
+    assert 0.015 * accepted.count(False) <= elapsed < 2
+    assert writer.stats()["written_through"] == accepted.count(False)
+
+    release.set()
+    writer.close()
+    assert len(db.query("SELECT * FROM t")) == 10
+
+
+def test_failed_batch_counted(db):
+    """A failing batch is reported and does not stop the writer."""
+    writer = LogWriter(db, flush_interval_ms=10)
+    writer.submit("INSERT INTO missing (x) VALUES (?)", (1,))
+    writer.flush()
+    writer.submit(INSERT, (1,))
+    writer.close()
+
+    assert writer.stats()["errors"] == 1
+    assert writer.stats()["rejected"] == 1
+    assert len(db.query("SELECT * FROM t")) == 1
+
+
+def test_failed_batch_keeps_good_rows(db):
+    """When a batch fails, it is retried row by row and only the bad rows are dropped."""
+    db.execute("CREATE TABLE u (x INTEGER CHECK (x >= 0))")
+    hooked = []
+    writer = LogWriter(db, max_batch_size=100, flush_interval_ms=50)
+    writer.set_batch_hook("INSERT INTO u (x) VALUES (?)", lambda conn, rows: hooked.extend(rows))
+    for x in (1, -1, 2, 3):
+        writer.submit("INSERT INTO u (x) VALUES (?)", (x,))
+    writer.submit(INSERT, ("bad",), prepare=lambda row: (int(row[0]),))
+    writer.submit(INSERT, (7,))
+    writer.close()
+
+    assert [row["x"] for row in db.query("SELECT x FROM u")] == [1, 2, 3]
+    assert db.query("SELECT x FROM t") == [{"x": 7}]
+    assert hooked == [(1,), (2,), (3,)]
+    stats = writer.stats()
+    assert stats["rejected"] == 2 and stats["written"] == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
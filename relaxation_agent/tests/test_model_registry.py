@@ -0,0 +1,96 @@
+"""Tests for the shared model registry."""
+
+import threading
+
+import pytest
+from src.core.model_registry import ModelRegistry, get_acoustic_encoder
+
+
+def test_loads_once_and_shares():
+    """Every caller gets the same instance; the factory runs once."""
+    registry = ModelRegistry()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    first = registry.get("model", factory)
+    second = registry.get("model", factory)
+
+    assert first is second
+    assert len(calls) == 1
+    assert registry.status()["model"]["loaded"]
+
+
+def test_concurrent_loads_wait_for_first():
+    """Concurrent first calls still build the model only once."""
+    registry = ModelRegistry()
+    calls = []
+    results = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("model", factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_warm_up_runs_once():
+    """Warm-up runs on the freshly loaded model and is reported."""
+    registry = ModelRegistry()
+    warmed = []
+
+    registry.get("model", lambda: "weights", warm_up=warmed.append)
+    registry.get("model", lambda: "weights", warm_up=warmed.append)
+
+    assert warmed == ["weights"]
+    assert registry.status()["model"]["warm"]
+
+
+def test_failed_load_is_remembered():
+    """A failed load is re-raised without retrying until reset."""
+    registry = ModelRegistry()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        raise OSError("weights not found")
+
+    for _ in range(2):
+        with pytest.raises(OSError):
+            registry.get("model", factory)
+    assert len(calls) == 1
+    assert registry.status()["model"]["error"] == "weights not found"
+
+    registry.reset("model")
+    assert registry.get("model", lambda: "weights") == "weights"
+
+
+def test_ready_flag():
+    """Readiness is set explicitly after startup warm-up."""
+    registry = ModelRegistry()
+    assert not registry.ready
+    registry.mark_ready()
+    assert registry.ready
+
+
+def test_shared_acoustic_encoder():
+    """Acoustic encoders are shared per input dimension and in eval mode."""
+    encoder = get_acoustic_encoder(input_dim=13)
+    assert get_acoustic_encoder(input_dim=13) is encoder
+    assert not encoder.training
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,74 @@
+"""Tests for the cached profile store."""
+
+import pytest
+from src.core.database import Database
+from src.core.profile_interpreter import UserProfile
+from src.core.profile_store import ProfileStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return ProfileStore(Database(str(tmp_path / "profiles.db")), ttl_s=60, clock=clock)
+
+
+def test_lookups_are_cached(store):
+    """Repeat lookups (including missing profiles) do not hit the database."""
+    store.save(UserProfile(user_id="u1", profile_type="ADHD"))
+
+    assert store.get("u1").profile_type == "ADHD"
+    assert store.get("nobody") is None
+    assert store.get("nobody") is None
+
+    stats = store.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_writes_go_through(store):
+    """Saves and deletes are visible immediately, in the cache and the database."""
+    store.save(UserProfile(user_id="u1", profile_type="baseline"))
+    store.get("u1")
+    store.save(UserProfile(user_id="u1", profile_type="Autism"))
+
+    assert store.get("u1").profile_type == "Autism"
+    assert store.db.query_one("SELECT profile_type FROM user_profiles")["profile_type"] == "Autism"
+
+    assert store.delete("u1")
+    assert store.get("u1") is None
+    assert not store.delete("u1")
+
+
+def test_entries_expire(store, clock):
+    """Changes made by another process show up once the TTL passes."""
+    store.save(UserProfile(user_id="u1", profile_type="baseline"))
+    store.db.execute("UPDATE user_profiles SET profile_type = 'ADHD' WHERE user_id = 'u1'")
+
+    assert store.get("u1").profile_type == "baseline"
+    clock.now += 61
+    assert store.get("u1").profile_type == "ADHD"
+
+
+def test_returned_profiles_are_copies(store):
+    """Modifying a returned profile does not change the cached one until saved."""
+    store.save(UserProfile(user_id="u1", profile_type="baseline", stress_tolerance=60.0))
+    profile = store.get("u1")
+    profile.stress_tolerance = 10.0
+
+    assert store.get("u1").stress_tolerance == 60.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
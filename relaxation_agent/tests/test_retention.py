@@ -0,0 +1,157 @@
+"""Tests for log retention."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from src.core.config import Config
+from src.core.retention import RetentionManager, PYARROW_AVAILABLE
+
+
+@pytest.fixture
+def logger(tmp_path, monkeypatch):
+    from src.core.logger import Logger
+
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / "retention.db"))
+    logger = Logger()
+    for i in range(10):
+        logger.log_emotion_analysis(
+            text_input=f"t{i}", emotion_probs={"calm": 1.0}, top_emotion="calm",
+            stress_score=0.5, stress_level="medium", prompt="", user_id="u1"
+        )
+    logger.flush()
+    # Age half of the rows by 40 days
+    old = (datetime.utcnow() - timedelta(days=40)).isoformat()
+    with logger.db.transaction() as conn:
+        conn.execute("UPDATE emotion_logs SET timestamp = ? WHERE id <= 5", (old,))
+    return logger
+
+
+def test_expire_without_export(logger):
+    """Rows past the TTL are deleted; newer rows and rollups stay."""
+    manager = RetentionManager(
+        logger.db,
+        table_ttl_days={"emotion_logs": 30},
+        rollup_ttl_days={},
+        batch_size=2
+    )
+    result = manager.run()
+
+    assert result["tables"]["emotion_logs"]["deleted"] == 5
+    assert len(logger.get_emotion_history(limit=100)) == 5
+    assert logger.get_stress_trend(granularity="day")[0]["count"] == 10
+
+
+def test_defaults_keep_everything(logger):
+    """Retention is opt-in: with default TTLs nothing is deleted."""
+    result = RetentionManager(logger.db).run()
+
+    assert result["tables"]["emotion_logs"]["deleted"] == 0
+    assert len(logger.get_emotion_history(limit=100)) == 10
+
+
+def test_missing_pyarrow_warns_and_keeps_rows(logger, tmp_path, monkeypatch, caplog):
+    """Without pyarrow an export dir skips the table and says so at WARNING."""
+    import src.core.retention as retention
+
+    monkeypatch.setattr(retention, "PYARROW_AVAILABLE", False)
+    manager = RetentionManager(
+        logger.db,
+        table_ttl_days={"emotion_logs": 30},
+        rollup_ttl_days={},
+        export_dir=str(tmp_path / "archive")
+    )
+    with caplog.at_level("WARNING", logger="relaxation_agent.retention"):
+        result = manager.run()
+
+    assert result["tables"]["emotion_logs"]["deleted"] == 0
+    assert len(logger.get_emotion_history(limit=100)) == 10
+    assert any(
+        r.levelname == "WARNING" and "pyarrow" in r.getMessage() for r in caplog.records
+    )
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+def test_expire_exports_parquet(logger, tmp_path):
+    """Expired rows land in a Parquet file with their column types."""
+    import pyarrow.parquet as pq
+
+    manager = RetentionManager(
+        logger.db,
+        table_ttl_days={"emotion_logs": 30},
+        rollup_ttl_days={},
+        export_dir=str(tmp_path / "archive"),
+        batch_size=2
+    )
+    result = manager.expire_table("emotion_logs", 30)
+
+    table = pq.read_table(result["export"])
+    assert table.num_rows == 5
+    assert result["files"] == 3
+    assert str(table.schema.field("stress_score").type) == "double"
+    assert sorted(table.column("id").to_pylist()) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+def test_failed_export_keeps_rows(logger, tmp_path, monkeypatch):
+    """A batch is only deleted after its Parquet file is written and synced."""
+    import pyarrow.parquet as pq
+
+    manager = RetentionManager(
+        logger.db, table_ttl_days={}, rollup_ttl_days={},
+        export_dir=str(tmp_path / "archive"), batch_size=2
+    )
+    written = []
+    original = manager._export_batch
+
+    def export_then_fail(table, columns, rows, path):
+        if written:
+            raise OSError("disk full")
+        original(table, columns, rows, path)
+        written.append(path)
+
+    monkeypatch.setattr(manager, "_export_batch", export_then_fail)
+    with pytest.raises(OSError):
+        manager.expire_table("emotion_logs", 30)
+
+    # The first batch is archived and deleted, the rest is still in the database
+    assert pq.read_table(str(written[0])).column("id").to_pylist() == [1, 2]
+    remaining = [row["id"] for row in logger.db.query("SELECT id FROM emotion_logs")]
+    assert remaining == [3, 4, 5, 6, 7, 8, 9, 10]
+
+
+def test_compact_rollups(logger):
+    """Fine rollup buckets past their TTL are dropped."""
+    manager = RetentionManager(logger.db, table_ttl_days={}, rollup_ttl_days={"minute": 1})
+    removed = manager.compact_rollups(now=datetime.utcnow() + timedelta(days=2))
+
+    assert removed["minute"] > 0
+    assert logger.get_stress_trend(granularity="minute") == []
+    assert logger.get_stress_trend(granularity="hour", since=datetime.utcnow() - timedelta(hours=2))
+
+
+def test_incremental_vacuum(logger):
+    """The file uses incremental auto-vacuum and free pages are returned."""
+    manager = RetentionManager(logger.db, table_ttl_days={"emotion_logs": 30}, rollup_ttl_days={})
+    result = manager.run()
+
+    assert logger.db.query_one("PRAGMA auto_vacuum")["auto_vacuum"] == 2
+    assert result["vacuum"]["free_pages_left"] == 0
+    assert result["vacuum"]["needs_full_vacuum"] is False
+
+
+def test_legacy_file_needs_explicit_full_vacuum(logger):
+    """Retention never rewrites a legacy (non-incremental) file on its own."""
+    conn = logger.db.connection()
+    conn.execute("PRAGMA auto_vacuum=NONE")
+    conn.execute("VACUUM")
+    manager = RetentionManager(logger.db, table_ttl_days={"emotion_logs": 30}, rollup_ttl_days={})
+
+    assert manager.run()["vacuum"]["needs_full_vacuum"] is True
+    assert logger.db.query_one("PRAGMA auto_vacuum")["auto_vacuum"] == 0
+
+    assert manager.full_vacuum()["auto_vacuum"] == 2
+    assert manager.vacuum()["needs_full_vacuum"] is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,72 @@
+"""Tests for stress/emotion rollups."""
+
+import pytest
+from src.core.config import Config
+from src.core.rollups import aggregate
+
+
+def test_aggregate_buckets():
+    """Samples fold into minute/hour/day buckets per user."""
+    stress_rows, emotion_rows = aggregate([
+        ("2024-05-01T10:15:30.000001", "u1", "anxious", 0.8),
+        ("2024-05-01T10:15:59.000001", "u1", "calm", 0.2),
+        ("2024-05-01T10:16:00.000001", "u1", "anxious", 0.6),
+    ])
+    stress = {(row[1], row[2]): row[3:] for row in stress_rows}
+
+    assert stress[("minute", "2024-05-01T10:15")] == (2, 1.0, 0.8)
+    assert stress[("minute", "2024-05-01T10:16")] == (1, 0.6, 0.6)
+    assert stress[("hour", "2024-05-01T10")] == (3, pytest.approx(1.6), 0.8)
+    assert stress[("day", "2024-05-01")][0] == 3
+
+    emotions = {(row[1], row[3]): row[4] for row in emotion_rows if row[2] == "2024-05-01"}
+    assert emotions == {("day", "anxious"): 2, ("day", "calm"): 1}
+
+
+def log_samples(logger):
+    for score, emotion, user in [(0.9, "anxious", "u1"), (0.3, "calm", "u1"), (0.5, "calm", "u2")]:
+        logger.log_emotion_analysis(
+            text_input="t", emotion_probs={emotion: 1.0}, top_emotion=emotion,
+            stress_score=score, stress_level="low", prompt="", user_id=user
+        )
+
+
+@pytest.mark.parametrize("write_behind", [True, False])
+def test_trend_follows_inserts(tmp_path, monkeypatch, write_behind):
+    """Rollups are updated with each insert, batched or not."""
+    from src.core.logger import Logger
+
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / f"rollups_{write_behind}.db"))
+    monkeypatch.setattr(Config, "LOG_WRITE_BEHIND", write_behind)
+    logger = Logger()
+    log_samples(logger)
+    logger.flush()
+
+    trend = logger.get_stress_trend(granularity="hour", user_id="u1")
+    assert len(trend) == 1
+    assert trend[0]["count"] == 2
+    assert trend[0]["stress_mean"] == pytest.approx(0.6)
+    assert trend[0]["stress_max"] == pytest.approx(0.9)
+    assert trend[0]["emotions"] == {"anxious": 0.5, "calm": 0.5}
+
+    everyone = logger.get_stress_trend(granularity="day")
+    assert everyone[0]["count"] == 3
+
+
+def test_backfill_existing_logs(tmp_path, monkeypatch):
+    """Rollups are rebuilt once for logs written before they existed."""
+    from src.core.logger import Logger
+
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / "backfill.db"))
+    logger = Logger()
+    log_samples(logger)
+    logger.flush()
+    with logger.db.transaction() as conn:
+        conn.execute("DELETE FROM stress_rollups")
+        conn.execute("DELETE FROM emotion_rollups")
+
+    assert Logger().get_stress_trend(granularity="minute")[0]["count"] == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,180 @@
+"""Tests for length-bucketed text encoding."""
+
+import pytest
+import torch
+from src.core import text_encoder
+from src.core.config import Config
+from src.core.text_encoder import (
+    TextEmotionEncoder, bucket_for_length, create_text_encoder, load_calibration_corpus
+)
+
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + "i am so stressed calm the road is busy".split()
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """A two-layer DistilBERT saved locally, so backends can be built offline."""
+    transformers = pytest.importorskip("transformers")
+    path = tmp_path_factory.mktemp("tiny_distilbert")
+    (path / "vocab.txt").write_text("\n".join(VOCAB))
+    transformers.BertTokenizer(str(path / "vocab.txt")).save_pretrained(str(path))
+    config = transformers.DistilBertConfig(
+        vocab_size=len(VOCAB), dim=32, hidden_dim=64, n_layers=2, n_heads=2, max_position_embeddings=64
+    )
+    transformers.DistilBertModel(config).save_pretrained(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def onnx_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "ONNX_MODEL_DIR", str(tmp_path / "onnx"))
+    return tmp_path / "onnx"
+
+
+def test_bucket_for_length():
+    """Lengths round up to the next bucket and cap at the largest."""
+    assert bucket_for_length(3) == 16
+    assert bucket_for_length(16) == 16
+    assert bucket_for_length(17) == 32
+    assert bucket_for_length(10_000) == 512
+
+
+def test_length_buckets_group_similar_lengths():
+    """Texts are sorted by length, split by bucket and by batch size."""
+    input_ids = [[0] * 40, [0] * 5, [0] * 10, [0] * 3, [0] * 12]
+    chunks = TextEmotionEncoder._length_buckets(input_ids, batch_size=2, max_length=64)
+
+    assert chunks == [([3, 1], 16), ([2, 4], 16), ([0], 64)]
+
+
+def test_length_buckets_respect_max_length():
+    """Bucket length never exceeds the truncation length."""
+    chunks = TextEmotionEncoder._length_buckets([[0] * 40], batch_size=8, max_length=48)
+    assert chunks == [([0], 48)]
+
+
+def test_pooling_ignores_padding():
+    """Mean and max pooling give the same result with or without padding."""
+    hidden = torch.tensor([[[1.0, -2.0], [3.0, -4.0]]])
+    padded = torch.tensor([[[1.0, -2.0], [3.0, -4.0], [100.0, 100.0]]])
+    mask = torch.tensor([[1, 1]])
+    padded_mask = torch.tensor([[1, 1, 0]])
+
+    for pooling in ("cls", "mean", "max"):
+        assert torch.equal(
+            TextEmotionEncoder._pool(hidden, mask, pooling),
+            TextEmotionEncoder._pool(padded, padded_mask, pooling)
+        )
+
+
+
+def test_backend_selection(tiny_model, monkeypatch):
+    """The factory uses TEXT_ENCODER_BACKEND unless a backend is passed."""
+    monkeypatch.setattr(Config, "TEXT_ENCODER_BACKEND", "int8")
+    encoder = create_text_encoder(tiny_model)
+    assert encoder.backend == "int8"
+    assert isinstance(encoder.model.transformer.layer[0].ffn.lin1, torch.ao.nn.quantized.dynamic.Linear)
+
+    eager = create_text_encoder(tiny_model, backend="eager")
+    assert eager.backend == "eager" and eager.onnx_session is None
+    with pytest.raises(ValueError):
+        TextEmotionEncoder(tiny_model, backend="fp16")
+
+
+def test_onnx_backend_frees_model_and_reuses_export(tiny_model, onnx_dir, monkeypatch):
+    """The ONNX session replaces the PyTorch model; a cached export skips loading it."""
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    encoder = TextEmotionEncoder(tiny_model, backend="onnx")
+    assert encoder.onnx_session is not None and encoder.model is None
+    exports = sorted(path.name for path in onnx_dir.iterdir())
+    assert exports == [f"{encoder._onnx_filename()}", f"{encoder._onnx_filename()}.json"]
+    assert f"opset{text_encoder.ONNX_OPSET}" in exports[0]
+
+    texts = ["i am so stressed", "calm", "the road is busy"]
+    reference = TextEmotionEncoder(tiny_model, backend="eager").encode_batch(texts, pooling="mean")
+    assert torch.allclose(encoder.encode_batch(texts, pooling="mean"), reference, atol=1e-4)
+
+    def no_model(*args, **kwargs):
+        raise AssertionError("PyTorch model loaded despite a cached export")
+
+    monkeypatch.setattr(text_encoder.AutoModel, "from_pretrained", no_model)
+    cached = TextEmotionEncoder(tiny_model, backend="onnx")
+    assert cached.onnx_session is not None and cached.model is None
+
+
+def test_stale_onnx_export_is_rebuilt(tiny_model, onnx_dir, monkeypatch):
+    """An export whose metadata does not match (e.g. another opset) is exported again."""
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    path = str(onnx_dir / "encoder.onnx")
+    TextEmotionEncoder(tiny_model, backend="onnx", onnx_path=path)
+
+    exports = []
+    original = TextEmotionEncoder._export_onnx
+    monkeypatch.setattr(text_encoder, "ONNX_OPSET", text_encoder.ONNX_OPSET + 1)
+    monkeypatch.setattr(
+        TextEmotionEncoder, "_export_onnx",
+        lambda self, onnx_path: (exports.append(onnx_path), original(self, onnx_path))
+    )
+    TextEmotionEncoder(tiny_model, backend="onnx", onnx_path=path)
+    assert exports == [path]
+
+
+def test_onnx_falls_back_to_eager_without_onnxruntime(tiny_model, monkeypatch):
+    monkeypatch.setattr(text_encoder, "ONNXRUNTIME_AVAILABLE", False)
+    encoder = create_text_encoder(tiny_model, backend="onnx")
+    assert encoder.backend == "eager" and encoder.onnx_session is None
+    assert encoder.encode("calm").shape == (encoder.embedding_dim,)
+
+
+def test_onnx_falls_back_to_eager_when_export_fails(tiny_model, onnx_dir, monkeypatch):
+    pytest.importorskip("onnxruntime")
+
+    def broken_export(self, onnx_path):
+        raise RuntimeError("unsupported operator")
+
+    monkeypatch.setattr(TextEmotionEncoder, "_export_onnx", broken_export)
+    encoder = TextEmotionEncoder(tiny_model, backend="onnx")
+    assert encoder.backend == "eager" and encoder.onnx_session is None
+    assert encoder.model is not None
+    assert encoder.encode_batch(["calm", "i am so stressed"]).shape == (2, encoder.embedding_dim)
+
+
+
+def test_longest_padding_stays_within_bucket(tiny_model):
+    """'longest' pads each bucket to its longest text; 'max_length' to the bucket boundary."""
+    encoder = TextEmotionEncoder(tiny_model, backend="eager")
+    widths = []
+    forward = encoder._forward
+    encoder._forward = lambda inputs: (widths.append(inputs["input_ids"].shape[1]), forward(inputs))[1]
+    texts = ["calm", "i am so stressed"]
+
+    longest = encoder.encode_batch(texts, pooling="mean", padding="longest")
+    bucketed = encoder.encode_batch(texts, pooling="mean", padding="max_length")
+    assert widths == [6, 16]
+    assert torch.allclose(longest, bucketed, atol=1e-5)
+
+
+def test_calibrates_max_length_from_corpus(tiny_model, tmp_path, monkeypatch):
+    """A configured corpus lowers max_length at startup; without one it stays at 512."""
+    corpus = tmp_path / "utterances.txt"
+    corpus.write_text("\n".join(["calm"] * 40 + [" ".join(["busy"] * 20)] * 10 + [""]))
+
+    monkeypatch.setattr(Config, "TEXT_ENCODER_CALIBRATION_CORPUS", str(corpus))
+    assert create_text_encoder(tiny_model, backend="eager").max_length == 32
+    assert create_text_encoder(tiny_model, backend="eager", max_length=48).max_length == 48
+
+    monkeypatch.setattr(Config, "TEXT_ENCODER_CALIBRATION_CORPUS", str(tmp_path / "missing.txt"))
+    assert create_text_encoder(tiny_model, backend="eager").max_length == Config.TEXT_ENCODER_MAX_LENGTH
+    monkeypatch.setattr(Config, "TEXT_ENCODER_CALIBRATION_CORPUS", None)
+    assert create_text_encoder(tiny_model, backend="eager").max_length == 512
+
+    # Calibration only ever lowers the configured length
+    encoder = create_text_encoder(tiny_model, backend="eager", max_length=16)
+    assert encoder.calibrate_max_length(load_calibration_corpus(str(corpus))) == 16
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,9 +1,18 @@
 # familiarity_index.py
 
 import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import hashlib
 
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn there, the thread lock is enough
+    fcntl = None
+
 class FamiliarityIndex:
     def __init__(self, cache_file=None):
         # --- make path relative to this file ---
@@ -15,9 +24,43 @@ class FamiliarityIndex:
         # ensure parent directory exists
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
 
+        # --- serialises read-modify-write across threads and gunicorn workers ---
+        self.lock_file = self.cache_file.with_name(self.cache_file.name + ".lock")
+        self._thread_lock = threading.Lock()
+
         # create empty cache if file doesn't exist
-        if not self.cache_file.exists():
-            self.cache_file.write_text(json.dumps({}))
+        with self._locked():
+            if not self.cache_file.exists():
+                self._write_atomic({})
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive lock on the cache, held across processes via flock on a side file.
+        """
+        with self._thread_lock, open(self.lock_file, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _write_atomic(self, cache):
+        """
+        Write to a temp file and rename it over the cache, so readers never see a partial file.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_file.parent, prefix=".familiarity-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
 
     def _hash_route(self, coordinates):
         """
@@ -43,15 +86,14 @@ class FamiliarityIndex:
             coordinates = route.get("decoded_geometry")
             route_hash = self._hash_route(coordinates)
 
-            if self.cache_file.exists():
-                with open(self.cache_file, "r") as f:
-                    cache = json.load(f)
-            else:
-                cache = {}
-
-            cache[route_hash] = cache.get(route_hash, 0) + 1
+            with self._locked():
+                if self.cache_file.exists():
+                    with open(self.cache_file, "r") as f:
+                        cache = json.load(f)
+                else:
+                    cache = {}
 
-            with open(self.cache_file, "w") as f:
-                json.dump(cache, f, indent=2)
+                cache[route_hash] = cache.get(route_hash, 0) + 1
+                self._write_atomic(cache)
         except Exception as e:
             print(f"Failed to update familiarity cache: {e}")
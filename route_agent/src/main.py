@@ -9,7 +9,10 @@ from familiarity_index import FamiliarityIndex
 from scorer import RouteScorer
 from stress_listener import StressListener
 from reroute_manager import RerouteManager
-from utils.logger import logger
+from utils.logger import logger, route_logger
+from utils.metrics import metrics
+from utils.shared_cache import SharedCache
+import logging
 import polyline
 from pathlib import Path
 import yaml
@@ -27,6 +30,9 @@ with open(config_path) as f:
 import requests
 from utils.logger import logger
 
+# Place name -> "lat,lon"; shared by all workers so each name is geocoded once
+geocode_cache = SharedCache("geocode")
+
 def normalize_location(location: str) -> str:
     """
     Converts a place name or coordinates to 'lat,lon' format using Geoapify.
@@ -42,11 +48,19 @@ def normalize_location(location: str) -> str:
             except ValueError:
                 pass
 
+    key = location.strip().lower()
+    cached = geocode_cache.get(key)
+    if cached is not None:
+        metrics.cache_lookup("geocode", hit=True)
+        return cached
+    metrics.cache_lookup("geocode", hit=False)
+
     # Use Geoapify geocoding
     GEOAPIFY_API_KEY = config["api_keys"]["GEOAPIFY_API_KEY"]
     url = f"https://api.geoapify.com/v1/geocode/search?text={location}&apiKey={GEOAPIFY_API_KEY}"
 
     try:
+        metrics.upstream_call("geoapify_geocode")
         resp = requests.get(url, timeout=10)
         resp.raise_for_status()
         data = resp.json()
@@ -60,6 +74,7 @@ def normalize_location(location: str) -> str:
 
     lat = features[0]["properties"]["lat"]
     lon = features[0]["properties"]["lon"]
+    geocode_cache.set(key, f"{lat},{lon}")
     return f"{lat},{lon}"
 
 
@@ -95,8 +110,9 @@ def plan_route(user_id, start, destination, condition="adhd"):
     """
     # --- normalize inputs ---
     try:
-        start_coords = normalize_location(start)
-        destination_coords = normalize_location(destination)
+        with metrics.stage("geocode"):
+            start_coords = normalize_location(start)
+            destination_coords = normalize_location(destination)
     except ValueError as e:
         logger.error(str(e))
         return None
@@ -105,7 +121,8 @@ def plan_route(user_id, start, destination, condition="adhd"):
     logger.info(f"User condition: {condition}")
 
     # --- fetch routes ---
-    routes = fetcher.fetch_all_routes(start_coords, destination_coords)
+    with metrics.stage("directions"):
+        routes = fetcher.fetch_all_routes(start_coords, destination_coords)
 
     if not routes:
         logger.error("No routes found.")
@@ -121,39 +138,53 @@ def plan_route(user_id, start, destination, condition="adhd"):
         coordinates = polyline.decode(route["geometry"])
         coordinates = sample_coordinates(coordinates, n=5)
 
-        weather_scores = [weather_fetcher.get_weather_impact(lat, lon) for lat, lon in coordinates]
+        with metrics.stage("weather"):
+            weather_scores = [weather_fetcher.get_weather_impact(lat, lon) for lat, lon in coordinates]
         weather_score = max(weather_scores)
 
         familiarity_score = familiarity.get_score(user_id, route)
         stress_level = stress_listener.get_stress_level(user_id)
-        road_quality_score = 0.7  # placeholder
+        # OSM road class/surface/lanes, 1 = best; the scorer takes the complement
+        with metrics.stage("road_quality"):
+            road_quality_score = road_estimator.estimate_difficulty(coordinates)
 
         # --- Conditional scores based on user condition ---
         if condition == "autism":
             complexity_score = 0  # ignore complexity
-            sensory_score = places.get_sensory_score_for_route([f"{lat},{lng}" for lat, lng in coordinates])
+            with metrics.stage("places"):
+                sensory_score = places.get_sensory_score_for_route([f"{lat},{lng}" for lat, lng in coordinates])
         elif condition == "adhd":
-            complexity_score = complexity_analyzer.calculate(route)
+            with metrics.stage("complexity"):
+                complexity_score = complexity_analyzer.calculate(route)
             sensory_score = 0  # ignore sensory
         else:
             # default fallback
-            complexity_score = complexity_analyzer.calculate(route)
-            sensory_score = places.get_sensory_score_for_route([f"{lat},{lng}" for lat, lng in coordinates])
+            with metrics.stage("complexity"):
+                complexity_score = complexity_analyzer.calculate(route)
+            with metrics.stage("places"):
+                sensory_score = places.get_sensory_score_for_route([f"{lat},{lng}" for lat, lng in coordinates])
 
         # --- Compute final score using RouteScorer ---
-        score = scorer.score(
-            complexity=complexity_score,
-            sensory=sensory_score,
-            road_quality=road_quality_score,
-            weather=weather_score,
-            familiarity=familiarity_score
-        )
-
-        logger.info(
-            f"Route {idx} | Score: {score:.2f} | "
-            f"Complexity: {complexity_score:.2f} | "
-            f"Sensory: {sensory_score:.2f} | "
-            f"Weather: {weather_score:.2f}"
+        with metrics.stage("scoring"):
+            score = scorer.score(
+                complexity=complexity_score,
+                sensory=sensory_score,
+                road_quality=road_quality_score,
+                weather=weather_score,
+                familiarity=familiarity_score
+            )
+
+        route_logger.info(
+            "Route %d | Score: %.2f | Complexity: %.2f | Sensory: %.2f | Weather: %.2f",
+            idx, score, complexity_score, sensory_score, weather_score,
+            extra={
+                "user_id": user_id,
+                "route_index": idx,
+                "score": score,
+                "complexity": complexity_score,
+                "sensory": sensory_score,
+                "weather": weather_score,
+            },
         )
 
         table_data.append([
@@ -172,14 +203,14 @@ def plan_route(user_id, start, destination, condition="adhd"):
             best_route = route
             best_sensory = sensory_score
 
-    if table_data:
-        from tabulate import tabulate
-        print("\n=== Route Score Summary ===")
+    # The summary table is only rendered when debug logging is on
+    if table_data and logger.isEnabledFor(logging.DEBUG):
         headers = ["Route #", "Total Score", "Complexity", "Sensory", "Road Quality", "Weather", "Familiarity", "Stress"]
-        print(tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
+        logger.debug("\n=== Route Score Summary ===\n%s", tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
 
     if best_route:
-        familiarity.update(best_route)
+        with metrics.stage("familiarity_update"):
+            familiarity.update(best_route)
 
-    logger.info(f"Best route selected with score {best_score:.2f}")
+    logger.info("Best route selected with score %.2f", best_score)
     return best_route
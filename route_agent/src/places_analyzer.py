@@ -1,5 +1,11 @@
+import os
 import requests
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.shared_cache import SharedCache
+
+# POI counts change slowly; one day keeps the Geoapify quota in check
+PLACES_CACHE_TTL_S = float(os.getenv("ROUTE_AGENT_PLACES_CACHE_TTL_S", "86400"))
 
 class PlacesAnalyzer:
     """
@@ -10,6 +16,7 @@ class PlacesAnalyzer:
     def __init__(self, api_key):
         self.api_key = api_key
         self.geoapify_url = "https://api.geoapify.com/v2/places"
+        self._cache = SharedCache("places", ttl_s=PLACES_CACHE_TTL_S)
 
     def get_sensory_score_for_route(self, locations):
         """
@@ -40,7 +47,15 @@ class PlacesAnalyzer:
         """
         Use Geoapify to count POIs around a given lat/lng within radius.
         Queries each category separately to avoid 400 errors.
+        Counts are shared across workers; a count with a failed category is not cached.
         """
+        key = f"{lat:.4f},{lng:.4f},{radius}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            metrics.cache_lookup("places", hit=True)
+            return cached
+        metrics.cache_lookup("places", hit=False)
+
         categories_list = [
             "commercial.supermarket",
             "healthcare",
@@ -48,6 +63,7 @@ class PlacesAnalyzer:
             "office.educational_institution"
         ]
         total_pois = 0
+        complete = True
 
         for category in categories_list:
             filter_circle = f"circle:{lng},{lat},{radius}"
@@ -59,6 +75,7 @@ class PlacesAnalyzer:
             }
 
             try:
+                metrics.upstream_call("geoapify_places")
                 response = requests.get(self.geoapify_url, params=params, timeout=10)
                 response.raise_for_status()
                 data = response.json()
@@ -66,5 +83,8 @@ class PlacesAnalyzer:
             except Exception as e:
                 logger.error(f"Geoapify API error for {category}: {e}")
                 total_pois += 0
+                complete = False
 
+        if complete:
+            self._cache.set(key, total_pois)
         return total_pois
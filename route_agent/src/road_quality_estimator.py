@@ -1,6 +1,8 @@
 import requests
 import time
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.shared_cache import SharedCache
 
 class RoadQualityEstimator:
     """
@@ -10,7 +12,7 @@ class RoadQualityEstimator:
 
     def __init__(self):
         self.overpass_url = "https://overpass.kumi.systems/api/interpreter"
-        self._cache = {}
+        self._cache = SharedCache("road_quality")
 
     def estimate_difficulty(self, coords, max_samples=10):
         """
@@ -27,7 +29,6 @@ class RoadQualityEstimator:
         for lat, lon in coords:
             difficulty = self._query_osm_difficulty(lat, lon)
             difficulties.append(difficulty)
-            time.sleep(1.2)  # polite delay to avoid rate limiting
 
         avg_difficulty = sum(difficulties) / len(difficulties)
         return max(0, min(avg_difficulty, 1))
@@ -43,8 +44,11 @@ class RoadQualityEstimator:
         Returns road difficulty (higher = worse) for a single point.
         """
         key = f"{lat:.5f},{lon:.5f}"
-        if key in self._cache:
-            return self._cache[key]
+        cached = self._cache.get(key)
+        if cached is not None:
+            metrics.cache_lookup("road_quality", hit=True)
+            return cached
+        metrics.cache_lookup("road_quality", hit=False)
 
         query = f"""
         [out:json][timeout:25];
@@ -52,7 +56,9 @@ class RoadQualityEstimator:
         out tags;
         """
         try:
+            metrics.upstream_call("overpass")
             response = requests.get(self.overpass_url, params={"data": query}, timeout=30)
+            time.sleep(1.2)  # polite delay to avoid rate limiting (cache hits skip it)
             response.raise_for_status()
             data = response.json()
             elements = data.get("elements", [])
@@ -80,7 +86,7 @@ class RoadQualityEstimator:
 
             # complement: difficulty = 1 - quality
             difficulty = max(0, min(quality, 1))
-            self._cache[key] = difficulty
+            self._cache.set(key, difficulty)
             return difficulty
         except Exception as e:
             logger.error(f"Overpass API request failed or invalid data: {e}")
@@ -1,5 +1,6 @@
 import requests
 from utils.logger import logger
+from utils.metrics import metrics
 
 class RouteFetcher:
     def __init__(self, api_key):
@@ -28,6 +29,7 @@ class RouteFetcher:
                 }
             }
 
+            metrics.upstream_call("openrouteservice")
             response = requests.post(self.base_url, json=body, headers=headers)
             if response.status_code != 200:
                 logger.error(f"Failed to fetch route from OpenRouteService: {response.text}")
@@ -61,10 +63,10 @@ class RouteFetcher:
 
 
     def _geocode(self, location):
-        print(f"Geocoding location input: '{location}'")  # Debug line
+        logger.debug("Geocoding location input: '%s'", location)
         if "," in location:
             parts = location.split(",")
-            print(f"Split parts: {parts}")
+            logger.debug("Split parts: %s", parts)
             if len(parts) != 2:
                 raise ValueError(f"Expected 2 parts for lat,lng, got {len(parts)}: {parts}")
             lat_str, lng_str = parts
@@ -1,13 +1,99 @@
+import atexit
+import itertools
+import json
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 LOG_FILE = Path(__file__).parent.parent / "route_agent.log"
+LOG_LEVEL = os.getenv("ROUTE_AGENT_LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.getenv("ROUTE_AGENT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("ROUTE_AGENT_LOG_BACKUP_COUNT", "5"))
+# Keep 1 in N per-route lines; 1 keeps everything
+ROUTE_LOG_SAMPLE_RATE = max(1, int(os.getenv("ROUTE_AGENT_ROUTE_LOG_SAMPLE_RATE", "10")))
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(LOG_FILE), logging.StreamHandler(sys.stdout)]
-)
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line; `extra=` fields are kept as top-level keys.
+    """
+
+    def format(self, record):
+        payload = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """
+    Pass 1 in `rate` records below WARNING; warnings and errors always pass.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._counter = itertools.count()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        return next(self._counter) % self.rate == 0
+
+
+def _build_listener(log_queue):
+    file_handler = RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    return QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+
+
+# Request threads only enqueue records; file and stdout I/O happen on the
+# listener thread.
+_log_queue = queue.Queue(-1)
+_queue_handler = QueueHandler(_log_queue)
+listener = _build_listener(_log_queue)
+listener.start()
+atexit.register(lambda: listener.stop())
 
 logger = logging.getLogger("route_agent")
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(_queue_handler)
+logger.propagate = False
+
+
+def _restart_listener_after_fork():
+    # The listener thread does not survive fork (e.g. gunicorn workers with
+    # preload_app), so each child gets a fresh queue and listener.
+    global _log_queue, listener
+    _log_queue = queue.Queue(-1)
+    _queue_handler.queue = _log_queue
+    listener = _build_listener(_log_queue)
+    listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+# Per-route detail lines go through here so they can be sampled under load
+route_logger = logger.getChild("routes")
+route_logger.addFilter(SampleFilter(ROUTE_LOG_SAMPLE_RATE))
@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Under gunicorn each worker records into its own RouteMetrics. When
+# PROMETHEUS_MULTIPROC_DIR is set (gunicorn_conf.py sets it) every value is
+# also written to prometheus_client's per-process files, and /metrics
+# aggregates all workers instead of reporting whichever one got the scrape.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Histogram buckets (seconds) for per-stage latencies; upstream APIs dominate
+# so the range goes from a few ms up to the 30s Overpass timeout.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current_trace = ContextVar("route_agent_trace", default=None)
+
+
+class RequestTrace:
+    """
+    Timing breakdown for a single plan_route call.
+    Stages that run more than once (e.g. weather per route) are summed.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = None
+        self.stages = {}
+        self.upstream_calls = {}
+        self.cache = {}
+
+    def add_stage(self, stage, seconds):
+        entry = self.stages.setdefault(stage, {"seconds": 0.0, "count": 0})
+        entry["seconds"] += seconds
+        entry["count"] += 1
+
+    def add_upstream(self, service):
+        self.upstream_calls[service] = self.upstream_calls.get(service, 0) + 1
+
+    def add_cache(self, cache, hit):
+        entry = self.cache.setdefault(cache, {"hits": 0, "misses": 0})
+        entry["hits" if hit else "misses"] += 1
+
+    def as_dict(self):
+        total = self.total if self.total is not None else time.perf_counter() - self.started
+        return {
+            "total_ms": round(total * 1000, 2),
+            "stages": {
+                stage: {"ms": round(v["seconds"] * 1000, 2), "count": v["count"]}
+                for stage, v in self.stages.items()
+            },
+            "upstream_calls": dict(self.upstream_calls),
+            "cache": {name: dict(v) for name, v in self.cache.items()},
+        }
+
+
+class RouteMetrics:
+    """
+    Process-wide counters and latency histograms for the route agent.
+    Everything recorded here is also added to the active RequestTrace, if any.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stage_counts = {}
+        self._stage_sums = {}
+        self._stage_buckets = {}
+        self._upstream = {}
+        self._cache = {}
+        self._multiprocess = bool(MULTIPROC_DIR) and PROMETHEUS_AVAILABLE
+        if self._multiprocess:
+            # registry=None: rendering reads the shared files, not a registry
+            self._stage_histogram = Histogram(
+                "route_agent_stage_duration_seconds", "Time spent in each plan_route stage.",
+                ["stage"], buckets=self.buckets, registry=None,
+            )
+            self._upstream_counter = Counter(
+                "route_agent_upstream_calls", "Requests made to external APIs.",
+                ["service"], registry=None,
+            )
+            self._cache_counter = Counter(
+                "route_agent_cache_lookups", "Cache lookups by result.",
+                ["cache", "result"], registry=None,
+            )
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - start)
+
+    def observe_stage(self, name, seconds):
+        with self._lock:
+            self._stage_counts[name] = self._stage_counts.get(name, 0) + 1
+            self._stage_sums[name] = self._stage_sums.get(name, 0.0) + seconds
+            counts = self._stage_buckets.setdefault(name, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+        if self._multiprocess:
+            self._stage_histogram.labels(stage=name).observe(seconds)
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_stage(name, seconds)
+
+    def upstream_call(self, service):
+        with self._lock:
+            self._upstream[service] = self._upstream.get(service, 0) + 1
+        if self._multiprocess:
+            self._upstream_counter.labels(service=service).inc()
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_upstream(service)
+
+    def cache_lookup(self, cache, hit):
+        with self._lock:
+            entry = self._cache.setdefault(cache, [0, 0])
+            entry[0 if hit else 1] += 1
+        if self._multiprocess:
+            self._cache_counter.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_cache(cache, hit)
+
+    @contextmanager
+    def trace(self):
+        """
+        Collect a per-request timing breakdown for everything recorded
+        inside the block.
+        """
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            trace.total = time.perf_counter() - trace.started
+            _current_trace.reset(token)
+            self.observe_stage("total", trace.total)
+
+    def _render_multiprocess(self):
+        """
+        Render the metrics of every worker, summed from the multiprocess directory.
+        """
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        cache = {}
+        for metric in registry.collect():
+            if metric.name != "route_agent_cache_lookups":
+                continue
+            for sample in metric.samples:
+                entry = cache.setdefault(sample.labels["cache"], [0, 0])
+                entry[0 if sample.labels["result"] == "hit" else 1] += int(sample.value)
+
+        lines = [
+            "# HELP route_agent_cache_hit_ratio Fraction of cache lookups that hit.",
+            "# TYPE route_agent_cache_hit_ratio gauge",
+        ]
+        for name in sorted(cache):
+            hits, misses = cache[name]
+            ratio = hits / (hits + misses) if hits + misses else 0.0
+            lines.append(f'route_agent_cache_hit_ratio{{cache="{name}"}} {ratio:.4f}')
+
+        return generate_latest(registry).decode() + "\n".join(lines) + "\n"
+
+    def render_prometheus(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        if self._multiprocess:
+            return self._render_multiprocess()
+
+        with self._lock:
+            stage_counts = dict(self._stage_counts)
+            stage_sums = dict(self._stage_sums)
+            stage_buckets = {k: list(v) for k, v in self._stage_buckets.items()}
+            upstream = dict(self._upstream)
+            cache = {k: list(v) for k, v in self._cache.items()}
+
+        lines = [
+            "# HELP route_agent_stage_duration_seconds Time spent in each plan_route stage.",
+            "# TYPE route_agent_stage_duration_seconds histogram",
+        ]
+        for stage in sorted(stage_counts):
+            for bound, count in zip(self.buckets, stage_buckets[stage]):
+                lines.append(
+                    f'route_agent_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'route_agent_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {stage_counts[stage]}'
+            )
+            lines.append(f'route_agent_stage_duration_seconds_sum{{stage="{stage}"}} {stage_sums[stage]:.6f}')
+            lines.append(f'route_agent_stage_duration_seconds_count{{stage="{stage}"}} {stage_counts[stage]}')
+
+        lines.append("# HELP route_agent_upstream_calls_total Requests made to external APIs.")
+        lines.append("# TYPE route_agent_upstream_calls_total counter")
+        for service in sorted(upstream):
+            lines.append(f'route_agent_upstream_calls_total{{service="{service}"}} {upstream[service]}')
+
+        lines.append("# HELP route_agent_cache_lookups_total Cache lookups by result.")
+        lines.append("# TYPE route_agent_cache_lookups_total counter")
+        for name in sorted(cache):
+            hits, misses = cache[name]
+            lines.append(f'route_agent_cache_lookups_total{{cache="{name}",result="hit"}} {hits}')
+            lines.append(f'route_agent_cache_lookups_total{{cache="{name}",result="miss"}} {misses}')
+
+        lines.append("# HELP route_agent_cache_hit_ratio Fraction of cache lookups that hit.")
+        lines.append("# TYPE route_agent_cache_hit_ratio gauge")
+        for name in sorted(cache):
+            hits, misses = cache[name]
+            ratio = hits / (hits + misses) if hits + misses else 0.0
+            lines.append(f'route_agent_cache_hit_ratio{{cache="{name}"}} {ratio:.4f}')
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = RouteMetrics()
@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.logger import logger
+
+# When set, caches live in this SQLite file so every worker process of a
+# multi-worker deployment reads and fills the same entries.
+SHARED_CACHE_PATH = os.getenv("ROUTE_AGENT_SHARED_CACHE")
+
+
+class SharedCache:
+    """
+    Small key/value cache for upstream API results.
+    In-process dict by default; backed by a shared SQLite file (WAL mode)
+    when `path` or ROUTE_AGENT_SHARED_CACHE is set. Values must be JSON-serialisable.
+    Entries expire after `ttl_s` seconds when it is given (e.g. weather).
+    SQLite errors are logged and treated as a miss, never raised to the caller.
+    """
+
+    def __init__(self, name, path=None, ttl_s=None):
+        self.name = name
+        self.path = path or SHARED_CACHE_PATH
+        self.ttl_s = ttl_s
+        self._local = {}
+        self._local_lock = threading.Lock()
+        self._conns = threading.local()
+        self.errors = 0
+        if self.path:
+            self._connect().close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "name TEXT, key TEXT, value TEXT, expires_at REAL, PRIMARY KEY (name, key))"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+        if "expires_at" not in columns:
+            # Files created before entries could expire
+            conn.execute("ALTER TABLE cache ADD COLUMN expires_at REAL")
+        return conn
+
+    def _conn(self):
+        # Connections must not cross a fork, so they are keyed by pid as well as thread
+        pid = os.getpid()
+        if getattr(self._conns, "pid", None) != pid:
+            self._conns.conn = self._connect()
+            self._conns.pid = pid
+        return self._conns.conn
+
+    def _error(self, action, key, error):
+        self.errors += 1
+        logger.warning(
+            "Shared cache %s failed for %s/%s: %s", action, self.name, key, error,
+            extra={"cache": self.name, "cache_error": str(error)},
+        )
+
+    def get(self, key, default=None):
+        now = time.time()
+        if not self.path:
+            with self._local_lock:
+                entry = self._local.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= now):
+                return default
+            return entry[0]
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM cache WHERE name = ? AND key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (self.name, key, now),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._error("read", key, e)
+            return default
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl_s if self.ttl_s else None
+        if not self.path:
+            with self._local_lock:
+                self._local[key] = (value, expires_at)
+            return
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (name, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.name, key, json.dumps(value), expires_at),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            self._error("write", key, e)
@@ -1,11 +1,38 @@
+import os
 import requests
 from geopy.geocoders import Nominatim
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.shared_cache import SharedCache
+
+# Weather changes, so cached conditions expire; keys are rounded to ~1 km
+WEATHER_CACHE_TTL_S = float(os.getenv("ROUTE_AGENT_WEATHER_CACHE_TTL_S", "600"))
 
 class WeatherFetcher:
     def __init__(self, api_key):
         self.api_key = api_key
         self.base_url = "https://api.openweathermap.org/data/2.5/weather"
+        self._cache = SharedCache("weather", ttl_s=WEATHER_CACHE_TTL_S)
+
+    def _get_weather_id(self, lat, lon):
+        """
+        OpenWeatherMap condition code at a point, shared across workers for WEATHER_CACHE_TTL_S.
+        """
+        key = f"{lat:.2f},{lon:.2f}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            metrics.cache_lookup("weather", hit=True)
+            return cached
+        metrics.cache_lookup("weather", hit=False)
+
+        params = {"lat": lat, "lon": lon, "appid": self.api_key, "units": "metric"}
+        metrics.upstream_call("openweather")
+        resp = requests.get(self.base_url, params=params)
+        resp.raise_for_status()  # Raise error for bad HTTP responses
+        data = resp.json()
+        weather_id = data["weather"][0]["id"]
+        self._cache.set(key, weather_id)
+        return weather_id
 
     def get_weather_impact(self, lat, lon):
         """
@@ -13,11 +40,7 @@ class WeatherFetcher:
         based on OpenWeatherMap weather codes.
         """
         try:
-            params = {"lat": lat, "lon": lon, "appid": self.api_key, "units": "metric"}
-            resp = requests.get(self.base_url, params=params)
-            resp.raise_for_status()  # Raise error for bad HTTP responses
-            data = resp.json()
-            weather_id = data["weather"][0]["id"]
+            weather_id = self._get_weather_id(lat, lon)
 
             # Clear sky
             if weather_id == 800:
@@ -0,0 +1,103 @@
+"""Tests for plan_route stage timings, /metrics and include_timings."""
+
+import sys
+from pathlib import Path
+
+import polyline
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT / "route_agent" / "src"))
+sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+import main_server
+import road_quality_estimator
+from familiarity_index import FamiliarityIndex
+from route_agent.src import main as route_main
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def fake_get(url, params=None, timeout=None):
+    """Upstream APIs: geocode, weather, POIs and Overpass."""
+    if "openweathermap" in url:
+        return FakeResponse({"weather": [{"id": 800}]})
+    if "v2/places" in url:
+        return FakeResponse({"features": [{}] * 5})
+    if "overpass" in url:
+        return FakeResponse({"elements": [{"tags": {"highway": "primary", "surface": "asphalt", "lanes": "2"}}]})
+    return FakeResponse({"features": [{"properties": {"lat": 52.52, "lon": 13.40}}]})
+
+
+ROUTE = {
+    "geometry": polyline.encode([(52.52, 13.40), (52.51, 13.41), (52.50, 13.43), (52.49, 13.45)]),
+    "num_turns": 12,
+    "duration": 900,
+    "distance": 8.0,
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(route_main.requests, "get", fake_get)
+    monkeypatch.setattr(road_quality_estimator.requests, "get", fake_get)
+    monkeypatch.setattr(road_quality_estimator.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(route_main.fetcher, "fetch_all_routes", lambda start, destination: [ROUTE])
+    monkeypatch.setattr(route_main, "familiarity", FamiliarityIndex(tmp_path / "cached_routes.json"))
+    return TestClient(main_server.app)
+
+
+def request(client, condition, include_timings=True):
+    return client.post("/get_route", json={
+        "user_id": "u1", "source": "Alexanderplatz", "destination": "Kreuzberg",
+        "condition": condition, "include_timings": include_timings,
+    })
+
+
+def test_include_timings_breaks_down_stages(client):
+    """Each plan_route stage, including road quality, is timed separately."""
+    body = request(client, "adhd").json()
+    assert body["status"] == "success"
+
+    stages = body["timings"]["stages"]
+    for stage in ("geocode", "directions", "weather", "road_quality", "complexity", "scoring",
+                  "familiarity_update"):
+        assert stage in stages, stage
+        assert stages[stage]["count"] >= 1
+    assert "places" not in stages
+    assert body["timings"]["total_ms"] >= 0
+
+    assert "places" in request(client, "autism").json()["timings"]["stages"]
+    assert "timings" not in request(client, "adhd", include_timings=False).json()
+
+
+def test_metrics_endpoint_exposes_stages_and_caches(client):
+    request(client, "adhd")
+    request(client, "adhd")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert '# TYPE route_agent_stage_duration_seconds histogram' in text
+    for stage in ("road_quality", "complexity", "scoring", "total"):
+        assert f'route_agent_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    # The second request is served from the shared caches
+    assert 'route_agent_cache_lookups_total{cache="road_quality",result="hit"}' in text
+    assert 'route_agent_cache_lookups_total{cache="geocode",result="hit"}' in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
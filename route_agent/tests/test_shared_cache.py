@@ -0,0 +1,64 @@
+"""Tests for the cross-worker upstream result cache."""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils.shared_cache import SharedCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared_cache.sqlite3")
+
+
+def test_entries_are_shared_through_the_file(path):
+    """A value written by one worker's cache is read by another's."""
+    SharedCache("weather", path=path).set("52.52,13.40", 800)
+
+    other = SharedCache("weather", path=path)
+    assert other.get("52.52,13.40") == 800
+    assert SharedCache("places", path=path).get("52.52,13.40") is None
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_entries_expire(path, monkeypatch, shared):
+    cache = SharedCache("weather", path=path if shared else None, ttl_s=60)
+    cache.set("k", 500)
+    assert cache.get("k") == 500
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("k", "miss") == "miss"
+
+
+def test_legacy_file_gains_expiry_column(path):
+    """Files written before entries could expire keep working."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cache (name TEXT, key TEXT, value TEXT, PRIMARY KEY (name, key))")
+    conn.execute("INSERT INTO cache VALUES ('road_quality', 'k', '0.8')")
+    conn.commit()
+    conn.close()
+
+    cache = SharedCache("road_quality", path=path)
+    assert cache.get("k") == 0.8
+
+
+def test_sqlite_errors_are_logged_misses(path, caplog):
+    cache = SharedCache("geocode", path=path)
+    cache._conn().execute("DROP TABLE cache")
+
+    with caplog.at_level("WARNING", logger="route_agent"):
+        assert cache.get("berlin", "miss") == "miss"
+        cache.set("berlin", "52.5,13.4")
+    assert cache.errors == 2
+    assert sum("Shared cache" in record.getMessage() for record in caplog.records) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])